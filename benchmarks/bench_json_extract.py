@@ -0,0 +1,101 @@
+"""
+Benchmark : extraction du JSON des réponses LLM.
+
+Compare l'ancienne implémentation de PromptManager.parse_json_response
+(regex gloutonne `\\{.*\\}`, appliquée deux fois en cas d'échec) à
+extract_json_object, sur les réponses enregistrées dans les logs et sur des
+variantes plus longues et plus bruitées (texte autour, blocs de code avec
+accolades), proches de ce que renvoie le LLM en pratique.
+
+Usage :
+    python benchmarks/bench_json_extract.py [--log logs/experiment_data.json] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.prompts.json_parsing import extract_json_object  # noqa: E402
+from src.utils.logger import LOG_FILE, read_experiments  # noqa: E402
+
+
+def legacy_parse(response):
+    """Ancienne version de parse_json_response (sans les print)."""
+    if not response:
+        return None
+    try:
+        json_match = re.search(r"(\{.*\})", response, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group(1))
+        return json.loads(response.strip())
+    except (json.JSONDecodeError, AttributeError):
+        try:
+            clean_minimal = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]", "", response)
+            json_match = re.search(r"(\{.*\})", clean_minimal, re.DOTALL)
+            if json_match:
+                return json.loads(json_match.group(1))
+        except Exception:
+            pass
+        return None
+
+
+def recorded_responses(path):
+    return [
+        entry["details"]["output_response"]
+        for entry in read_experiments(path)
+        if isinstance(entry.get("details"), dict) and entry["details"].get("output_response")
+    ]
+
+
+def noisy_variants(response):
+    """Variantes réalistes d'une réponse : texte, fences et code avec accolades autour du JSON."""
+    code = "def f(d):\n    return {k: v for k, v in d.items() if v}  # {\n" * 40
+    return {
+        "fenced": f"```json\n{response}\n```",
+        "prose+code": f"Voici l'analyse.\n```python\n{code}```\n{response}\nRemarque : pensez à {{x}}.",
+        "long": response + "\n\n" + ("Explication {detail}. " * 2000),
+    }
+
+
+def bench(fn, inputs, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in inputs:
+            fn(text)
+    return (time.perf_counter() - start) / (repeat * len(inputs)) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--log", default=LOG_FILE)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    recorded = recorded_responses(args.log)
+    if not recorded:
+        print(f"Aucune réponse LLM dans {args.log}")
+        return 1
+
+    cases = {"recorded": recorded}
+    for response in recorded:
+        for name, text in noisy_variants(response).items():
+            cases.setdefault(name, []).append(text)
+
+    print(f"{len(recorded)} réponses enregistrées ({args.log}), {args.repeat} répétitions\n")
+    print(f"{'cas':<12} {'regex µs':>10} {'extract µs':>11} {'regex ok':>9} {'extract ok':>11}")
+    for name, inputs in cases.items():
+        legacy_ok = sum(isinstance(legacy_parse(t), dict) for t in inputs)
+        new_ok = sum(isinstance(extract_json_object(t), dict) for t in inputs)
+        legacy_us = bench(legacy_parse, inputs, args.repeat)
+        new_us = bench(extract_json_object, inputs, args.repeat)
+        print(f"{name:<12} {legacy_us:>10.1f} {new_us:>11.1f} {legacy_ok:>5}/{len(inputs):<3} {new_ok:>7}/{len(inputs):<3}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
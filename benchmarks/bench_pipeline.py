@@ -0,0 +1,245 @@
+"""
+Benchmark hors ligne du pipeline complet (Audit → Fix → Judge), sans appel à Gemini.
+
+Un modèle de substitution rejoue les réponses Auditor / Fixer enregistrées
+dans les logs, avec une latence simulée, sur le corpus de
+create_testInt_dataset (créé dans un dossier temporaire). Le rapport donne
+le débit (fichiers/minute), le nombre d'itérations par fichier et les temps
+par étape ; --save / --baseline permettent de suivre les régressions.
+
+Usage :
+    python benchmarks/bench_pipeline.py [--latency 0.5] [--iterations 3] [--workers 2]
+    python benchmarks/bench_pipeline.py --pipeline --workers 2
+    python benchmarks/bench_pipeline.py --save bench.json
+    python benchmarks/bench_pipeline.py --baseline bench.json --tolerance 0.2
+"""
+import argparse
+import ast
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src import orchestrator  # noqa: E402
+from src.prompts.json_parsing import extract_json_object  # noqa: E402
+from src.tests.create_testInt_dataset import create_testInt_dataset  # noqa: E402
+from src.utils import metrics  # noqa: E402
+from src.utils.logger import LOG_FILE, flush_logs, read_experiments  # noqa: E402
+from src.utils.toolsmith_utils import set_sandbox_root  # noqa: E402
+
+# Plan d'audit utilisé quand aucune réponse Auditor n'a été enregistrée
+DEFAULT_PLAN = [{"step": "Ajouter des docstrings et respecter PEP 8", "rationale": "Score pylint"}]
+
+
+class ReplayMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class ReplayLLM:
+    """
+    Modèle de substitution : rejoue les réponses enregistrées.
+
+    Ordre de recherche d'une réponse : même prompt exact, puis même agent sur
+    un fichier de même nom, puis réponse générique (plan d'audit enregistré,
+    ou code du prompt renvoyé inchangé pour le Fixer). La latence simulée est
+    `latency` ± `jitter` secondes par appel.
+    """
+
+    def __init__(self, log_path=LOG_FILE, latency=0.5, jitter=0.1, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.by_prompt = {}
+        self.by_file = {}
+        self.audit_plans = []
+        for entry in read_experiments(log_path) if os.path.exists(log_path) else []:
+            details = entry.get("details") or {}
+            prompt, response = details.get("input_prompt"), details.get("output_response")
+            if entry.get("agent") not in ("Auditor", "Fixer") or not prompt or not response:
+                continue
+            self.by_prompt[_digest(prompt)] = response
+            if details.get("file"):
+                self.by_file[(entry["agent"], _basename(details["file"]))] = response
+            if entry["agent"] == "Auditor":
+                plan = (extract_json_object(response) or {}).get("refactoring_plan")
+                if plan:
+                    self.audit_plans.append(plan)
+
+    def _sleep(self):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+
+    def invoke(self, prompt):
+        self._sleep()
+        return ReplayMessage(self._response(prompt))
+
+    def stream(self, prompt):
+        self._sleep()
+        text = self._response(prompt)
+        for start in range(0, len(text), 64):
+            yield ReplayMessage(text[start:start + 64])
+
+    def _response(self, prompt):
+        recorded = self.by_prompt.get(_digest(prompt))
+        if recorded is not None:
+            return recorded
+
+        if "===== FICHIER: " in prompt:
+            names = re.findall(r"===== FICHIER: (.*?) =====", prompt)
+            return json.dumps({"files": [{"file": n, "refactoring_plan": self._plan()} for n in names]})
+
+        file_match = re.search(r"FICHIER(?: À CORRIGER)?: (.+)", prompt)
+        name = _basename(file_match.group(1).strip()) if file_match else ""
+        agent = "Fixer" if "PLAN DE REFACTORING" in prompt else "Auditor"
+        recorded = self.by_file.get((agent, name))
+        if recorded is not None:
+            return recorded
+
+        if agent == "Auditor":
+            return json.dumps({"issues": [], "refactoring_plan": self._plan()})
+        code = prompt.split("```python\n", 1)[1].split("\n```", 1)[0] if "```python\n" in prompt else ""
+        if '"hunks"' in prompt:
+            return json.dumps({"hunks": _first_function(code), "patch": "", "status": "SUCCESS"})
+        return json.dumps({"code_corrige": code + "\n", "status": "SUCCESS"})
+
+    def _plan(self):
+        return self.audit_plans[0] if self.audit_plans else DEFAULT_PLAN
+
+
+def _basename(path):
+    """Nom de fichier, que le chemin enregistré vienne de Windows ou de Linux."""
+    return re.split(r"[\\/]", path)[-1]
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _first_function(code):
+    """Hunk renvoyant inchangée la première fonction complète du code (mode patch)."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            source = ast.get_source_segment(code, node)
+            if source and "omises" not in source:
+                return [{"target": node.name, "code": source}]
+    return []
+
+
+def run_benchmark(args):
+    """Exécute le pipeline une fois sur le corpus ; retourne les mesures."""
+    replay = ReplayLLM(os.path.abspath(args.log), args.latency, args.jitter)
+    orchestrator.set_llm(replay)
+    orchestrator.set_rate_limit(0, 1, 0)
+    orchestrator.set_llm_cache(os.path.join(args.workdir, ".cache", "llm"), 16, enabled=False)
+    orchestrator.set_fix_mode(args.fix_mode)
+    orchestrator.set_pipeline(args.pipeline)
+
+    previous_dir = os.getcwd()
+    os.chdir(args.workdir)
+    try:
+        create_testInt_dataset()
+        set_sandbox_root(os.path.join("sandbox", "testInt_dataset"))
+        files = sorted(
+            os.path.join("sandbox", "testInt_dataset", name)
+            for name in os.listdir(os.path.join("sandbox", "testInt_dataset"))
+            if name.endswith(".py")
+        )
+        metrics.reset()
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else output):
+            orchestrator.run_files(files, args.iterations, args.workers, args.lint_jobs)
+            flush_logs()
+        elapsed = time.perf_counter() - start
+    finally:
+        os.chdir(previous_dir)
+
+    iterations = metrics.iterations()
+    return {
+        "files": len(files),
+        "wall_s": round(elapsed, 3),
+        "files_per_min": round(len(files) / elapsed * 60, 2),
+        "llm_calls": replay.calls,
+        "iterations_total": sum(iterations.values()),
+        "iterations_mean": round(sum(iterations.values()) / max(1, len(iterations)), 2),
+        "latency_s": args.latency,
+        "workers": args.workers,
+        "pipeline": args.pipeline,
+        "max_iterations": args.iterations,
+        "stages": metrics.summary()["stages"],
+    }
+
+
+def print_report(result):
+    print(f"\n📦 {result['files']} fichiers, {result['max_iterations']} itérations max, "
+          f"{result['workers']} workers{' (pipeline)' if result.get('pipeline') else ''}, "
+          f"latence simulée {result['latency_s']}s")
+    print(f"- Durée totale : {result['wall_s']:.2f}s")
+    print(f"- Débit : {result['files_per_min']:.1f} fichiers/minute")
+    print(f"- Appels LLM : {result['llm_calls']}")
+    print(f"- Itérations : {result['iterations_total']} au total, {result['iterations_mean']} par fichier")
+    metrics.print_summary()
+
+
+def compare(result, baseline_path, tolerance):
+    """Retourne False si le débit a baissé de plus de `tolerance` par rapport à la référence."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    ratio = result["files_per_min"] / baseline["files_per_min"] if baseline.get("files_per_min") else 1.0
+    print(f"\n📈 Débit : {ratio:.2f}x la référence ({baseline['files_per_min']:.1f} fichiers/minute)")
+    if ratio < 1 - tolerance:
+        print(f"❌ Régression de débit au-delà de {tolerance:.0%}")
+        return False
+    return True
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--log", default=os.path.join(BASE_DIR, LOG_FILE), help="Logs dont les réponses Auditor/Fixer sont rejouées")
+    parser.add_argument("--latency", type=float, default=0.5, help="Latence simulée par appel LLM (s)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--lint_jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--fix_mode", choices=orchestrator.FIX_MODES, default="full")
+    parser.add_argument("--pipeline", action="store_true", help="Ordonnanceur par étapes (pool LLM + pool local)")
+    parser.add_argument("--save", default=None, help="Écrit les mesures (JSON) pour servir de référence")
+    parser.add_argument("--baseline", default=None, help="Compare le débit à une référence enregistrée")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--verbose", action="store_true", help="Affiche la sortie de l'orchestrateur")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="swarm_bench_") as workdir:
+        args.workdir = workdir
+        result = run_benchmark(args)
+
+    print_report(result)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline and not compare(result, args.baseline, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
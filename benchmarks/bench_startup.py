@@ -0,0 +1,117 @@
+"""
+Benchmark du temps de démarrage de main.py (imports et CLI).
+
+Chaque commande est lancée dans un interpréteur neuf, `--runs` fois ; le
+rapport donne la médiane et le minimum. Les modules les plus coûteux à
+importer (python -X importtime) sont listés avec --top.
+
+Usage :
+    python benchmarks/bench_startup.py [--runs 5] [--top 10]
+    python benchmarks/bench_startup.py --save startup.json
+    python benchmarks/bench_startup.py --baseline startup.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Commande -> arguments de l'interpréteur
+COMMANDS = {
+    "import main": ["-c", "import main"],
+    "main.py --help": ["main.py", "--help"],
+    "main.py --dry-run": None,  # Rempli avec un dossier temporaire
+    "import langchain_google_genai": ["-c", "import langchain_google_genai"],
+}
+
+
+def _run(args, env):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *args], cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, result
+
+
+def time_command(args, runs, env):
+    """Médiane et minimum (s) de `runs` lancements ; None si la commande échoue."""
+    samples = []
+    for _ in range(runs):
+        elapsed, result = _run(args, env)
+        if result.returncode != 0:
+            return None
+        samples.append(elapsed)
+    return {"median_s": round(statistics.median(samples), 3), "min_s": round(min(samples), 3)}
+
+
+def import_profile(top, env):
+    """Modules de premier niveau les plus coûteux à l'import de main (cumulé, en ms)."""
+    _, result = _run(["-X", "importtime", "-c", "import main"], env)
+    modules = {}
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1:
+            modules[name.strip()] = int(parts[1]) / 1000
+    return sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Nombre de modules listés (0 = aucun)")
+    parser.add_argument("--save", default=None, help="Écrit les mesures (JSON) pour servir de référence")
+    parser.add_argument("--baseline", default=None, help="Compare à une référence enregistrée")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    # Pas de vraie clé : aucune des commandes mesurées ne doit appeler le LLM
+    env = {**os.environ, "GOOGLE_API_KEY": os.getenv("GOOGLE_API_KEY", "bench")}
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="swarm_startup_") as workdir:
+        with open(os.path.join(workdir, "sample.py"), "w", encoding="utf-8") as f:
+            f.write('"""Exemple."""\n\n\ndef add(a, b):\n    """Somme."""\n    return a + b\n')
+        commands = dict(COMMANDS)
+        commands["main.py --dry-run"] = ["main.py", "--target_dir", workdir, "--dry-run", "--lint_jobs", "0"]
+        for label, command in commands.items():
+            results[label] = time_command(command, args.runs, env)
+
+    print(f"\n⏱️ Démarrage ({args.runs} lancements, interpréteur neuf)")
+    for label, stats in results.items():
+        if stats is None:
+            print(f"  {label:<32} échec (module absent ?)")
+        else:
+            print(f"  {label:<32} médiane {stats['median_s']:>6.3f}s   min {stats['min_s']:>6.3f}s")
+
+    if args.top:
+        print("\n📦 Imports les plus coûteux (import main)")
+        for name, ms in import_profile(args.top, env):
+            print(f"  {name:<40} {ms:>8.1f} ms")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        reference = (baseline.get("import main") or {}).get("median_s")
+        current = (results.get("import main") or {}).get("median_s")
+        if reference and current:
+            ratio = current / reference
+            print(f"\n📈 import main : {ratio:.2f}x la référence ({reference:.3f}s)")
+            if ratio > 1 + args.tolerance:
+                print(f"❌ Régression du temps de démarrage au-delà de {args.tolerance:.0%}")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -1,10 +1,8 @@
 import os
 import sys
 import argparse
-import time  # Import indispensable pour les pauses
 from pathlib import Path
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 # -----------------------------
 # PATH CONFIG
@@ -12,178 +10,143 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.join(BASE_DIR, "src"))
 
-from src.utils.logger import log_experiment, ActionType
-from src.utils.toolsmith_utils import run_pylint, run_pytest, lire_fichier, ecrire_fichier
-from src.prompts.PromptManager import PromptManager
+from src import orchestrator
+from src.utils.logger import LOG_FORMAT, LOG_FORMATS, set_log_format, flush_logs
+from src.utils.toolsmith_utils import set_sandbox_root
+from src.utils.pytest_worker import set_pytest_pool_size, PYTEST_WORKER_POOL
+from src.utils.rate_limiter import LLM_RPM, LLM_BURST, LLM_MAX_RETRIES
+from src.utils.llm_cache import LLM_CACHE_DIR, LLM_CACHE_MAX_MB
+from src.utils.run_manifest import RUN_MANIFEST
+from src.utils.version_store import VERSION_STORE
+from src.utils.discovery import discover_files, INCREMENTAL_STATE, DEFAULT_INCLUDE
 
 # -----------------------------
 # ENV
 # -----------------------------
-load_dotenv()
-api_key = os.getenv("GOOGLE_API_KEY")
+def require_api_key():
+    """Lit la clé API (.env) ; quitte si elle est absente."""
+    load_dotenv()
+    api_key = os.getenv("GOOGLE_API_KEY")
 
-if not api_key:
-    print("❌ Clé API manquante (.env)")
-    sys.exit(1)
+    if not api_key:
+        print("❌ Clé API manquante (.env)")
+        sys.exit(1)
+    return api_key
 
-# -----------------------------
-# LLM
-# -----------------------------
-llm = ChatGoogleGenerativeAI(
-    model="models/gemini-2.5-flash",
-    google_api_key=api_key,
-    temperature=0,
-    verbose=True
-)
 
 # =====================================================
-# ORCHESTRATEUR (Audit → Fix → Test → Loop)
-# =====================================================
-def orchestrator(file_path, max_iterations):
-    pm = PromptManager()
-    abs_path = os.path.abspath(file_path)
-    current_score = 0  # Suivi du score de qualité
-
-    print(f"\n🚀 [MISSION] {file_path}")
-
-    for iteration in range(1, max_iterations + 1):
-        print(f"\n🔁 ITERATION {iteration}/{max_iterations}")
-
-        # =====================================
-        # 1️⃣ AUDIT
-        # =====================================
-        try:
-            code_original = lire_fichier(abs_path)
-            lint = run_pylint(abs_path)
-            
-            # Récupération du score pour l'IA
-            lint = run_pylint(abs_path)
-            current_score = lint.get("score", 0)
-            print(f"📊 Qualité actuelle : {current_score}/10")
-
-            prompt = pm.build_auditor_prompt(file_path, code_original, lint)
-            response = llm.invoke(prompt)
-
-            log_experiment(
-                "Auditor",
-                "models/gemini-2.5-flash",
-                ActionType.ANALYSIS,
-                {
-                    "file": file_path,
-                    "input_prompt": prompt,
-                    "output_response": response.content,
-                    "score": current_score
-                },
-                "SUCCESS"
-            )
-
-            analyse = pm.parse_json_response(response.content)
-            plan = analyse.get("refactoring_plan", [])
-            print(f"✅ Audit OK ({len(plan)} problèmes détectés)")
-
-            # Petite pause pour éviter l'erreur 429 entre deux appels
-            time.sleep(5)
-
-        except Exception as e:
-            print(f"❌ Audit failed: {e}")
-            return
-
-        # =====================================
-        # 2️⃣ FIXER
-        # =====================================
-        try:
-            prompt_fix = pm.build_fixer_prompt(file_path, code_original, plan)
-            response_fix = llm.invoke(prompt_fix)
-
-            log_experiment(
-                "Fixer",
-                "models/gemini-2.5-flash",
-                ActionType.FIX,
-                {
-                    "file": file_path,
-                    "input_prompt": prompt_fix,
-                    "output_response": response_fix.content
-                },
-                "SUCCESS"
-            )
-
-            data = pm.parse_json_response(response_fix.content)
-
-            if data and "code_corrige" in data:
-                ecrire_fichier(abs_path, data["code_corrige"])
-                print("📝 Code corrigé écrit")
-
-        except Exception as e:
-            print(f"❌ Fix failed: {e}")
-            return
-
-        # =====================================
-        # 3️⃣ JUDGE (pytest)
-        # =====================================
-        print("🧪 Running tests...")
-        # Pause avant les tests pour laisser le système de fichiers respirer
-        time.sleep(2)
-        result_pytest = run_pytest(abs_path)
-        
-        # Logique flexible basée sur le "status" renvoyé par toolsmith_utils
-        success = False
-        logs = "Aucun log"
-
-        if isinstance(result_pytest, dict):
-            # On utilise le 'status' SUCCESS/FAILURE qu'on a défini ensemble
-            success = result_pytest.get("status") == "SUCCESS"
-            logs = result_pytest.get("stdout", "Aucun log")
-        else:
-            success = result_pytest[0]
-            logs = result_pytest[1]
-
-        log_experiment(
-            agent_name="Judge",
-            model_used="pytest",
-            action=ActionType.DEBUG,
-            details={
-                "file": file_path,
-                "input_prompt": "Exécution des tests unitaires",
-                "output_response": str(logs)
-            },
-            status="SUCCESS" if success else "FAILURE"
-        )
-
-        if success:
-            # Si le score est parfait ou les tests passent, on s'arrête
-            if current_score >= 9:
-                print(f"🎉 MISSION ACCOMPLIE (Score: {current_score}/10) → fichier validé")
-                return
-            else:
-                print(f"✅ Tests OK, mais score Pylint ({current_score}) améliorable. Itération suivante...")
-        else:
-            print(f"❌ Tests FAIL ou Code incomplet → nouvelle tentative")
-
-        # Pause de fin d'itération pour reset le quota Gemini
-        print("⏳ Pause de 10s pour le quota API...")
-        time.sleep(10)
-
-    print("⚠️ Max iterations atteintes → fin de mission")
-
-# =====================================================
-# MAIN CLI (Reste inchangé)
+# MAIN CLI
 # =====================================================
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--target_dir", required=True)
     parser.add_argument("--max_iterations", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Nombre de fichiers refactorés en parallèle (autant de workers pytest, "
+                             "ou PYTEST_WORKER_POOL si plus grand ; pylint reste un fichier à la fois)")
+    parser.add_argument("--max_llm_calls", type=int, default=orchestrator.LLM_MAX_CONCURRENCY,
+                        help="Plafond global d'appels LLM simultanés")
+    parser.add_argument("--rpm", type=float, default=LLM_RPM,
+                        help="Requêtes LLM par minute autorisées par le quota (0 = illimité)")
+    parser.add_argument("--llm_burst", type=int, default=LLM_BURST,
+                        help="Requêtes LLM pouvant partir d'un coup")
+    parser.add_argument("--llm_max_retries", type=int, default=LLM_MAX_RETRIES,
+                        help="Nouvelles tentatives après une erreur 429 / quota")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true",
+                        help="Ne lit ni n'écrit le cache des réponses LLM")
+    parser.add_argument("--refresh-cache", dest="refresh_cache", action="store_true",
+                        help="Ignore les réponses en cache mais enregistre les nouvelles")
+    parser.add_argument("--stream", action="store_true", default=orchestrator.stream_llm,
+                        help="Réponses LLM en streaming : JSON vérifié au fil de l'eau, génération interrompue si invalide")
+    parser.add_argument("--cache_dir", default=LLM_CACHE_DIR)
+    parser.add_argument("--cache_max_mb", type=float, default=LLM_CACHE_MAX_MB)
+    parser.add_argument("--dry-run", dest="dry_run", action="store_true",
+                        help="Lint seul : affiche le score des fichiers à traiter, sans appel LLM ni modification")
+    parser.add_argument("--pipeline", action="store_true", default=orchestrator.pipeline_mode,
+                        help="Répartit les étapes entre un pool LLM (Audit, Fix) et un pool local de --workers threads (Lint, Judge)")
+    parser.add_argument("--lint_jobs", type=int, default=os.cpu_count() or 1,
+                        help="Processus pour la pré-analyse pylint d'un dossier (0 = désactivée)")
+    parser.add_argument("--audit_batch_tokens", type=int, default=orchestrator.audit_batch_tokens,
+                        help="Audite les petits fichiers par lots d'au plus N tokens de code par prompt (0 = désactivé)")
+    parser.add_argument("--include", action="append", default=None, metavar="GLOB",
+                        help="Motif des fichiers à traiter, répétable (défaut : *.py)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                        help="Motif de fichiers ou dossiers à ignorer, répétable (ex : 'test_*.py', 'legacy/*')")
+    parser.add_argument("--no-recursive", dest="no_recursive", action="store_true",
+                        help="Ne parcourt que le premier niveau du dossier cible")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Ne traite que les fichiers modifiés (ou dont le modèle/les prompts ont changé) depuis leur dernier succès")
+    parser.add_argument("--state_file", default=INCREMENTAL_STATE,
+                        help="État persistant du mode --incremental")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reprend l'exécution précédente : fichiers terminés sautés, les autres repris au dernier point de contrôle")
+    parser.add_argument("--manifest", default=RUN_MANIFEST,
+                        help="Fichier d'état de l'exécution (points de reprise par fichier)")
+    parser.add_argument("--no-versions", dest="no_versions", action="store_true",
+                        help="Désactive l'historique des versions (pas de retour à la meilleure version)")
+    parser.add_argument("--versions_dir", default=VERSION_STORE,
+                        help="Dossier des versions des fichiers (contenus + historique score/tests)")
+    parser.add_argument("--tests_dir", default=None,
+                        help="Dossier de tests : le Judge n'exécute que les tests impactés par le fichier modifié")
+    parser.add_argument("--coverage_file", default=None,
+                        help="Fichier .coverage avec contextes par test (pytest --cov-context=test) pour affiner la sélection")
+    parser.add_argument("--log_format", choices=LOG_FORMATS, default=LOG_FORMAT,
+                        help="json (réécriture complète) ou jsonl (append-only, plus rapide)")
+    parser.add_argument("--fix_mode", choices=orchestrator.FIX_MODES, default=orchestrator.fix_mode,
+                        help="full : le Fixer renvoie le fichier complet ; patch : seulement les fonctions/diffs modifiés")
+    parser.add_argument("--prompt_token_budget", type=int, default=orchestrator.prompt_token_budget,
+                        help="Tokens de code max par prompt ; au-delà, seules les fonctions signalées sont données en entier (0 = fichier complet)")
 
     args = parser.parse_args()
+    if args.dry_run:
+        # Rien n'est écrit : ni manifeste (il écraserait celui d'une exécution
+        # interrompue), ni versions, ni état incrémental, ni cache LLM
+        orchestrator.set_version_store(enabled=False)
+    else:
+        require_api_key()
+        orchestrator.set_run_manifest(args.manifest, resume=args.resume)
+        orchestrator.set_version_store(args.versions_dir, enabled=not args.no_versions)
+        if args.incremental:
+            orchestrator.set_incremental(args.state_file)
+        orchestrator.set_llm_cache(args.cache_dir, args.cache_max_mb, enabled=not args.no_cache, refresh=args.refresh_cache)
+    set_log_format(args.log_format)
+    orchestrator.set_fix_mode(args.fix_mode)
+    orchestrator.set_prompt_token_budget(args.prompt_token_budget)
+    orchestrator.set_audit_batch_tokens(args.audit_batch_tokens)
+    orchestrator.set_llm_concurrency(args.max_llm_calls)
+    # Un worker pytest par fichier traité en parallèle : les Judges ne s'attendent pas
+    set_pytest_pool_size(max(args.workers, PYTEST_WORKER_POOL))
+    orchestrator.set_rate_limit(args.rpm, args.llm_burst, args.llm_max_retries)
+    orchestrator.set_llm_streaming(args.stream)
+    orchestrator.set_pipeline(args.pipeline)
     print("🤖 Refactoring Swarm démarré")
     target = Path(args.target_dir)
+    if args.tests_dir:
+        # Les modules du dossier cible entrent aussi dans le graphe d'imports (imports indirects)
+        orchestrator.set_test_selector(args.tests_dir, args.coverage_file,
+                          source_root=target if target.is_dir() else target.parent)
+    if target.exists():
+        # Les agents ne lisent et n'écrivent que dans le dossier cible (tests en lecture seule)
+        set_sandbox_root(target if target.is_dir() else target.parent,
+                         extra_roots=[args.tests_dir] if args.tests_dir else ())
 
     if target.is_file():
-        orchestrator(str(target), args.max_iterations)
+        files = [str(target)]
     elif target.is_dir():
-        for f in target.glob("*.py"):
-            orchestrator(str(f), args.max_iterations)
+        files = discover_files(target, args.include or DEFAULT_INCLUDE, args.exclude, recursive=not args.no_recursive)
     else:
         print("❌ Chemin invalide")
+        files = []
+
+    if args.dry_run:
+        orchestrator.run_dry(files, args.lint_jobs)
+    elif files:
+        orchestrator.run_files(files, args.max_iterations, args.workers, args.lint_jobs)
+        if orchestrator.version_store is not None:
+            orchestrator.version_store.prune()  # Contenus des sessions sorties de l'historique
+
+    flush_logs()
+    orchestrator.print_run_summary()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
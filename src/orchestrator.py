@@ -0,0 +1,912 @@
+import os
+import threading
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+
+from src.utils.logger import log_experiment, ActionType
+from src.utils.toolsmith_utils import run_pylint, run_pylint_batch, run_pytest, lire_fichier, ecrire_fichier
+from src.utils.lint_cache import lint_cache
+from src.utils.test_selector import TestSelector
+from src.utils.rate_limiter import RateLimiter
+from src.utils.llm_cache import LLMCache
+from src.prompts.PromptManager import PromptManager
+from src.prompts.context_builder import PROMPT_TOKEN_BUDGET, estimate_tokens
+from src.prompts.json_parsing import JsonStreamParser, REQUIRED_KEYS
+from src.utils.patch_utils import apply_fixer_patch, PatchError
+from src.utils import metrics
+from src.utils.metrics import span
+from src.utils.convergence import ConvergenceTracker, content_hash
+from src.utils.run_manifest import RunManifest
+from src.utils.scheduler import StageScheduler
+from src.utils.version_store import VersionStore, VERSION_STORE, new_session, is_regression
+from src.utils.discovery import IncrementalState, INCREMENTAL_STATE
+
+# Boucle Audit → Fix → Judge de chaque fichier, appels LLM et état de
+# l'exécution (manifeste, versions, mode incrémental). main.py ne fait que
+# lire la ligne de commande et appeler les set_* de ce module.
+
+# -----------------------------
+# LLM
+# -----------------------------
+LLM_MODEL = "models/gemini-2.5-flash"
+
+# Construit au premier appel réel (get_llm) ou remplacé via set_llm (ex : benchmark hors ligne).
+# langchain n'est importé qu'à ce moment : --help, --dry-run et les exécutions
+# servies par le cache ne paient pas son chargement (~1,5 s).
+llm = None
+_llm_lock = threading.Lock()
+
+
+def build_llm():
+    """Construit le client Gemini (import de langchain à ce moment-là ; clé chargée par main.require_api_key)."""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model=LLM_MODEL,
+        google_api_key=os.getenv("GOOGLE_API_KEY"),
+        temperature=0,
+        verbose=True
+    )
+
+
+def get_llm():
+    """Modèle partagé, construit au premier appel."""
+    global llm
+    with _llm_lock:
+        if llm is None:
+            llm = build_llm()
+        return llm
+
+
+def set_llm(model):
+    """Remplace le modèle utilisé par tous les agents (objet avec invoke() / stream())."""
+    global llm
+    llm = model
+
+# Plafond global d'appels LLM simultanés (partagé par tous les workers)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+_llm_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+# Limiteur de débit partagé : remplace les pauses fixes anti-429
+rate_limiter = RateLimiter()
+# Cache disque des réponses (temperature=0 : même prompt → même réponse)
+llm_cache = LLMCache()
+# Réponses reçues en streaming, avec arrêt anticipé si le JSON est invalide
+stream_llm = os.getenv("LLM_STREAM", "0") == "1"
+
+
+def set_llm_concurrency(max_calls):
+    """Redimensionne le plafond d'appels LLM en vol (à appeler avant de lancer les workers)."""
+    global _llm_slots, LLM_MAX_CONCURRENCY
+    LLM_MAX_CONCURRENCY = max(1, max_calls)
+    _llm_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+
+
+def set_rate_limit(rpm, burst, max_retries):
+    """Remplace le limiteur de débit (quota réel du compte API)."""
+    global rate_limiter
+    rate_limiter = RateLimiter(rpm=rpm, burst=burst, max_retries=max_retries)
+
+
+def set_llm_streaming(enabled):
+    """Active la réception des réponses en streaming (--stream)."""
+    global stream_llm
+    stream_llm = enabled
+
+
+def set_llm_cache(cache_dir, max_mb, enabled=True, refresh=False):
+    """Reconfigure le cache de réponses LLM (--no-cache / --refresh-cache)."""
+    global llm_cache
+    llm_cache = LLMCache(cache_dir, int(max_mb * 1024 * 1024), enabled=enabled, refresh=refresh)
+
+
+def _stream_llm(prompt, expect):
+    """
+    Consomme la réponse en streaming en vérifiant le JSON au fil de l'eau.
+
+    La lecture s'arrête dès que l'objet JSON est complet (le texte qui suit
+    n'est pas attendu) ou qu'il ne peut plus être valide.
+    """
+    parser = JsonStreamParser(REQUIRED_KEYS.get(expect, ()))
+    stream = get_llm().stream(prompt)
+    try:
+        for chunk in stream:
+            if not parser.feed(chunk.content if isinstance(chunk.content, str) else ""):
+                break
+    finally:
+        # Fermer le générateur interrompt la génération côté API
+        stream.close()
+    return parser
+
+
+def _count_tokens(prompt, response, usage=None):
+    """Tokens de l'appel : ceux rapportés par l'API si disponibles, sinon estimés."""
+    usage = usage or {}
+    metrics.count("prompt_tokens", usage.get("input_tokens") or estimate_tokens(prompt))
+    metrics.count("response_tokens", usage.get("output_tokens") or estimate_tokens(response or ""))
+
+
+def invoke_llm(prompt, expect=None):
+    """
+    Retourne le texte de la réponse LLM au prompt.
+
+    Servi depuis le cache si possible ; sinon appel soumis au plafond global
+    de requêtes simultanées et au quota, puis mis en cache.
+
+    Args:
+        expect (str): Agent dont la réponse JSON est attendue ("auditor",
+            "fixer", "fixer_patch") ; en mode --stream, la génération est
+            interrompue dès que la réponse ne peut plus être valide.
+    """
+    cached = llm_cache.get(LLM_MODEL, prompt)
+    if cached is not None:
+        metrics.count("llm_cache_hits")
+        return cached
+    metrics.count("llm_calls")
+    if not stream_llm:
+        with _llm_slots, metrics.timed("llm"):
+            message = rate_limiter.call(get_llm().invoke, prompt)
+        content = message.content
+        _count_tokens(prompt, content, getattr(message, "usage_metadata", None))
+        llm_cache.put(LLM_MODEL, prompt, content)
+        return content
+
+    with _llm_slots, metrics.timed("llm"):
+        parser = rate_limiter.call(_stream_llm, prompt, expect)
+    _count_tokens(prompt, parser.text)
+    if parser.error:
+        # Réponse tronquée ou hors format : ni mise en cache, ni payée jusqu'au bout
+        print(f"⏹️ Génération interrompue : {parser.error}")
+        return parser.text
+    if not parser.done:
+        return parser.text  # Flux terminé avant la fin de l'objet JSON
+    content = parser.json_text()
+    llm_cache.put(LLM_MODEL, prompt, content)
+    return content
+
+# Format de sortie du Fixer : "full" (fichier complet) ou "patch" (hunks / diff)
+FIX_MODES = ("full", "patch")
+fix_mode = os.getenv("FIX_MODE", "full")
+# Budget de tokens du code dans les prompts (au-delà : contexte découpé par l'AST)
+prompt_token_budget = PROMPT_TOKEN_BUDGET
+
+
+def set_fix_mode(mode):
+    global fix_mode
+    if mode not in FIX_MODES:
+        raise ValueError(f"Mode de correction inconnu : {mode}")
+    fix_mode = mode
+
+
+def set_prompt_token_budget(tokens):
+    global prompt_token_budget
+    prompt_token_budget = max(0, tokens)
+    if prompt_manager is not None:
+        prompt_manager.token_budget = prompt_token_budget
+
+# PromptManager partagé (templates lus une seule fois pour toute l'exécution)
+prompt_manager = None
+_prompt_manager_lock = threading.Lock()
+
+
+def get_prompt_manager():
+    global prompt_manager
+    with _prompt_manager_lock:
+        if prompt_manager is None:
+            prompt_manager = PromptManager(token_budget=prompt_token_budget)
+        return prompt_manager
+
+
+def _call_fixer(pm, file_path, prompt_fix, expect="fixer"):
+    """Appelle le Fixer, journalise l'échange et retourne la réponse JSON décodée (ou None)."""
+    response_fix = invoke_llm(prompt_fix, expect=expect)
+    data = pm.parse_json_response(response_fix)
+
+    log_experiment(
+        "Fixer",
+        LLM_MODEL,
+        ActionType.FIX,
+        {
+            "file": file_path,
+            "input_prompt": prompt_fix,
+            "output_response": response_fix
+        },
+        "SUCCESS" if data else "FAILURE"
+    )
+    return data
+
+
+def run_fixer(pm, file_path, code_original, plan, prev_errors=None):
+    """
+    Demande la correction au Fixer et retourne le nouveau code (None si inexploitable).
+
+    `prev_errors` (ex : régression de la correction précédente) est ajouté au prompt.
+
+    En mode patch, seules les fonctions / classes modifiées et un diff du niveau
+    module sont demandés, puis appliqués et validés localement ; si le patch ne
+    s'applique pas, on repasse en mode fichier complet pour ce fichier.
+    Un fichier qui dépasse le budget de tokens est toujours traité en mode patch.
+    """
+    mode = fix_mode
+    if mode == "full" and pm.exceeds_budget(code_original):
+        mode = "patch"  # Fichier trop long : contexte découpé, réponse par hunks
+    if mode == "patch":
+        prompt_fix = pm.build_fixer_prompt(file_path, code_original, plan, prev_errors, mode="patch")
+        data = _call_fixer(pm, file_path, prompt_fix, expect="fixer_patch")
+        try:
+            return apply_fixer_patch(code_original, data, file_path)
+        except PatchError as e:
+            llm_cache.discard(LLM_MODEL, prompt_fix)
+            print(f"⚠️ Patch inapplicable ({e}) → repli sur le fichier complet")
+
+    prompt_fix = pm.build_fixer_prompt(file_path, code_original, plan, prev_errors)
+    data = _call_fixer(pm, file_path, prompt_fix)
+    if data and "code_corrige" in data:
+        return data["code_corrige"]
+    llm_cache.discard(LLM_MODEL, prompt_fix)
+    return None
+
+# Audit groupé des petits fichiers : budget de tokens par prompt (0 = un audit par fichier)
+audit_batch_tokens = int(os.getenv("AUDIT_BATCH_TOKENS", "0"))
+# Analyses issues de la passe groupée, consommées à la 1re itération : {chemin: (code audité, analyse)}
+_batch_audits = {}
+_batch_audits_lock = threading.Lock()
+
+
+def set_audit_batch_tokens(tokens):
+    global audit_batch_tokens
+    audit_batch_tokens = max(0, tokens)
+
+
+def take_batch_audit(abs_path, code):
+    """Retourne (une seule fois) l'analyse groupée du fichier, si elle porte sur ce code."""
+    with _batch_audits_lock:
+        entry = _batch_audits.pop(abs_path, None)
+    if entry is None or entry[0] != code:
+        return None
+    return entry[1]
+
+
+def _audit_batch(pm, batch, contents):
+    """Un appel Auditor pour tout le lot ; une entrée de log par fichier."""
+    with span("AuditBatch"):
+        return _audit_batch_request(pm, batch, contents)
+
+
+def _audit_batch_request(pm, batch, contents):
+    lints = {f: run_pylint(os.path.abspath(f)) for f in batch}
+    prompt = pm.build_batch_auditor_prompt([(f, contents[f], lints[f]) for f in batch])
+    response = invoke_llm(prompt, expect="auditor_batch")
+    analyses = pm.split_batch_response(pm.parse_json_response(response), batch)
+    if not analyses:
+        llm_cache.discard(LLM_MODEL, prompt)
+
+    for f in batch:
+        analyse = analyses.get(f)
+        log_experiment(
+            "Auditor",
+            LLM_MODEL,
+            ActionType.ANALYSIS,
+            {
+                "file": f,
+                "input_prompt": prompt,
+                # Part de la réponse propre au fichier (réponse brute si absent)
+                "output_response": json.dumps(analyse, ensure_ascii=False) if analyse else response,
+                "score": lints[f].get("score", 0),
+                "batch_files": batch
+            },
+            "SUCCESS" if analyse else "FAILURE"
+        )
+        if analyse:
+            with _batch_audits_lock:
+                _batch_audits[os.path.abspath(f)] = (contents[f], analyse)
+    return len(analyses)
+
+
+def run_batch_audit(files, workers=1):
+    """
+    Audite les petits fichiers par lots (un prompt par lot, dans la limite
+    de `audit_batch_tokens`) avant le lancement des orchestrateurs.
+
+    Un fichier absent de la réponse, ou modifié entre-temps, est audité
+    normalement par son orchestrateur.
+    """
+    pm = get_prompt_manager()
+    contents = {f: lire_fichier(os.path.abspath(f)) for f in files}
+    batches = [b for b in pm.pack_audit_batches([(f, contents[f]) for f in files], audit_batch_tokens) if len(b) > 1]
+    if not batches:
+        return
+    print(f"🧾 Audit groupé : {sum(len(b) for b in batches)} fichiers en {len(batches)} requêtes")
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches))), thread_name_prefix="audit") as pool:
+        futures = {pool.submit(_audit_batch, pm, batch, contents): batch for batch in batches}
+        for future in as_completed(futures):
+            try:
+                done = future.result()
+                if done < len(futures[future]):
+                    print(f"⚠️ Audit groupé incomplet ({done}/{len(futures[future])}) : les autres fichiers seront audités un par un")
+            except Exception as e:
+                print(f"❌ Audit groupé échoué ({e}) : audit fichier par fichier")
+
+# Manifeste de l'exécution (reprise avec --resume) ; None = pas de suivi
+run_manifest = None
+
+
+def set_run_manifest(path, resume=False):
+    """Démarre un nouveau manifeste, ou reprend celui de l'exécution précédente (resume=True)."""
+    global run_manifest
+    run_manifest = RunManifest(path, resume=resume)
+
+
+def checkpoint(abs_path, iteration, stage, code_hash, score=None, **extra):
+    if run_manifest is not None:
+        run_manifest.checkpoint(abs_path, iteration, stage, code_hash, score, **extra)
+
+
+def _resume_state(abs_path):
+    if run_manifest is None or not run_manifest.resume:
+        return None
+    return run_manifest.get(abs_path)
+
+
+def is_finished(abs_path):
+    """Vrai si le manifeste repris indique ce fichier terminé, avec le même contenu."""
+    state = _resume_state(abs_path)
+    return bool(state) and state.get("status") == "done" and state.get("hash") == content_hash(lire_fichier(abs_path))
+
+
+def resume_point(abs_path, convergence):
+    """
+    Itération et étape auxquelles reprendre le fichier d'après le manifeste (--resume).
+
+    Returns:
+        tuple: (1, "Lint") sans reprise ; (None, None) si le fichier est déjà
+        terminé et inchangé ; (itération, "Judge") après un Fix.
+    """
+    state = _resume_state(abs_path)
+    if not state:
+        return 1, "Lint"
+    code_hash = content_hash(lire_fichier(abs_path))
+    iteration, stage = run_manifest.resume_point(abs_path, code_hash)
+    if stage is None or state.get("hash") != code_hash:
+        return iteration, stage
+    print(f"↩️ Reprise après l'étape {state.get('stage')} de l'itération {state['iteration']}")
+    if stage == "Fix":
+        # Audit terminé sur ce contenu : le Lint relit le fichier, l'audit est sauté
+        convergence.remember_audit(code_hash, None, state["plan"])
+        return iteration, "Lint"
+    return iteration, stage
+
+# Sélection des tests impactés (--tests_dir) ; None = pytest sur le fichier corrigé lui-même
+test_selector = None
+
+
+def set_test_selector(tests_dir, coverage_file=None, source_root=None):
+    """Active la sélection des tests impactés sur le dossier de tests donné."""
+    global test_selector
+    test_selector = TestSelector(tests_dir, coverage_file=coverage_file, source_root=source_root)
+
+
+def run_judge(abs_path, full_suite=False):
+    """
+    Lance les tests du Judge pour un fichier.
+
+    Avec --tests_dir, seuls les tests qui importent (ou couvrent) le fichier
+    sont exécutés, sauf si full_suite=True ; si aucun test n'est associé au
+    fichier, toute la suite est exécutée. Sans --tests_dir (ou sans aucun
+    test), on retombe sur pytest appliqué au fichier lui-même.
+
+    Returns:
+        tuple: (success, logs, tests exécutés)
+    """
+    tests = [abs_path]
+    if test_selector is not None:
+        selected = None if full_suite else test_selector.select(abs_path)
+        tests = selected or test_selector.all_tests() or [abs_path]
+
+    result_pytest = run_pytest(tests, source_file=abs_path)
+
+    # Logique flexible basée sur le "status" renvoyé par toolsmith_utils
+    success = False
+    logs = "Aucun log"
+
+    if isinstance(result_pytest, dict):
+        # On utilise le 'status' SUCCESS/FAILURE qu'on a défini ensemble
+        success = result_pytest.get("status") == "SUCCESS"
+        logs = result_pytest.get("stdout", "Aucun log")
+    else:
+        success = result_pytest[0]
+        logs = result_pytest[1]
+
+    return success, logs, tests
+
+def run_auditor(pm, file_path, abs_path, code_original, lint):
+    """
+    Retourne le plan de refactoring du fichier (audit groupé déjà obtenu, ou appel à l'Auditor).
+
+    Raises:
+        ValueError: Si la réponse de l'Auditor n'est pas du JSON exploitable.
+    """
+    # Audit déjà obtenu par la passe groupée (--audit_batch_tokens) ?
+    analyse = take_batch_audit(abs_path, code_original)
+    if analyse is None:
+        prompt = pm.build_auditor_prompt(file_path, code_original, lint)
+        response = invoke_llm(prompt, expect="auditor")
+
+        log_experiment(
+            "Auditor",
+            LLM_MODEL,
+            ActionType.ANALYSIS,
+            {
+                "file": file_path,
+                "input_prompt": prompt,
+                "output_response": response,
+                "score": lint.get("score", 0)
+            },
+            "SUCCESS"
+        )
+
+        analyse = pm.parse_json_response(response)
+        if analyse is None:
+            # Réponse inexploitable : ne pas la rejouer depuis le cache
+            llm_cache.discard(LLM_MODEL, prompt)
+            raise ValueError("réponse de l'Auditor non JSON")
+    return analyse.get("refactoring_plan", [])
+
+# Historique des versions de chaque fichier (reprise depuis la meilleure) ; None = désactivé
+version_store = VersionStore()
+
+
+def set_version_store(path=VERSION_STORE, enabled=True):
+    global version_store
+    version_store = VersionStore(path) if enabled else None
+
+
+def rollback_to_best(run):
+    """
+    Enregistre la version lue par le Lint ; si elle est moins bonne que la
+    meilleure version de la session (tests cassés, score en baisse), le
+    fichier est remis dans cet état et l'itération repart de là.
+
+    Une version encore jamais testée (celle d'origine) passe d'abord par les
+    tests du Judge, pour être comparée aux corrections à armes égales.
+    """
+    current = version_store.record(run.abs_path, run.session, content=run.code_original,
+                                   iteration=run.iteration, score=run.current_score)
+    if current.get("tests_ok") is None:
+        # Version jamais testée (celle d'origine) : ses tests servent de référence,
+        # sinon une correction qui les casse mais gagne en score passerait devant
+        with span("Judge", run.file_path, run.iteration):
+            print("🧪 Tests de référence sur la version d'origine...")
+            success = _judge(run, full_suite=False)[0]
+        current = version_store.record(run.abs_path, run.session, run.code_hash, tests_ok=success)
+    best = version_store.best(run.abs_path, run.session)
+    if not is_regression(current, best, run.convergence.min_delta):
+        return
+
+    tests = "OK" if current.get("tests_ok") else "KO"
+    print(f"↩️ Régression (score {run.current_score}/10, tests {tests}) → reprise depuis la meilleure version "
+          f"(score {best['score']}/10, itération {best.get('iteration')})")
+    metrics.count("rollbacks")
+    run.prev_errors = [
+        f"La correction précédente a fait régresser le fichier (score {best['score']} → {run.current_score}/10, "
+        f"tests {tests}) : elle a été annulée, propose une autre correction."
+    ]
+    run.code_original = version_store.get(best["hash"])
+    ecrire_fichier(run.abs_path, run.code_original)
+    run.code_hash = best["hash"]
+    run.lint = run_pylint(run.abs_path)
+    run.current_score = run.lint.get("score", 0)
+    run.convergence.tests_ok = best.get("tests_ok")
+
+
+def restore_best(run):
+    """En fin de mission, remet le fichier dans la meilleure version de la session."""
+    if not version_store.history(run.abs_path, run.session):
+        return
+    current = version_store.entry(run.abs_path, run.session, run.code_hash)
+    if current is None or current.get("score") is None:
+        # Dernière correction testée mais jamais notée
+        current = version_store.record(run.abs_path, run.session, run.code_hash,
+                                       score=run_pylint(run.abs_path).get("score", 0))
+    best = version_store.best(run.abs_path, run.session)
+    if not is_regression(current, best, run.convergence.min_delta):
+        return
+
+    ecrire_fichier(run.abs_path, version_store.get(best["hash"]))
+    run.code_hash = best["hash"]
+    run.convergence.tests_ok = best.get("tests_ok")
+    checkpoint(run.abs_path, run.iteration, "Restore", run.code_hash, best.get("score"), tests_ok=best.get("tests_ok"))
+    metrics.count("rollbacks")
+    print(f"🏆 Meilleure version restaurée (score {best['score']}/10, itération {best.get('iteration')})")
+
+# =====================================================
+# ORCHESTRATEUR (Audit → Fix → Test → Loop)
+# =====================================================
+# La boucle d'un fichier est découpée en étapes (Start, Lint, Audit, Fix,
+# Judge) qui partagent l'état du fichier (FileRun). orchestrator() les
+# enchaîne dans le thread courant ; run_pipeline() les répartit entre un
+# pool LLM (Audit, Fix) et un pool local (Lint, Judge).
+
+class FileRun:
+    """État d'un fichier entre les étapes de sa boucle Audit → Fix → Judge."""
+
+    def __init__(self, file_path, max_iterations):
+        self.file_path = file_path
+        self.abs_path = os.path.abspath(file_path)
+        self.max_iterations = max_iterations
+        self.iteration = 1
+        # Empreinte du contenu, score et tests d'une itération à l'autre
+        self.convergence = ConvergenceTracker()
+        self.code_original = None
+        self.code_hash = None
+        self.lint = None
+        self.current_score = 0  # Suivi du score de qualité
+        self.plan = None
+        self.fixer_idle = False
+        self.prev_errors = None  # Transmis au prochain Fixer (correction annulée)
+        self.session = new_session()  # Versions de ce passage dans le VersionStore
+        self.status = None  # "done" ou "failed" une fois terminé
+
+    def finish(self, status):
+        if status == "done" and version_store is not None and self.code_hash is not None:
+            restore_best(self)
+        self.status = status
+        return None
+
+
+def stage_start(pm, run):
+    print(f"\n🚀 [MISSION] {run.file_path}")
+    start, stage = resume_point(run.abs_path, run.convergence)
+    if start is None or start > run.max_iterations:
+        print("⏭️ Déjà terminé lors de l'exécution précédente")
+        run.convergence.tests_ok = (_resume_state(run.abs_path) or {}).get("tests_ok")
+        return run.finish("done")
+    run.iteration = start
+    if stage == "Judge":
+        return resume_judge(run)
+    return "Lint"
+
+
+def resume_judge(run):
+    """Reprise après un Fix : le code corrigé est sur le disque, il reste à le tester."""
+    try:
+        run.code_original = lire_fichier(run.abs_path)
+        run.code_hash = content_hash(run.code_original)
+        run.lint = run_pylint(run.abs_path)
+    except Exception as e:
+        print(f"❌ Reprise impossible : {e}")
+        return run.finish("failed")
+    run.current_score = run.lint.get("score", 0)
+    run.fixer_idle = bool(_resume_state(run.abs_path).get("fixer_idle"))
+    if version_store is not None:
+        version_store.record(run.abs_path, run.session, content=run.code_original,
+                             iteration=run.iteration, score=run.current_score)
+    return "Judge"
+
+
+def stage_lint(pm, run):
+    """Lecture du fichier et score pylint (servi par le cache si le fichier n'a pas changé)."""
+    print(f"\n🔁 ITERATION {run.iteration}/{run.max_iterations}")
+    with span("Lint", run.file_path, run.iteration):
+        try:
+            run.code_original = lire_fichier(run.abs_path)
+            run.code_hash = content_hash(run.code_original)
+            run.lint = run_pylint(run.abs_path)
+        except Exception as e:
+            print(f"❌ Audit failed: {e}")
+            return run.finish("failed")
+
+    run.current_score = run.lint.get("score", 0)
+    print(f"📊 Qualité actuelle : {run.current_score}/10")
+    if version_store is not None:
+        rollback_to_best(run)
+    run.convergence.observe_score(run.current_score)
+    if run.convergence.plateau():
+        print(f"🛑 Plateau : tests OK et score stable ({run.current_score}/10) "
+              f"depuis {run.convergence.patience} itérations → fin de mission")
+        return run.finish("done")
+    return "Audit"
+
+
+def stage_audit(pm, run):
+    with span("Audit", run.file_path, run.iteration):
+        try:
+            cached = run.convergence.cached_audit(run.code_hash)
+            if cached is not None:
+                run.plan = cached[1]
+                metrics.count("audit_skipped")
+                print("⏭️ Code inchangé depuis le dernier audit → audit sauté")
+            else:
+                run.plan = run_auditor(pm, run.file_path, run.abs_path, run.code_original, run.lint)
+                run.convergence.remember_audit(run.code_hash, run.lint, run.plan)
+                print(f"✅ Audit OK ({len(run.plan)} problèmes détectés)")
+            checkpoint(run.abs_path, run.iteration, "Audit", run.code_hash, run.current_score, plan=run.plan)
+
+        except Exception as e:
+            print(f"❌ Audit failed: {e}")
+            return run.finish("failed")
+    return "Fix"
+
+
+def stage_fix(pm, run):
+    with span("Fix", run.file_path, run.iteration):
+        try:
+            code_corrige = run_fixer(pm, run.file_path, run.code_original, run.plan, run.prev_errors)
+            run.prev_errors = None
+            # Réponse exploitable mais identique : relancer donnerait la même chose
+            run.fixer_idle = code_corrige is not None and content_hash(code_corrige) == run.code_hash
+
+            if code_corrige is not None and not run.fixer_idle:
+                ecrire_fichier(run.abs_path, code_corrige)
+                run.code_hash = content_hash(code_corrige)
+                if version_store is not None:
+                    version_store.record(run.abs_path, run.session, content=code_corrige, iteration=run.iteration)
+                print("📝 Code corrigé écrit")
+            elif run.fixer_idle:
+                print("⏸️ Le Fixer ne propose aucun changement")
+            # Tests de l'itération pas encore passés : un tests_ok antérieur ne vaut plus
+            checkpoint(run.abs_path, run.iteration, "Fix", run.code_hash, tests_ok=None, fixer_idle=run.fixer_idle)
+
+        except Exception as e:
+            print(f"❌ Fix failed: {e}")
+            return run.finish("failed")
+    return "Judge"
+
+
+def _judge(run, full_suite):
+    """Tests du Judge, réutilisés si ce contenu a déjà été testé."""
+    result = run.convergence.cached_judge(run.code_hash, full_suite)
+    if result is not None:
+        print("♻️ Code déjà testé → résultat du Judge réutilisé")
+        metrics.count("judge_reused")
+        return result
+    result = run_judge(run.abs_path, full_suite=full_suite)
+    run.convergence.remember_judge(run.code_hash, full_suite, result)
+    return result
+
+
+def stage_judge(pm, run):
+    # Tests impactés à chaque itération, suite complète à la dernière
+    with span("Judge", run.file_path, run.iteration):
+        final = run.iteration == run.max_iterations
+        print("🧪 Running tests..." + (" (suite complète)" if final and test_selector else ""))
+        success, logs, tests = _judge(run, full_suite=final)
+
+        if success and run.current_score >= 9 and not final and test_selector is not None:
+            # Avant de valider le fichier, on confirme sur toute la suite
+            print("🧪 Tests impactés OK → vérification sur la suite complète...")
+            success, logs, tests = _judge(run, full_suite=True)
+
+        log_experiment(
+            agent_name="Judge",
+            model_used="pytest",
+            action=ActionType.DEBUG,
+            details={
+                "file": run.file_path,
+                "input_prompt": "Exécution des tests unitaires",
+                "output_response": str(logs),
+                "tests": [os.path.relpath(t) for t in tests]
+            },
+            status="SUCCESS" if success else "FAILURE"
+        )
+        checkpoint(run.abs_path, run.iteration, "Judge", run.code_hash, tests_ok=success)
+        if version_store is not None:
+            version_store.record(run.abs_path, run.session, run.code_hash, tests_ok=success)
+
+    if success and run.current_score >= 9:
+        # Si le score est parfait ou les tests passent, on s'arrête
+        print(f"🎉 MISSION ACCOMPLIE (Score: {run.current_score}/10) → fichier validé")
+        return run.finish("done")
+    if run.fixer_idle:
+        print("🛑 Convergence : plus aucun changement proposé → fin de mission")
+        return run.finish("done")
+    if success:
+        print(f"✅ Tests OK, mais score Pylint ({run.current_score}) améliorable. Itération suivante...")
+    else:
+        print(f"❌ Tests FAIL ou Code incomplet → nouvelle tentative")
+
+    if run.iteration >= run.max_iterations:
+        print("⚠️ Max iterations atteintes → fin de mission")
+        return run.finish("done")
+    run.iteration += 1
+    return "Lint"
+
+
+# Étape -> (pool, fonction) : les étapes LLM et les étapes locales (pylint, pytest)
+# tournent sur des pools séparés en mode pipeline
+STAGES = {
+    "Start": ("local", stage_start),
+    "Lint": ("local", stage_lint),
+    "Audit": ("llm", stage_audit),
+    "Fix": ("llm", stage_fix),
+    "Judge": ("local", stage_judge),
+}
+
+
+def orchestrator(file_path, max_iterations):
+    """
+    Boucle Audit → Fix → Judge d'un fichier, étape par étape dans le thread courant.
+
+    Returns:
+        str: "done" (validé, convergé ou itérations épuisées) ou "failed"
+        (étape interrompue par une erreur, à reprendre avec --resume).
+    """
+    return run_stages(FileRun(file_path, max_iterations)).status
+
+
+def run_stages(run):
+    """Enchaîne les étapes de `run` jusqu'à la fin de sa mission."""
+    pm = get_prompt_manager()
+    stage = "Start"
+    while stage is not None:
+        stage = STAGES[stage][1](pm, run)
+    return run
+
+
+# Mode incrémental : ne traiter que les fichiers modifiés depuis leur dernier succès
+incremental_state = None
+
+
+def pipeline_version():
+    """Empreinte du modèle et des templates de prompts : si elle change, tous les fichiers sont retraités."""
+    digest = hashlib.sha256(LLM_MODEL.encode("utf-8"))
+    prompts_dir = Path(__file__).parent / "prompts"
+    for template in sorted(prompts_dir.glob("*.txt")):
+        digest.update(template.name.encode("utf-8") + b"\0" + template.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def set_incremental(path=INCREMENTAL_STATE):
+    global incremental_state
+    incremental_state = IncrementalState(path, pipeline_version())
+
+
+def finish_file(file_path, status, tests_ok=None):
+    """
+    Reporte le statut final d'un fichier dans le manifeste et l'état incrémental.
+
+    Seul un fichier terminé avec des tests au vert compte comme un succès
+    pour --incremental : les autres seront retraités à la prochaine exécution.
+    """
+    if run_manifest is not None:
+        run_manifest.finish(file_path, status)
+    if status == "done" and tests_ok and incremental_state is not None:
+        incremental_state.record(file_path)
+
+
+def run_file(file_path, max_iterations):
+    """Orchestrateur d'un fichier, avec son statut final reporté dans le manifeste."""
+    run = FileRun(file_path, max_iterations)
+    try:
+        run_stages(run)
+    finally:
+        finish_file(file_path, run.status or "failed", run.convergence.tests_ok)
+    return run.status
+
+# Mode pipeline (--pipeline) : les fichiers circulent entre un pool LLM et un pool local
+pipeline_mode = os.getenv("PIPELINE", "0") == "1"
+
+
+def set_pipeline(enabled):
+    global pipeline_mode
+    pipeline_mode = enabled
+
+
+def run_pipeline(files, max_iterations, local_workers=1):
+    """
+    Traite les fichiers avec l'ordonnanceur par étapes.
+
+    Audit et Fix tournent sur un pool de LLM_MAX_CONCURRENCY threads, Lint et
+    Judge sur un pool de `local_workers` threads (pytest s'exécute dans les
+    workers pytest, pylint sous le verrou du moteur partagé). Pendant qu'un
+    fichier attend le LLM, un autre passe ses tests.
+    """
+    pm = get_prompt_manager()
+    stages = {name: (pool, partial(func, pm)) for name, (pool, func) in STAGES.items()}
+    scheduler = StageScheduler(stages, {"llm": LLM_MAX_CONCURRENCY, "local": local_workers})
+
+    def on_error(run, e):
+        print(f"❌ [{run.file_path}] Erreur inattendue : {e}")
+        finish_file(run.file_path, "failed")
+
+    print(f"⚙️ Pipeline : {len(files)} fichiers, {LLM_MAX_CONCURRENCY} threads LLM, {local_workers} threads pylint/pytest")
+    scheduler.run(
+        [FileRun(f, max_iterations) for f in files],
+        "Start",
+        on_done=lambda run: finish_file(run.file_path, run.status, run.convergence.tests_ok),
+        on_error=on_error,
+    )
+
+def pending_files(files):
+    """
+    Fichiers à traiter : sans doublon (lien, chemin relatif/absolu), hors
+    fichiers inchangés (--incremental) et déjà terminés (--resume).
+    """
+    unique_files = list({str(Path(f).resolve()): str(f) for f in files}.values())
+
+    if incremental_state is not None:
+        changed = [f for f in unique_files if incremental_state.needs_processing(f)]
+        if len(changed) < len(unique_files):
+            print(f"⏭️ Incrémental : {len(unique_files) - len(changed)} fichiers inchangés depuis leur dernier traitement, {len(changed)} à traiter")
+        unique_files = changed
+
+    if run_manifest is not None and run_manifest.resume:
+        pending = [f for f in unique_files if not is_finished(os.path.abspath(f))]
+        if len(pending) < len(unique_files):
+            print(f"⏭️ Reprise : {len(unique_files) - len(pending)} fichiers déjà terminés, {len(pending)} à traiter")
+        unique_files = pending
+
+    return unique_files
+
+
+def run_files(files, max_iterations, workers=1, lint_jobs=0):
+    """
+    Lance l'orchestrateur sur plusieurs fichiers, en parallèle si workers > 1.
+
+    Chaque fichier n'est traité que par un seul worker : les écritures sandbox
+    ne se chevauchent jamais, et le logger sérialise les entrées de log.
+
+    Si lint_jobs > 0, une pré-passe pylint analyse tous les fichiers d'un coup
+    sur `lint_jobs` processus ; la première itération d'audit de chaque
+    fichier lit son résultat dans le cache pylint.
+
+    Si audit_batch_tokens > 0, la première itération d'audit des petits
+    fichiers est faite par lots (voir run_batch_audit).
+
+    En mode pipeline, les étapes de tous les fichiers sont réparties entre
+    le pool LLM et un pool local de `workers` threads (voir run_pipeline).
+    """
+    unique_files = pending_files(files)
+
+    if lint_jobs > 0 and len(unique_files) > 1:
+        print(f"🔎 Pré-analyse pylint de {len(unique_files)} fichiers ({lint_jobs} processus)...")
+        run_pylint_batch([os.path.abspath(f) for f in unique_files], jobs=lint_jobs)
+
+    if audit_batch_tokens > 0 and len(unique_files) > 1:
+        run_batch_audit(unique_files, workers)
+
+    if pipeline_mode and len(unique_files) > 1:
+        run_pipeline(unique_files, max_iterations, local_workers=workers)
+        return
+
+    if workers <= 1 or len(unique_files) <= 1:
+        for f in unique_files:
+            run_file(f, max_iterations)
+        return
+
+    print(f"⚙️ {len(unique_files)} fichiers, {workers} workers, {LLM_MAX_CONCURRENCY} appels LLM simultanés max")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="swarm") as pool:
+        futures = {pool.submit(run_file, f, max_iterations): f for f in unique_files}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"❌ [{futures[future]}] Erreur inattendue : {e}")
+
+def run_dry(files, lint_jobs=0):
+    """
+    Mode --dry-run : score pylint des fichiers qui seraient traités, sans
+    charger le client LLM ni modifier aucun fichier (l'état de --resume et
+    de --incremental n'est pas chargé : tous les fichiers sont listés).
+    """
+    unique_files = pending_files(files)
+    if lint_jobs > 0 and len(unique_files) > 1:
+        run_pylint_batch([os.path.abspath(f) for f in unique_files], jobs=lint_jobs)
+
+    print(f"\n🔎 Dry run : {len(unique_files)} fichiers à traiter")
+    scores = {f: run_pylint(os.path.abspath(f)).get("score", 0) for f in unique_files}
+    for f, score in sorted(scores.items(), key=lambda item: item[1]):
+        print(f"  {score:>5.2f}/10  {f}")
+    return scores
+
+
+def print_run_summary():
+    """Résumé de fin d'exécution (caches, temps p50/p95 par étape, outil et fichier)."""
+    cache = llm_cache.stats()
+    lint_stats = lint_cache.stats()
+    print("\n📊 RÉSUMÉ")
+    print(f"- Cache LLM : {cache['hits']} hits / {cache['misses']} misses")
+    print(f"- Cache pylint : {lint_stats['hits']} hits / {lint_stats['misses']} misses")
+    metrics.print_summary()
@@ -1,11 +1,22 @@
-import json
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
-import re 
+
+from src.prompts.json_parsing import extract_json_object
+from src.prompts.context_builder import PROMPT_TOKEN_BUDGET, estimate_tokens, focus_from_lint, focus_from_plan, slice_module
+
+# Nombre de problèmes pylint détaillés dans le prompt de l'Auditor (les plus impactants)
+MAX_PROMPT_ISSUES = int(os.getenv("MAX_PROMPT_ISSUES", "10"))
+
+# Ajouté au prompt quand le code a été réduit au budget de tokens
+SLICED_NOTE = ("(Code partiel : seules les fonctions concernées sont données en entier, "
+               "les autres sont réduites à leur signature. Les numéros de ligne cités sont ceux du "
+               "fichier d'origine : un commentaire « # L<n> » indique que la ligne suivante est la "
+               "ligne n ; ce repère ne fait pas partie du fichier.)\n")
 
 class PromptManager:
-    def __init__(self, templates_dir: str = None):
+    def __init__(self, templates_dir: str = None, token_budget: int = PROMPT_TOKEN_BUDGET):
+        self.token_budget = token_budget
         if templates_dir is None:
             self.templates_dir = Path(__file__).parent
         else:
@@ -14,7 +25,9 @@ class PromptManager:
         self.templates_cache: Dict[str, str] = {}
         self.files_map = {
             "auditor": "auditor_prompt.txt",
+            "auditor_batch": "auditor_batch_prompt.txt",
             "fixer": "fixer_prompt.txt",
+            "fixer_patch": "fixer_patch_prompt.txt",
             "judge": "judge_prompt.txt"
         }
         self._load_templates()
@@ -37,25 +50,122 @@ class PromptManager:
                 self.templates_cache[agent] = ""
 
     # =================== AUDITOR ===================
-    def build_auditor_prompt(self, file_name: str, content: str, lint_data: Optional[Dict] = None) -> str:
+    def build_auditor_prompt(self, file_name: str, content: str, lint_data: Optional[Dict] = None,
+                             max_issues: int = MAX_PROMPT_ISSUES) -> str:
         template = self.templates_cache.get("auditor", "")
-        context = f"FICHIER: {file_name}\n\nCODE:\n```python\n{content}\n```\n"
+        code, sliced = slice_module(content, focus_from_lint(lint_data), token_budget=self.token_budget)
+        context = f"FICHIER: {file_name}\n\nCODE:\n```python\n{code}\n```\n"
+        if sliced:
+            context += SLICED_NOTE
 
         if lint_data:
-            score = lint_data.get('score', 0)
-            context += f"\nLINT:\n- Score Actuel: {score}/10\n"
-            issues = lint_data.get("categorized", {})
-            context += f"- Erreurs: {len(issues.get('error', []))}\n- Avertissements: {len(issues.get('warning', []))}\n"
-            context += "- Top problèmes:\n"
-            for i, issue in enumerate(lint_data.get("issues", [])[:5], 1):
-                context += f"{i}. Ligne {issue.get('line', '?')}: {issue.get('message', 'Inconnu')}\n"
+            context += self._format_lint(lint_data, max_issues)
 
         return f"{template}\n\n{context}\nVeuillez fournir votre analyse au format JSON."
 
+    def build_batch_auditor_prompt(self, files: List[Tuple[str, str, Optional[Dict]]],
+                                   max_issues: int = MAX_PROMPT_ISSUES) -> str:
+        """Un seul prompt d'audit pour plusieurs petits fichiers : [(nom, contenu, lint)]."""
+        template = self.templates_cache.get("auditor_batch", "")
+        context = ""
+        for file_name, content, lint_data in files:
+            context += f"\n===== FICHIER: {file_name} =====\n\nCODE:\n```python\n{content}\n```\n"
+            if lint_data:
+                context += self._format_lint(lint_data, max_issues)
+
+        return f"{template}\n{context}\nVeuillez fournir votre analyse au format JSON, une entrée par fichier."
+
+    def pack_audit_batches(self, files: List[Tuple[str, str]], token_budget: int) -> List[List[str]]:
+        """
+        Regroupe les fichiers [(nom, contenu)] en lots dont le code tient dans `token_budget`.
+
+        Un fichier dépassant la moitié du budget n'est pas regroupé (lot d'un seul fichier).
+        """
+        batches, current, used = [], [], 0
+        for file_name, content in files:
+            tokens = estimate_tokens(content)
+            if tokens > token_budget // 2:
+                batches.append([file_name])
+                continue
+            if current and used + tokens > token_budget:
+                batches.append(current)
+                current, used = [], 0
+            current.append(file_name)
+            used += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def split_batch_response(self, data: Optional[Dict], file_names: List[str]) -> Dict[str, Dict]:
+        """
+        Répartit la réponse d'un audit groupé entre les fichiers du lot.
+
+        Les noms sont rapprochés tels quels, puis par nom de fichier seul ;
+        un fichier absent de la réponse n'a pas d'entrée.
+        """
+        if not data or not isinstance(data.get("files"), list):
+            return {}
+        by_base: Dict[str, List[str]] = {}
+        for name in file_names:
+            by_base.setdefault(os.path.basename(name), []).append(name)
+
+        analyses = {}
+        for entry in data["files"]:
+            if not isinstance(entry, dict):
+                continue
+            name = str(entry.get("file", ""))
+            if name not in file_names:
+                candidates = by_base.get(os.path.basename(name), [])
+                if len(candidates) != 1:
+                    continue
+                name = candidates[0]
+            analyses.setdefault(name, entry)
+        return analyses
+
+    def _format_lint(self, lint_data: Dict, max_issues: int) -> str:
+        """Résumé pylint : score, compte par catégorie et les `max_issues` problèmes les plus impactants."""
+        score = lint_data.get('score', 0)
+        context = f"\nLINT:\n- Score Actuel: {score}/10\n"
+        issues = lint_data.get("categorized", {})
+        context += f"- Erreurs: {len(issues.get('fatal', [])) + len(issues.get('error', []))}\n- Avertissements: {len(issues.get('warning', []))}\n"
+        context += f"- Refactoring: {len(issues.get('refactor', []))}\n- Conventions: {len(issues.get('convention', []))}\n"
+
+        # Les issues arrivent triées par impact : on regroupe les occurrences
+        # d'un même symbole sur une ligne pour garder le prompt court
+        groups: Dict[str, List[Dict]] = {}
+        for issue in lint_data.get("issues", []):
+            groups.setdefault(issue.get("symbol") or issue.get("message", "?"), []).append(issue)
+
+        if groups:
+            context += "- Top problèmes:\n"
+            for i, (symbol, occurrences) in enumerate(list(groups.items())[:max_issues], 1):
+                line_numbers = list(dict.fromkeys(str(o.get("line", "?")) for o in occurrences))
+                lines = ", ".join(line_numbers[:8]) + (", ..." if len(line_numbers) > 8 else "")
+                label = "Ligne" if len(occurrences) == 1 else f"Lignes ({len(occurrences)}x)"
+                context += f"{i}. {label} {lines} [{symbol}]: {occurrences[0].get('message', 'Inconnu')}\n"
+            if len(groups) > max_issues:
+                hidden = sum(len(o) for o in list(groups.values())[max_issues:])
+                context += f"   (+{hidden} problèmes moins prioritaires non listés)\n"
+        return context
+
     # =================== FIXER ===================
-    def build_fixer_prompt(self, file_name: str, content: str, plan: List[Dict], prev_errors: Optional[List[str]] = None) -> str:
-        template = self.templates_cache.get("fixer", "")
-        context = f"FICHIER À CORRIGER: {file_name}\n\nCODE ACTUEL:\n```python\n{content}\n```\n\nPLAN DE REFACTORING:\n"
+    def build_fixer_prompt(self, file_name: str, content: str, plan: List[Dict], prev_errors: Optional[List[str]] = None,
+                           mode: str = "full") -> str:
+        """
+        mode="full" : le Fixer renvoie le fichier complet dans "code_corrige".
+        mode="patch" : il ne renvoie que les fonctions/classes modifiées ("hunks")
+        et un diff unifié pour le niveau module ("patch") ; au-delà du budget
+        de tokens, le code est alors découpé autour des éléments cités par le plan.
+        """
+        template = self.templates_cache.get("fixer_patch" if mode == "patch" else "fixer", "")
+        code, sliced = content, False
+        if mode == "patch":
+            focus_lines, focus_names = focus_from_plan(plan, content)
+            code, sliced = slice_module(content, focus_lines, focus_names, token_budget=self.token_budget)
+        context = f"FICHIER À CORRIGER: {file_name}\n\nCODE ACTUEL:\n```python\n{code}\n```\n"
+        if sliced:
+            context += SLICED_NOTE
+        context += "\nPLAN DE REFACTORING:\n"
         
         for idx, step in enumerate(plan, 1):
             context += f"{idx}. {step.get('step', 'Corriger problème')}\n"
@@ -70,6 +180,10 @@ class PromptManager:
         context += "\nCONSIGNES DE SORTIE:\n"
         context += "- Retourne UNIQUEMENT l'objet JSON.\n"
         context += "- Ne change pas les noms des fonctions existantes.\n"
+        if mode == "patch":
+            context += "- Ne renvoie PAS le fichier complet : uniquement 'hunks' et 'patch'.\n"
+        if sliced:
+            context += "- Utilise 'hunks' pour toute fonction modifiée ; 'patch' uniquement pour le code de niveau module affiché.\n"
         
         return f"{template}\n\n{context}"
 
@@ -77,39 +191,22 @@ class PromptManager:
     def parse_json_response(self, response: str) -> Optional[Dict]:
         """
         Analyse la réponse du LLM pour extraire l'objet JSON.
-        Préserve les sauts de ligne pour éviter les SyntaxError dans le code généré.
+
+        Retourne le premier objet JSON valide de la réponse (texte autour,
+        blocs ```json et blocs de code ignorés) ; les sauts de ligne bruts dans
+        les chaînes sont acceptés pour ne pas perdre le code généré.
         """
         if not response:
             return None
-        
-        try:
-            # 1. Extraction du bloc JSON entre accolades { }
-            # re.DOTALL permet de capturer les sauts de ligne à l'intérieur du bloc
-            json_match = re.search(r"(\{.*\})", response, re.DOTALL)
-            
-            if json_match:
-                json_str = json_match.group(1)
-                # 2. json.loads convertit les \\n textuels en vrais sauts de ligne \n
-                return json.loads(json_str)
-            
-            # Si aucune accolade n'est trouvée, tentative de parsing direct
-            return json.loads(response.strip())
-            
-        except (json.JSONDecodeError, AttributeError) as e:
-            print(f"⚠️ Erreur de décodage JSON : {e}")
-            
-            # TENTATIVE DE RÉCUPÉRATION : 
-            # Nettoyage minimal des caractères de contrôle dangereux uniquement
-            try:
-                # On garde \t (09), \n (0a), \r (0d) et on vire le reste de 0-31
-                clean_minimal = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]", "", response)
-                json_match = re.search(r"(\{.*\})", clean_minimal, re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group(1))
-            except Exception:
-                pass
-            
-            return None
+
+        data = extract_json_object(response)
+        if data is None:
+            print("⚠️ Erreur de décodage JSON : aucun objet JSON valide dans la réponse")
+        return data
+
+    def exceeds_budget(self, content: str) -> bool:
+        """Vrai si le fichier ne tient pas dans le budget (le Fixer doit alors passer en mode patch)."""
+        return bool(self.token_budget) and estimate_tokens(content) > self.token_budget
 
     def get_template(self, agent: str) -> str:
         return self.templates_cache.get(agent, "")
\ No newline at end of file
@@ -0,0 +1,185 @@
+import ast
+import os
+import re
+
+# =====================
+# CONTEXTE DE CODE DÉCOUPÉ PAR L'AST
+# =====================
+# Au-delà du budget, le fichier n'est plus collé en entier dans le prompt :
+#   - le code de niveau module (imports, constantes, __main__) est conservé ;
+#   - les fonctions / méthodes signalées (lint ou plan) sont données en entier ;
+#   - les autres sont réduites à leur signature et à la 1re ligne de leur docstring ;
+#   - après chaque coupure, un commentaire "# L<n>" redonne le numéro de ligne
+#     d'origine (celui des messages pylint et du plan).
+
+# Budget (approximatif) de tokens pour le code d'un prompt ; 0 = pas de découpage
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+# Estimation sans tokenizer : ~4 caractères par token pour du code Python
+CHARS_PER_TOKEN = 4
+
+_LINE_REF = re.compile(r"\b(?:lignes?|lines?|l\.)\s*(\d+)", re.IGNORECASE)
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)?")
+_DEFS = (ast.FunctionDef, ast.AsyncFunctionDef)
+# Repère de numérotation : la ligne suivante est la ligne n du fichier d'origine
+LINE_MARKER = "# L{}"
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def focus_from_lint(lint_data):
+    """Lignes signalées par pylint, de la plus à la moins impactante."""
+    if not lint_data:
+        return []
+    return [issue["line"] for issue in lint_data.get("issues", []) if issue.get("line")]
+
+
+def defined_names(content):
+    """Fonctions, classes et méthodes ("Classe.methode" et nom seul) définies dans le module."""
+    try:
+        tree = ast.parse(content)
+    except SyntaxError:
+        return set()
+    names = set()
+    for name, _ in _units(tree):
+        names.add(name)
+        names.add(name.rsplit(".", 1)[-1])
+    names.update(node.name for node in tree.body if isinstance(node, ast.ClassDef))
+    return names
+
+
+def focus_from_plan(plan, content=None):
+    """
+    Lignes et noms cités dans les étapes du plan de refactoring.
+
+    Avec `content`, seuls les noms définis dans le module sont retenus : les
+    mots ordinaires du plan ne font pas déplier tout le fichier.
+    """
+    lines, names = [], []
+    for step in plan or []:
+        text = f"{step.get('step', '')} {step.get('rationale', '')}"
+        lines.extend(int(n) for n in _LINE_REF.findall(text))
+        names.extend(_IDENTIFIER.findall(text))
+    if content is not None:
+        known = defined_names(content)
+        names = [name for name in names if name in known]
+    return lines, names
+
+
+def _start(node):
+    return min([d.lineno for d in node.decorator_list] + [node.lineno])
+
+
+def _units(tree):
+    """
+    Fonctions et méthodes du module, dans l'ordre du fichier.
+
+    Returns:
+        list: [(nom qualifié, nœud)] ; les classes sont éclatées en méthodes.
+    """
+    units = []
+    for node in tree.body:
+        if isinstance(node, _DEFS):
+            units.append((node.name, node))
+        elif isinstance(node, ast.ClassDef):
+            for child in node.body:
+                if isinstance(child, _DEFS):
+                    units.append((f"{node.name}.{child.name}", child))
+    return units
+
+
+def _signature(lines, node):
+    """Décorateurs + en-tête `def`, 1re ligne de la docstring et `...`."""
+    body_start = node.body[0].lineno
+    if body_start == node.lineno:
+        return lines[_start(node) - 1:node.end_lineno]  # Fonction sur une ligne
+    header = lines[_start(node) - 1:body_start - 1]
+    indent = " " * node.body[0].col_offset
+    docstring = ast.get_docstring(node)
+    if docstring:
+        header.append(f'{indent}"""{docstring.strip().splitlines()[0]}"""')
+    header.append(f"{indent}...  # lignes {body_start}-{node.end_lineno} omises")
+    return header
+
+
+def slice_module(content, focus_lines=(), focus_names=(), token_budget=PROMPT_TOKEN_BUDGET):
+    """
+    Réduit `content` au budget de tokens en gardant le code utile au prompt.
+
+    Args:
+        focus_lines (list): Lignes signalées, par ordre de priorité.
+        focus_names (list): Noms de fonctions / classes / "Classe.methode" cités.
+
+    Returns:
+        tuple: (code, découpé) ; le code est renvoyé tel quel s'il tient dans
+        le budget ou s'il n'est pas analysable. Dans le code découpé, chaque
+        bloc qui suit une fonction réduite commence par un repère "# L<n>".
+    """
+    if not token_budget or estimate_tokens(content) <= token_budget:
+        return content, False
+    try:
+        tree = ast.parse(content)
+    except SyntaxError:
+        return content, False
+
+    lines = content.splitlines()
+    units = _units(tree)
+
+    # Priorité d'une unité : rang de la 1re ligne / du 1er nom qui la désigne
+    priority = {}
+    for rank, line in enumerate(focus_lines):
+        for name, node in units:
+            if _start(node) <= line <= node.end_lineno:
+                priority.setdefault(name, rank)
+    names = set(focus_names)
+    for name, _ in units:
+        if name in names or name.rsplit(".", 1)[-1] in names or name.split(".", 1)[0] in names:
+            priority.setdefault(name, len(focus_lines))
+
+    # Chaque unité remplace ses lignes par sa signature ; le reste est gardé tel quel
+    spans = {name: (_start(node), node.end_lineno) for name, node in units}
+    signatures = {name: _signature(lines, node) for name, node in units}
+    full = {name: lines[spans[name][0] - 1:spans[name][1]] for name in spans}
+
+    def size(block):
+        return estimate_tokens("\n".join(block))
+
+    # Une unité réduite coûte sa signature et le repère "# L<n>" qui la suit
+    reduced = {n: size(signatures[n] + [LINE_MARKER.format(spans[n][1] + 1)]) for n in spans}
+    total = size(lines) - sum(size(full[n]) - reduced[n] for n in spans)
+    expanded = set()
+    for name in sorted(priority, key=priority.get):
+        extra = size(full[name]) - reduced[name]
+        if total + extra <= token_budget:
+            expanded.add(name)
+            total += extra
+
+    out = []
+    numbered = True  # Les lignes émises suivent-elles encore la numérotation d'origine ?
+
+    def emit(first, last):
+        # Lignes d'origine first..last ; après une coupure, repère "# L<n>" avant la 1re non vide
+        nonlocal numbered
+        for line_no in range(first, last + 1):
+            line = lines[line_no - 1]
+            if not numbered and line.strip():
+                out.append(line[:len(line) - len(line.lstrip())] + LINE_MARKER.format(line_no))
+                numbered = True
+            out.append(line)
+
+    line_no = 1
+    for name, node in units:
+        start, end = spans[name]
+        emit(line_no, start - 1)
+        if name in expanded:
+            emit(start, end)
+        else:
+            # En-tête d'origine (repéré si besoin), puis docstring abrégée et "..." ajoutés
+            header_end = node.body[0].lineno - 1 if node.body[0].lineno > node.lineno else end
+            emit(start, header_end)
+            out.extend(signatures[name][header_end - start + 1:])
+            numbered = header_end == end
+        line_no = end + 1
+    emit(line_no, len(lines))
+    return "\n".join(out) + "\n", True
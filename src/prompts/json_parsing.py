@@ -0,0 +1,354 @@
+import bisect
+import json
+import os
+import re
+
+# =====================
+# ANALYSE INCRÉMENTALE DU JSON RENVOYÉ EN STREAMING
+# =====================
+# Le texte est examiné au fil des morceaux reçus : dès que l'objet JSON est
+# complet, ou qu'il ne peut manifestement plus être valide, la génération
+# peut être interrompue.
+
+# Texte toléré avant la première accolade ("```json", courte phrase...)
+MAX_JSON_PREFIX = int(os.getenv("MAX_JSON_PREFIX", "2000"))
+
+# Premier caractère attendu pour la valeur des clés connues des agents
+VALUE_TYPES = {
+    "refactoring_plan": "[",
+    "issues": "[",
+    "code_corrige": '"',
+    "hunks": "[",
+    "patch": '"',
+    "files_modified": "[",
+    "files": "[",
+}
+
+# Clés dont au moins une doit figurer dans la réponse de chaque agent
+REQUIRED_KEYS = {
+    "auditor": ("refactoring_plan", "issues"),
+    "auditor_batch": ("files",),
+    "fixer": ("code_corrige",),
+    "fixer_patch": ("hunks", "patch"),
+}
+
+_CLOSING = {"}": "{", "]": "["}
+_STRUCTURAL = re.compile(r'["\\{}]')
+# Début plausible d'un objet JSON : "{" suivi d'une clé ou vide
+_OBJECT_START = re.compile(r'\{\s*["}]')
+# Ouverture de bloc de code : ``` en début de ligne (un ``` au fil du texte n'en est pas un)
+_FENCE = re.compile(r"^[ \t]*```", re.MULTILINE)
+# Langages de bloc dont le contenu est analysé comme du JSON
+JSON_FENCE_LANGUAGES = ("", "json", "json5")
+# strict=False : sauts de ligne bruts tolérés dans les chaînes
+_DECODER = json.JSONDecoder(strict=False)
+
+
+class JsonStreamParser:
+    """
+    Suit la structure d'un objet JSON reçu morceau par morceau.
+
+    Seule la structure est analysée (chaînes, échappements, imbrication) ;
+    les clés de premier niveau sont relevées pour vérifier le type de leur
+    valeur dès son premier caractère.
+
+    Les candidats sont repérés comme dans extract_json_object (`{` suivi
+    d'une clé ou de `}`) ; un candidat qui ne se décode pas (accolades de
+    prose) est ignoré et la recherche continue après lui. Les blocs de code
+    non JSON sont sautés de la même façon.
+
+    Dès que la première clé est suivie de `:`, le candidat est tenu pour
+    l'objet de la réponse : une valeur de type inattendu ou un crochet mal
+    fermé lève l'erreur aussitôt, sans attendre la dernière accolade. Avant
+    cela, l'incohérence peut venir de prose et le candidat est seulement
+    écarté.
+
+    Attributs:
+        done (bool): L'objet de premier niveau est complet.
+        error (str): Raison pour laquelle la réponse ne peut pas être valide.
+    """
+
+    def __init__(self, required=(), value_types=VALUE_TYPES, max_prefix=MAX_JSON_PREFIX):
+        self.required = tuple(required)
+        self.value_types = value_types
+        self.max_prefix = max_prefix
+        self._chunks = []
+        self._offsets = []  # Position de début de chaque morceau
+        self._length = 0
+        self.start = None
+        self.end = None
+        self.keys = []
+        self.done = False
+        self.error = None
+        self._brace = None  # "{" vu hors objet, en attente du caractère suivant
+        self._searched = 0  # Caractères parcourus hors candidat
+        # Blocs ``` hors objet : début de ligne, backticks consécutifs, langage, bloc de code sauté
+        self._line_start = True
+        self._ticks = 0
+        self._fence_language = None
+        self._in_code = False
+        self._reset_candidate()
+
+    def _reset_candidate(self):
+        self.start = None
+        self.keys = []
+        self._stack = []
+        self._depth = 0  # Accolades seules, comme _balanced_end
+        self._invalid = None  # Candidat de prose écarté : on attend sa dernière accolade
+        self._in_string = False
+        self._escape = False
+        self._key_chars = None  # Clé de premier niveau en cours de lecture
+        self._expect = None  # "key" / "value" au premier niveau
+        self._confirmed = False  # Première clé suivie de ":" : ce n'est plus de la prose
+
+    @property
+    def text(self):
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+            self._offsets = [0]
+        return self._chunks[0] if self._chunks else ""
+
+    def _slice(self, start, end):
+        """Texte entre start et end, sans recoller toute la réponse."""
+        first = bisect.bisect_right(self._offsets, start) - 1
+        last = bisect.bisect_left(self._offsets, end)
+        text = "".join(self._chunks[first:last])
+        offset = self._offsets[first]
+        return text[start - offset:end - offset]
+
+    @property
+    def finished(self):
+        return self.done or self.error is not None
+
+    def feed(self, chunk):
+        """Ajoute un morceau de texte ; retourne True tant qu'il faut continuer à lire."""
+        self._chunks.append(chunk)
+        self._offsets.append(self._length)
+        offset = self._length
+        self._length += len(chunk)
+        if self.finished:
+            return False
+
+        # Seul le nouveau morceau est parcouru : coût linéaire sur toute la réponse
+        for index, char in enumerate(chunk):
+            pos = offset + index + 1
+
+            if self.start is None:
+                if self._brace is not None and char not in " \t\r\n":
+                    if char in '"}':
+                        # Début d'objet confirmé : le caractère courant est analysé ci-dessous
+                        self.start = self._brace
+                        self._stack.append("{")
+                        self._depth = 1
+                        self._expect = "key"
+                    self._brace = None
+                if self.start is None:
+                    self._searched += 1
+                    if self._skip_fence(char):
+                        pass
+                    elif char == "{":
+                        self._brace = pos - 1
+                    elif self._brace is None and self._searched > self.max_prefix:
+                        self.error = f"pas d'objet JSON dans les {self.max_prefix} premiers caractères"
+                        break
+                    continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_chars is not None:
+                        self.keys.append("".join(self._key_chars))
+                        self._key_chars = None
+                        self._expect = ":"
+                elif self._key_chars is not None:
+                    self._key_chars.append(char)
+                continue
+
+            if char in " \t\r\n":
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close_candidate(pos)
+                    if self.finished:
+                        break
+                    continue
+            if self._invalid is not None:
+                continue  # Candidat écarté : on attend seulement sa dernière accolade
+
+            top_level = len(self._stack) == 1
+            if top_level and self._expect == "value":
+                self._expect = None
+                expected = self.value_types.get(self.keys[-1])
+                if expected and char != expected:
+                    self.error = f"valeur inattendue pour '{self.keys[-1]}' ({char!r} au lieu de {expected!r})"
+                    break
+
+            if char == '"':
+                if top_level and self._expect == "key":
+                    self._key_chars = []
+            elif char in "{[":
+                self._stack.append(char)
+            elif char in "}]":
+                if not self._stack or self._stack.pop() != _CLOSING[char]:
+                    if self._confirmed:
+                        self.error = f"'{char}' inattendu"
+                        break
+                    self._invalid = f"'{char}' inattendu"
+            elif top_level and char == ",":
+                self._expect = "key"
+            elif top_level and char == ":":
+                self._confirmed = self._confirmed or self._expect == ":"
+                self._expect = "value"
+
+        return not self.finished
+
+    def _skip_fence(self, char):
+        """Suit les blocs ``` hors objet ; True si le caractère fait partie d'un bloc à sauter."""
+        if self._in_code:
+            # Comme l'extracteur : le bloc se ferme au prochain ```, où qu'il soit
+            self._ticks = self._ticks + 1 if char == "`" else 0
+            if self._ticks == 3:
+                self._in_code = False
+                self._ticks = 0
+                self._line_start = False
+            return True
+        if self._fence_language is not None:
+            if char != "\n":
+                self._fence_language.append(char)
+                return True
+            language = "".join(self._fence_language).strip().lower()
+            self._fence_language = None
+            self._in_code = language not in JSON_FENCE_LANGUAGES
+            self._line_start = True
+            return self._in_code
+        if char == "`" and (self._line_start or self._ticks):
+            self._ticks += 1
+            self._line_start = False
+            if self._ticks == 3:
+                self._ticks = 0
+                self._fence_language = []
+            return True
+        self._ticks = 0
+        if char == "\n":
+            self._line_start = True
+        elif char not in " \t":
+            self._line_start = False
+        return False
+
+    def _close_candidate(self, pos):
+        """Dernière accolade du candidat : objet retenu s'il se décode, sinon recherche du suivant."""
+        try:
+            _DECODER.raw_decode(self._slice(self.start, pos))
+        except ValueError:
+            self._reset_candidate()  # Fausse piste (prose entre accolades...)
+            self._line_start = False
+            return
+        self.end = pos
+        self.done = True
+        if self.required and not any(key in self.keys for key in self.required):
+            self.error = f"aucune des clés attendues ({', '.join(self.required)})"
+
+    def json_text(self):
+        """Texte de l'objet complet (None tant qu'il n'est pas terminé)."""
+        if not self.done:
+            return None
+        return self._slice(self.start, self.end)
+
+
+# =====================
+# EXTRACTION D'UN OBJET JSON DANS UNE RÉPONSE COMPLÈTE
+# =====================
+
+def _fence_end(text, pos):
+    """
+    Fin du bloc ``` ouvert en `pos` s'il faut l'ignorer (code, pas du JSON).
+
+    Returns:
+        int: Position après la clôture du bloc, ou None pour un bloc ```json
+        (ou sans langage), dont le contenu est analysé normalement.
+    """
+    line_end = text.find("\n", pos)
+    if line_end == -1:
+        line_end = len(text)
+    language = text[pos + 3:line_end].strip().lower()
+    if language in JSON_FENCE_LANGUAGES:
+        return None
+    close = text.find("```", line_end)
+    return len(text) if close == -1 else close + 3
+
+
+def _balanced_end(text, brace):
+    """Position après l'accolade fermant celle de `brace` (None si jamais fermée)."""
+    depth = 0
+    in_string = False
+    escaped = -1  # Position du caractère échappé par le dernier "\\"
+    # Seuls ", \, { et } comptent : on saute directement de l'un à l'autre
+    for match in _STRUCTURAL.finditer(text, brace):
+        index = match.start()
+        if index == escaped:
+            continue
+        char = match.group()
+        if in_string:
+            if char == "\\":
+                escaped = index + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return None
+
+
+def extract_json_object(text):
+    """
+    Retourne le premier objet JSON valide de premier niveau trouvé dans `text`.
+
+    Chaque candidat (`{` suivi d'une clé ou de `}`) est décodé directement ;
+    s'il est invalide, ses accolades sont appariées (en tenant compte des
+    chaînes et des échappements) pour reprendre la recherche après lui, ce
+    qui garde un coût linéaire. Les blocs de code non JSON (```python...)
+    situés hors d'un objet sont sautés ; seul un ``` en début de ligne ouvre
+    un bloc. Les caractères de contrôle bruts
+    dans les chaînes (sauts de ligne non échappés) sont acceptés.
+
+    Returns:
+        dict: L'objet décodé, ou None si aucun objet valide n'est trouvé.
+    """
+    if not text:
+        return None
+    pos = 0
+    while True:
+        candidate = _OBJECT_START.search(text, pos)
+        if candidate is None:
+            return None
+        brace = candidate.start()
+        match = _FENCE.search(text, pos, brace)
+        if match is not None:
+            fence = match.end() - 3
+            skip_to = _fence_end(text, fence)
+            pos = fence + 3 if skip_to is None else skip_to
+            continue
+
+        try:
+            return _DECODER.raw_decode(text, brace)[0]
+        except ValueError:
+            pass
+        end = _balanced_end(text, brace)
+        if end is None:
+            return None  # Objet non terminé (réponse tronquée)
+        pos = end
@@ -0,0 +1,55 @@
+import sys
+import os
+import re
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.prompts.context_builder import focus_from_plan, slice_module
+
+CODE = "import os\n\n\nclass Store:\n" + "".join(
+    f"    def method_{i}(self):\n        value = {i}\n        value += 1\n        return value\n\n"
+    for i in range(8)
+) + "\ndef main():\n    return Store()\n"
+
+
+def original_line(sliced, index):
+    """Original line number of sliced line `index`, computed from the # L<n> markers"""
+    current = 1
+    for line in sliced.splitlines()[:index]:
+        match = re.fullmatch(r"\s*# L(\d+)", line)
+        current = int(match.group(1)) if match else current + 1
+    return current
+
+
+def test_markers_keep_original_line_numbers():
+    """A line reported by pylint can be found in the sliced code with its original number"""
+    lines = CODE.splitlines()
+    target = lines.index("        value = 6") + 1
+    sliced, cut = slice_module(CODE, focus_lines=[target], token_budget=175)
+    assert cut
+    out = sliced.splitlines()
+    assert "        value = 6" in out
+    assert "        value = 2" not in out  # method_2 reduced to its signature
+    index = out.index("        value = 6")
+    assert original_line(sliced, index) == target
+    # Every kept original line sits at its original number
+    for i, line in enumerate(out):
+        if line.strip() and not re.fullmatch(r"\s*# L\d+", line) and "omises" not in line and '"""' not in line:
+            assert lines[original_line(sliced, i) - 1] == line
+
+
+def test_small_file_is_not_sliced():
+    assert slice_module(CODE, token_budget=0) == (CODE, False)
+    assert slice_module(CODE, token_budget=10_000) == (CODE, False)
+
+
+def test_focus_from_plan_keeps_defined_names():
+    """Ordinary words of the plan are ignored, only names defined in the module are kept"""
+    plan = [{"step": "Simplify method_3 in Store and the main entry point (line 12)",
+             "rationale": "the value is returned twice"}]
+    lines, names = focus_from_plan(plan, CODE)
+    assert lines == [12]
+    assert set(names) == {"method_3", "Store", "main"}
+    # Without the module, every identifier-like word is kept (previous behaviour)
+    assert "Simplify" in focus_from_plan(plan)[1]
@@ -0,0 +1,45 @@
+import sys
+import os
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.convergence import ConvergenceTracker, content_hash
+
+
+def test_plateau_needs_green_tests():
+    """A stable score is only a plateau once the tests pass"""
+    tracker = ConvergenceTracker(min_delta=0.1, patience=2)
+    for score in (8.0, 8.05, 8.02):
+        tracker.observe_score(score)
+    assert not tracker.plateau()
+    tracker.remember_judge("h", False, (True, "ok", []))
+    assert tracker.plateau()
+
+
+def test_no_plateau_while_improving():
+    """A gain of at least min_delta within the window keeps the loop going"""
+    tracker = ConvergenceTracker(min_delta=0.1, patience=2)
+    tracker.tests_ok = True
+    tracker.observe_score(7.0)
+    tracker.observe_score(7.05)
+    assert not tracker.plateau()  # Not enough iterations yet
+    tracker.observe_score(7.5)
+    assert not tracker.plateau()
+    tracker.observe_score(7.52)
+    tracker.observe_score(7.55)
+    assert tracker.plateau()
+
+
+def test_audit_and_judge_reuse():
+    """Audit and Judge results are reused only for the same content"""
+    tracker = ConvergenceTracker()
+    first, second = content_hash("a = 1\n"), content_hash("a = 2\n")
+    tracker.remember_audit(first, {"score": 5}, ["plan"])
+    assert tracker.cached_audit(first) == ({"score": 5}, ["plan"])
+    assert tracker.cached_audit(second) is None
+
+    tracker.remember_judge(first, False, (False, "failed", ["t.py"]))
+    assert tracker.cached_judge(first, False) == (False, "failed", ["t.py"])
+    assert tracker.cached_judge(first, True) is None
+    assert tracker.tests_ok is False
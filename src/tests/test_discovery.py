@@ -0,0 +1,53 @@
+import sys
+import os
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.discovery import IncrementalState, discover_files
+
+
+def make_tree(tmp_path):
+    for rel in ("a.py", "notes.txt", "pkg/b.py", "pkg/test_b.py", "legacy/old.py",
+                "__pycache__/a.cpython-311.py", ".venv/lib.py"):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x = 1\n", encoding="utf-8")
+
+
+def rel_paths(tmp_path, files):
+    return [os.path.relpath(f, tmp_path).replace(os.sep, "/") for f in files]
+
+
+def test_discover_recursive(tmp_path):
+    """Python files of every sub-folder, except caches and virtualenvs"""
+    make_tree(tmp_path)
+    found = rel_paths(tmp_path, discover_files(tmp_path))
+    assert found == ["a.py", "legacy/old.py", "pkg/b.py", "pkg/test_b.py"]
+
+
+def test_discover_include_exclude(tmp_path):
+    """Exclude patterns apply to file names and folders; --no-recursive stays at the top"""
+    make_tree(tmp_path)
+    found = rel_paths(tmp_path, discover_files(tmp_path, exclude=["test_*.py", "legacy"]))
+    assert found == ["a.py", "pkg/b.py"]
+    assert rel_paths(tmp_path, discover_files(tmp_path, include=["pkg/*.py"])) == ["pkg/b.py", "pkg/test_b.py"]
+    assert rel_paths(tmp_path, discover_files(tmp_path, recursive=False)) == ["a.py"]
+
+
+def test_incremental_state(tmp_path):
+    """A recorded file is skipped until its content or the pipeline version changes"""
+    source = tmp_path / "a.py"
+    source.write_text("x = 1\n", encoding="utf-8")
+    state_file = str(tmp_path / "state.json")
+
+    state = IncrementalState(state_file, version="v1")
+    assert state.needs_processing(str(source))
+    state.record(str(source))
+    assert not state.needs_processing(str(source))
+
+    # State reloaded from disk by the next run
+    assert not IncrementalState(state_file, version="v1").needs_processing(str(source))
+    assert IncrementalState(state_file, version="v2").needs_processing(str(source))
+    source.write_text("x = 2\n", encoding="utf-8")
+    assert IncrementalState(state_file, version="v1").needs_processing(str(source))
@@ -0,0 +1,103 @@
+import sys
+import os
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.prompts.json_parsing import JsonStreamParser, REQUIRED_KEYS, extract_json_object
+
+
+def stream(text, expect="auditor", chunk_size=3):
+    """Feeds `text` in small chunks, as a streamed LLM response would arrive"""
+    parser = JsonStreamParser(REQUIRED_KEYS[expect])
+    for i in range(0, len(text), chunk_size):
+        if not parser.feed(text[i:i + chunk_size]):
+            break
+    return parser
+
+
+def test_stream_complete_object():
+    """Reading stops at the end of the object, surrounding text is dropped"""
+    parser = stream('```json\n{"refactoring_plan": [{"x": "}"}]}\n```\nThanks!')
+    assert parser.done and parser.error is None
+    assert parser.json_text() == '{"refactoring_plan": [{"x": "}"}]}'
+
+
+def test_stream_skips_prose_braces():
+    """Braces in prose before the JSON are not taken as its start"""
+    text = 'Here {braces} and {"a" b} are examples. {"refactoring_plan": []}'
+    parser = stream(text)
+    assert parser.done and parser.error is None
+    assert extract_json_object(parser.json_text()) == extract_json_object(text) == {"refactoring_plan": []}
+
+
+def test_stream_rejects_wrong_value_type():
+    """A known key with a value of the wrong type cancels the response"""
+    parser = stream('{"code_corrige": ["not", "a", "string"]}', expect="fixer")
+    assert parser.error and "code_corrige" in parser.error
+    # Reported as soon as the value starts, before the closing brace
+    parser = JsonStreamParser(REQUIRED_KEYS["fixer"])
+    assert not parser.feed('{"code_corrige": [')
+    assert parser.error and "code_corrige" in parser.error and not parser.done
+
+
+def test_stream_rejects_mismatched_bracket_early():
+    """After the first key, a mismatched bracket cancels the response at once"""
+    parser = JsonStreamParser(REQUIRED_KEYS["auditor"])
+    assert not parser.feed('{"refactoring_plan": [{"x": 1]')
+    assert parser.error and not parser.done
+    # Before the first key it may still be prose: the candidate is skipped
+    assert stream('Prose {"a" ] here}. {"refactoring_plan": []}').done
+
+
+def test_stream_many_false_candidates():
+    """Prose candidates are decoded from their own text, the result is unchanged"""
+    text = 'x {"a" b} ' * 200 + '{"refactoring_plan": []}'
+    parser = JsonStreamParser(REQUIRED_KEYS["auditor"], max_prefix=10 ** 6)
+    for i in range(0, len(text), 7):
+        parser.feed(text[i:i + 7])
+    assert parser.done and parser.error is None
+    assert parser.json_text() == '{"refactoring_plan": []}'
+    assert parser.text == text
+
+
+def test_stream_rejects_missing_keys():
+    """A complete object without any expected key cancels the response"""
+    assert stream('{"other": 1}').error
+
+
+def test_stream_rejects_long_prefix():
+    """No object within the tolerated prefix cancels the response"""
+    parser = JsonStreamParser(max_prefix=50)
+    assert not parser.feed("x" * 60)
+    assert parser.error and not parser.done
+
+
+def test_extract_skips_prose_braces():
+    """Invalid candidates are skipped until a valid object is found"""
+    text = 'Here {braces} and {"a" b} are examples. {"plan": [1, 2]} and {"other": 1}'
+    assert extract_json_object(text) == {"plan": [1, 2]}
+
+
+def test_extract_inline_backticks_are_not_a_fence():
+    """``` in the middle of a line does not open a code block"""
+    text = 'Use ```python blocks. {"plan": []}'
+    assert extract_json_object(text) == {"plan": []}
+    parser = stream(text.replace("plan", "refactoring_plan"))
+    assert parser.done and parser.error is None
+
+
+def test_extract_skips_code_fences():
+    """Objects inside a non-JSON code block are ignored, ```json blocks are read"""
+    text = 'Before:\n```python\nconfig = {"debug": True}\n```\n```json\n{"refactoring_plan": []}\n```'
+    assert extract_json_object(text) == {"refactoring_plan": []}
+    parser = stream(text)
+    assert parser.done and parser.error is None
+    assert parser.json_text() == '{"refactoring_plan": []}'
+
+
+def test_extract_raw_newlines_and_truncation():
+    """Raw newlines in strings are accepted; an unfinished object gives None"""
+    assert extract_json_object('{"code_corrige": "a = 1\nb = 2\n"}') == {"code_corrige": "a = 1\nb = 2\n"}
+    assert extract_json_object('{"code_corrige": "a = 1') is None
+    assert extract_json_object("no json here") is None
@@ -0,0 +1,55 @@
+import sys
+import os
+import time
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.llm_cache import LLMCache, cache_key
+
+
+def test_cache_key():
+    """The key depends on both the model and the prompt"""
+    assert cache_key("m1", "prompt") == cache_key("m1", "prompt")
+    assert cache_key("m1", "prompt") != cache_key("m2", "prompt")
+    assert cache_key("m1", "prompt") != cache_key("m1", "prompt ")
+
+
+def test_put_get_discard(tmp_path):
+    """A stored response is served again until it is discarded"""
+    cache = LLMCache(str(tmp_path))
+    assert cache.get("model", "prompt") is None
+    cache.put("model", "prompt", "réponse")
+    assert cache.get("model", "prompt") == "réponse"
+    assert cache.get("other-model", "prompt") is None
+    cache.discard("model", "prompt")
+    assert cache.get("model", "prompt") is None
+    assert cache.stats() == {"hits": 1, "misses": 3}
+
+
+def test_disabled_and_refresh(tmp_path):
+    """--no-cache neither reads nor writes; --refresh-cache only writes"""
+    disabled = LLMCache(str(tmp_path), enabled=False)
+    disabled.put("model", "prompt", "ignored")
+    assert not any(tmp_path.iterdir())
+
+    refresh = LLMCache(str(tmp_path), refresh=True)
+    refresh.put("model", "prompt", "new")
+    assert refresh.get("model", "prompt") is None
+    assert LLMCache(str(tmp_path)).get("model", "prompt") == "new"
+
+
+def test_lru_eviction(tmp_path):
+    """Past max_bytes, the least recently used entries are removed first"""
+    content = "x" * 1000
+    cache = LLMCache(str(tmp_path), max_bytes=3500)
+    for i in range(3):
+        cache.put("model", f"prompt {i}", content)
+        past = time.time() - 100 + i
+        os.utime(cache._path(cache_key("model", f"prompt {i}")), (past, past))
+    assert cache.get("model", "prompt 0") == content  # Now the most recently used
+
+    cache.put("model", "prompt 3", content)
+    assert cache.get("model", "prompt 1") is None
+    assert cache.get("model", "prompt 0") == content
+    assert cache.get("model", "prompt 3") == content
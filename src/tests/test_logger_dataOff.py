@@ -1,8 +1,11 @@
 import sys
 import os
+import json
+import tempfile
 # Add src directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from utils import logger
 from utils.logger import log_experiment, ActionType
 
 def test_logger_normal():
@@ -99,6 +102,61 @@ def test_different_actions():
     
     return success_count == len(actions)
 
+def test_logger_jsonl_backend():
+    """Test 5: Append-only JSONL mode, reader and converter"""
+    print("\n🧪 Test 5: JSONL backend...")
+    old_format, old_jsonl = logger.LOG_FORMAT, logger.LOG_FILE_JSONL
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = os.path.join(tmp, "experiment_data.jsonl")
+        json_path = os.path.join(tmp, "experiment_data.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump([{"id": "legacy", "agent": "Old"}], f)
+        try:
+            logger.LOG_FILE_JSONL = jsonl_path
+            logger.set_log_format("jsonl")
+            for i in range(3):
+                log_experiment(
+                    agent_name="DataOfficer_Test",
+                    model_used="gemini-2.5-flash",
+                    action=ActionType.FIX,
+                    details={"input_prompt": f"Prompt {i}\nmulti-line", "output_response": f"Réponse {i}"},
+                    status="SUCCESS"
+                )
+            logger.flush_logs()
+
+            with open(jsonl_path, encoding="utf-8") as f:
+                assert len(f.readlines()) == 3  # One line per entry
+            entries = logger.read_experiments(jsonl_path)
+            assert [e["details"]["input_prompt"] for e in entries] == [f"Prompt {i}\nmulti-line" for i in range(3)]
+
+            assert logger.convert_jsonl_to_json(jsonl_path, json_path) == 4
+            assert not os.path.exists(jsonl_path)
+            data = logger.read_experiments(json_path)
+            assert data[0]["id"] == "legacy" and data[-1]["details"]["output_response"] == "Réponse 2"
+        finally:
+            logger.set_log_format(old_format)
+            logger.LOG_FILE_JSONL = old_jsonl
+    print("✅ Test 5 SUCCESS: JSONL entries appended, read back and converted")
+    return True
+
+def test_log_format_from_env():
+    """Test 6: Unknown LOG_FORMAT is rejected at import time"""
+    print("\n🧪 Test 6: LOG_FORMAT validation...")
+    import subprocess
+    src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    result = subprocess.run(
+        [sys.executable, "-c", "from utils import logger"],
+        cwd=src_dir, env={**os.environ, "LOG_FORMAT": "jsonlines"}, capture_output=True, text=True
+    )
+    assert result.returncode != 0 and "Format de logs invalide" in result.stderr
+    try:
+        logger.set_log_format("jsonlines")
+        assert False, "set_log_format should reject an unknown format"
+    except ValueError:
+        pass
+    print("✅ Test 6 SUCCESS: Unknown log format rejected")
+    return True
+
 def main():
     """Main function"""
     print("=" * 60)
@@ -115,6 +173,8 @@ def main():
     results.append(test_logger_missing_prompt())
     results.append(test_logger_missing_response())
     results.append(test_different_actions())
+    results.append(test_logger_jsonl_backend())
+    results.append(test_log_format_from_env())
     
     # Display summary
     print("\n" + "=" * 60)
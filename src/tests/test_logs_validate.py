@@ -0,0 +1,60 @@
+import sys
+import os
+import json
+
+import pytest
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.logger import _iter_json_array, iter_experiments
+from src.utils.logs_validate import validate_logs
+
+
+def write_log(tmp_path, text, name="experiment_data.json"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("text", [
+    '[{"a": 1}, {"b": 2}]',
+    '[\n  {"a": 1},\n  {"b": 2}\n]\n',
+    '[{"a": 1} ,{"b": 2}]',
+])
+def test_valid_arrays(tmp_path, text):
+    """Whitespace around the commas is accepted"""
+    assert list(iter_experiments(write_log(tmp_path, text))) == [{"a": 1}, {"b": 2}]
+
+
+def test_empty_array_and_file(tmp_path):
+    assert list(iter_experiments(write_log(tmp_path, "[ ]"))) == []
+    assert list(iter_experiments(write_log(tmp_path, ""))) == []
+
+
+@pytest.mark.parametrize("text", [
+    '[{"a": 1} {"b": 2}]',    # Missing comma
+    '[{"a": 1},, {"b": 2}]',  # Doubled comma
+    '[{"a": 1}, {"b": 2},]',  # Trailing comma
+    '[, {"a": 1}]',           # Leading comma
+    '[{"a": 1}, {"b": 2}',    # Unterminated
+])
+def test_malformed_arrays(tmp_path, text):
+    """Comma errors are reported, not skipped like whitespace"""
+    path = write_log(tmp_path, text)
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_experiments(path))
+    result = validate_logs([path])
+    assert not result["valid"]
+    assert "Invalid JSON format" in result["errors"][0]
+
+
+def test_small_chunks(tmp_path):
+    """Elements and delimiters split across read chunks are decoded the same way"""
+    entries = [{"id": i, "text": "x" * i} for i in range(20)]
+    path = write_log(tmp_path, json.dumps(entries, indent=2))
+    with open(path, "r", encoding="utf-8") as f:
+        assert list(_iter_json_array(f, chunk_size=7)) == entries
+    with open(write_log(tmp_path, '[{"a": 1},\n,{"b": 2}]'), "r", encoding="utf-8") as f:
+        with pytest.raises(json.JSONDecodeError):
+            list(_iter_json_array(f, chunk_size=3))
@@ -0,0 +1,62 @@
+import sys
+import os
+
+import pytest
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src import orchestrator
+from src.utils.convergence import content_hash
+
+
+@pytest.fixture
+def resumed(tmp_path, monkeypatch):
+    """A file whose previous run stopped right after the Fix of `iteration`, and the judged contents"""
+    source = tmp_path / "a.py"
+    source.write_text("x = 2\n", encoding="utf-8")
+    judged = []
+
+    def judge(abs_path, full_suite=False):
+        judged.append(source.read_text(encoding="utf-8"))
+        return True, "ok", []
+
+    monkeypatch.setattr(orchestrator, "lire_fichier", lambda path: open(path, encoding="utf-8").read())
+    monkeypatch.setattr(orchestrator, "run_pylint", lambda path: {"score": 9.5})
+    monkeypatch.setattr(orchestrator, "run_judge", judge)
+    monkeypatch.setattr(orchestrator, "log_experiment", lambda *args, **kwargs: None)
+    monkeypatch.setattr(orchestrator, "test_selector", None)
+    monkeypatch.setattr(orchestrator, "version_store", None)
+    monkeypatch.setattr(orchestrator, "run_manifest", None)  # Restored after the test
+
+    def stop_after_fix(iteration):
+        manifest = str(tmp_path / "manifest.json")
+        orchestrator.set_run_manifest(manifest)
+        orchestrator.checkpoint(str(source), iteration - 1, "Judge", "before", tests_ok=True)
+        orchestrator.checkpoint(str(source), iteration, "Fix", content_hash("x = 2\n"), tests_ok=None, fixer_idle=False)
+        orchestrator.set_run_manifest(manifest, resume=True)
+        return str(source)
+
+    return stop_after_fix, judged
+
+
+def test_resume_after_fix_runs_the_judge(resumed):
+    """The fixed code is tested in the same iteration instead of moving on to the next one"""
+    stop_after_fix, judged = resumed
+    run = orchestrator.FileRun(stop_after_fix(2), max_iterations=5)
+    assert orchestrator.stage_start(None, run) == "Judge"
+    assert run.iteration == 2 and run.current_score == 9.5
+    assert orchestrator.stage_judge(None, run) is None
+    assert judged == ["x = 2\n"]
+    assert run.status == "done" and run.convergence.tests_ok is True
+
+
+def test_resume_after_fix_on_last_iteration(resumed):
+    """On the last iteration the Judge still runs: the file is not 'already done' with a stale result"""
+    stop_after_fix, judged = resumed
+    path = stop_after_fix(3)
+    assert orchestrator.run_manifest.get(path)["tests_ok"] is None
+    run = orchestrator.run_stages(orchestrator.FileRun(path, max_iterations=3))
+    assert judged == ["x = 2\n"]
+    assert run.status == "done" and run.convergence.tests_ok is True
+    assert orchestrator.run_manifest.get(path)["stage"] == "Judge"
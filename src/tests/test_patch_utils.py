@@ -0,0 +1,92 @@
+import sys
+import os
+
+import pytest
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.patch_utils import PatchError, apply_fixer_patch, apply_function_hunks, apply_unified_diff
+
+ORIGINAL = '''import os
+
+
+class User:
+    def __init__(self, nom):
+        self.nom = nom
+
+    def greet(self):
+        return "hi " + self.nom
+
+
+def helper(x):
+    return x+1
+
+
+if __name__ == "__main__":
+    print(helper(1))
+'''
+
+
+def test_replace_method():
+    """An existing method is replaced in place, with the class indentation"""
+    code = apply_function_hunks(ORIGINAL, [
+        {"target": "User.greet", "code": "def greet(self):\n    return f\"hi {self.nom}\"\n"},
+    ])
+    assert '        return f"hi {self.nom}"' in code
+    assert '"hi " + self.nom' not in code
+    namespace = {}
+    exec(code.replace('if __name__ == "__main__"', "if False"), namespace)
+    assert namespace["User"]("Ana").greet() == "hi Ana"
+
+
+def test_insert_function_before_main_guard():
+    """A new top-level function goes before the __main__ guard"""
+    code = apply_function_hunks(ORIGINAL, [{"target": "other", "code": "def other():\n    return 2\n"}])
+    assert code.index("def other():") < code.index('if __name__ == "__main__":')
+    assert "\ndef other():" in code
+
+
+def test_insert_method_in_class():
+    """A new "Class.method" target is added inside the class body"""
+    code = apply_function_hunks(ORIGINAL, [
+        {"target": "User.name", "code": "def name(self):\n    return self.nom\n"},
+    ])
+    namespace = {}
+    exec(code.replace('if __name__ == "__main__"', "if False"), namespace)
+    assert namespace["User"]("Ana").name() == "Ana"
+    assert "    def name(self):\n        return self.nom" in code
+
+
+def test_insert_method_without_class():
+    """A new method whose class does not exist is rejected"""
+    with pytest.raises(PatchError):
+        apply_function_hunks(ORIGINAL, [{"target": "Missing.name", "code": "def name(self):\n    pass\n"}])
+
+
+def test_unified_diff():
+    """A diff applies even when its line numbers are slightly off"""
+    diff = "\n".join([
+        "--- a/user.py",
+        "+++ b/user.py",
+        "@@ -3,1 +3,2 @@",
+        " import os",
+        "+import sys",
+    ])
+    code = apply_unified_diff(ORIGINAL, diff)
+    assert code.startswith("import os\nimport sys\n")
+
+
+def test_unified_diff_context_mismatch():
+    """A diff whose context is not in the file is rejected, and the fixer falls back"""
+    diff = "@@ -12,2 +12,2 @@\n def helper(y):\n-    return y+1\n+    return y + 1\n"
+    with pytest.raises(PatchError):
+        apply_unified_diff(ORIGINAL, diff)
+    with pytest.raises(PatchError):
+        apply_fixer_patch(ORIGINAL, {"patch": diff})
+
+
+def test_patched_code_must_compile():
+    """A hunk that breaks the syntax is refused"""
+    with pytest.raises(PatchError):
+        apply_fixer_patch(ORIGINAL, {"hunks": [{"target": "helper", "code": "def helper(x:\n    return x\n"}]})
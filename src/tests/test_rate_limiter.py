@@ -0,0 +1,87 @@
+import sys
+import os
+import time
+
+import pytest
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.rate_limiter import RateLimiter, is_quota_error, retry_after
+
+
+class QuotaError(Exception):
+    pass
+
+
+def test_quota_error_detection():
+    """429 / quota errors are retried, other errors are not"""
+    assert is_quota_error(QuotaError("429 Resource has been exhausted"))
+    assert is_quota_error(Exception("ResourceExhausted: quota exceeded"))
+    assert not is_quota_error(ValueError("invalid prompt"))
+
+
+def test_retry_after_parsing():
+    """The delay suggested by the API is read from the error message"""
+    assert retry_after(Exception("retry_delay { seconds: 12 }")) == 12.0
+    assert retry_after(Exception("Please retry in 3.5s.")) == 3.5
+    assert retry_after(Exception("Retry-After: 7")) == 7.0
+    assert retry_after(Exception("429 quota exceeded")) is None
+
+
+def test_burst_then_wait():
+    """`burst` calls leave immediately, the next one waits for a new token"""
+    limiter = RateLimiter(rpm=600, burst=2)  # One token every 0.1 s
+    start = time.monotonic()
+    limiter.acquire()
+    limiter.acquire()
+    assert time.monotonic() - start < 0.05
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.08
+
+
+def test_unlimited_rate():
+    """rpm=0 never blocks"""
+    limiter = RateLimiter(rpm=0, burst=1)
+    start = time.monotonic()
+    for _ in range(50):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.05
+
+
+def test_call_retries_quota_errors():
+    """A 429 is retried after the suggested delay, then the result is returned"""
+    limiter = RateLimiter(rpm=0, max_retries=2)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise QuotaError("429 too many requests, retry in 0s")
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert len(attempts) == 3
+
+
+def test_call_gives_up():
+    """Other errors, and a 429 past max_retries, are raised to the caller"""
+    limiter = RateLimiter(rpm=0, max_retries=1)
+    attempts = []
+
+    def always_quota():
+        attempts.append(1)
+        raise QuotaError("429 quota, retry in 0s")
+
+    with pytest.raises(QuotaError):
+        limiter.call(always_quota)
+    assert len(attempts) == 2
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    attempts.clear()
+    with pytest.raises(ValueError):
+        limiter.call(broken)
+    assert len(attempts) == 1
@@ -0,0 +1,79 @@
+import sys
+import os
+import json
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.run_manifest import RunManifest
+
+
+def test_checkpoint_and_resume(tmp_path):
+    """Each checkpoint is saved to disk and read back by the next run with --resume"""
+    path = str(tmp_path / "manifest.json")
+    target = str(tmp_path / "a.py")
+    manifest = RunManifest(path)
+    manifest.checkpoint(target, 1, "Audit", "h1", 6.0, plan=["fix names"])
+    manifest.checkpoint(target, 1, "Judge", "h1", tests_ok=False)
+    manifest.checkpoint(target, 2, "Audit", "h2", 5.0, plan=[])
+
+    state = RunManifest(path, resume=True).get(target)
+    assert state["status"] == "in_progress"
+    assert (state["iteration"], state["stage"], state["hash"]) == (2, "Audit", "h2")
+    assert state["best_score"] == 6.0
+    # Audit done on this content: resume at the Fixer of the same iteration
+    assert RunManifest(path, resume=True).resume_point(target, "h2") == (2, "Fix")
+    # Content changed since the checkpoint: the iteration is redone
+    assert RunManifest(path, resume=True).resume_point(target, "other") == (2, "Lint")
+
+    manifest.finish(target, "done")
+    assert RunManifest(path, resume=True).resume_point(target, "h2") == (None, None)
+
+
+def test_resume_after_judge_starts_next_iteration(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    target = str(tmp_path / "a.py")
+    RunManifest(path).checkpoint(target, 2, "Judge", "h", tests_ok=True)
+    assert RunManifest(path, resume=True).resume_point(target, "h") == (3, "Lint")
+
+
+def test_resume_after_fix_runs_the_judge(tmp_path):
+    """A run stopped between Fix and Judge tests the fixed code before moving on"""
+    path = str(tmp_path / "manifest.json")
+    target = str(tmp_path / "a.py")
+    manifest = RunManifest(path)
+    manifest.checkpoint(target, 1, "Judge", "h1", tests_ok=True)
+    manifest.checkpoint(target, 2, "Fix", "h2", tests_ok=None)
+
+    resumed = RunManifest(path, resume=True)
+    assert resumed.resume_point(target, "h2") == (2, "Judge")
+    # The previous iteration's result does not stand for the fixed code
+    assert resumed.get(target)["tests_ok"] is None
+
+
+def test_resume_after_fix_on_last_iteration(tmp_path):
+    """After the Fix of the last iteration the Judge still runs, the file is not reported as done"""
+    path = str(tmp_path / "manifest.json")
+    target = str(tmp_path / "a.py")
+    max_iterations = 3
+    manifest = RunManifest(path)
+    manifest.checkpoint(target, max_iterations, "Judge", "h1", tests_ok=True)
+    manifest.checkpoint(target, max_iterations, "Fix", "h2", tests_ok=None)
+
+    iteration, stage = RunManifest(path, resume=True).resume_point(target, "h2")
+    assert (iteration, stage) == (max_iterations, "Judge")
+    assert iteration <= max_iterations
+
+
+def test_new_run_resets_manifest(tmp_path):
+    """Without --resume the previous manifest is overwritten and nothing is resumed"""
+    path = str(tmp_path / "manifest.json")
+    target = str(tmp_path / "a.py")
+    RunManifest(path).checkpoint(target, 2, "Judge", "h", tests_ok=True)
+
+    manifest = RunManifest(path)
+    assert manifest.get(target) is None
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f)["files"] == {}
+    assert manifest.resume_point(target, "h") == (1, "Lint")
+    assert RunManifest(path, resume=True).get(target) is None
@@ -0,0 +1,122 @@
+import sys
+import os
+import stat
+
+import pytest
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils import toolsmith_utils
+from src.utils.toolsmith_utils import Sandbox, SandboxError, run_pylint, run_pylint_batch, set_sandbox_root
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """root/ is the sandbox, tests/ a read-only extra root, outside.py is out of both"""
+    root, tests = tmp_path / "root", tmp_path / "tests"
+    root.mkdir()
+    tests.mkdir()
+    (root / "a.py").write_text("x = 1\n", encoding="utf-8")
+    (tests / "test_a.py").write_text("def test_a():\n    pass\n", encoding="utf-8")
+    (tmp_path / "outside.py").write_text("secret = 1\n", encoding="utf-8")
+    return tmp_path
+
+
+def test_rejects_paths_out_of_the_root(tree):
+    sandbox = Sandbox(tree / "root")
+    assert sandbox.read("a.py") == "x = 1\n"
+    for path in ("../outside.py", "sub/../../outside.py", str(tree / "outside.py")):
+        with pytest.raises(SandboxError):
+            sandbox.read(path)
+        with pytest.raises(SandboxError):
+            sandbox.write(path, "x = 2\n")
+        assert not sandbox.exists(path)
+    assert (tree / "outside.py").read_text(encoding="utf-8") == "secret = 1\n"
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not available")
+def test_rejects_symlinks_escaping_the_root(tree):
+    """A link inside the root is resolved: its target decides"""
+    root = tree / "root"
+    try:
+        os.symlink(tree / "outside.py", root / "link.py")
+    except OSError:
+        pytest.skip("symlinks not permitted")
+    os.symlink(root / "a.py", root / "inner.py")
+    sandbox = Sandbox(root)
+    with pytest.raises(SandboxError):
+        sandbox.read("link.py")
+    with pytest.raises(SandboxError):
+        sandbox.write("link.py", "x = 2\n")
+    assert sandbox.read("inner.py") == "x = 1\n"
+
+
+def test_extra_roots_are_read_only(tree):
+    sandbox = Sandbox(tree / "root", extra_roots=[tree / "tests"])
+    test_file = str(tree / "tests" / "test_a.py")
+    assert sandbox.exists(test_file)
+    assert sandbox.read(test_file).startswith("def test_a")
+    with pytest.raises(SandboxError):
+        sandbox.write(test_file, "")
+    assert "pass" in (tree / "tests" / "test_a.py").read_text(encoding="utf-8")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX file modes")
+def test_atomic_write_keeps_the_file_mode(tree):
+    """The temporary file takes the mode of the replaced file and does not stay behind"""
+    target = tree / "root" / "a.py"
+    os.chmod(target, 0o750)
+    sandbox = Sandbox(tree / "root")
+    assert sandbox.write("a.py", "x = 2\n") == str(target.resolve())
+    assert stat.S_IMODE(os.stat(target).st_mode) == 0o750
+    assert target.read_text(encoding="utf-8") == "x = 2\n"
+    assert os.listdir(tree / "root") == ["a.py"]
+    # New files are created in missing sub-folders
+    sandbox.write("pkg/b.py", "y = 1\n")
+    assert (tree / "root" / "pkg" / "b.py").read_text(encoding="utf-8") == "y = 1\n"
+
+
+def test_cache_is_revalidated_by_stat(tree, monkeypatch):
+    """Unchanged files are served from memory; a change on disk is read again"""
+    sandbox = Sandbox(tree / "root")
+    opened = []
+    real_open = open
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(toolsmith_utils, "open", counting_open, raising=False)
+    assert sandbox.read("a.py") == "x = 1\n"
+    first_hash = sandbox.content_hash("a.py")
+    assert sandbox.read("a.py") == "x = 1\n"
+    assert sandbox.read_bytes("a.py") == b"x = 1\n"
+    assert len(opened) == 1
+
+    # Changed behind the sandbox's back (other size and mtime)
+    target = tree / "root" / "a.py"
+    target.write_text("x = 10\n", encoding="utf-8")
+    os.utime(target, ns=(os.stat(target).st_atime_ns, os.stat(target).st_mtime_ns + 1_000_000))
+    assert sandbox.read("a.py") == "x = 10\n"
+    assert sandbox.content_hash("a.py") != first_hash
+    assert len(opened) == 2
+
+    os.remove(target)
+    with pytest.raises(FileNotFoundError):
+        sandbox.read("a.py")
+
+
+def test_pylint_out_of_sandbox_returns_an_error(tree, monkeypatch):
+    """run_pylint / run_pylint_batch report the path instead of raising SandboxError"""
+    monkeypatch.setattr(toolsmith_utils, "_sandbox", None)  # Restored after the test
+    set_sandbox_root(tree / "root")
+
+    result = run_pylint("../outside.py")
+    assert result["success"] is False and result["score"] == 0
+    assert "hors de la sandbox" in result["message"]
+    assert run_pylint("missing.py")["message"] == "Fichier introuvable"
+
+    results = run_pylint_batch(["../outside.py", "missing.py"])
+    assert results["../outside.py"]["success"] is False
+    assert results[str(tree.resolve() / "root" / "missing.py")]["message"] == "Fichier introuvable"
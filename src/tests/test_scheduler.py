@@ -0,0 +1,63 @@
+import sys
+import os
+import threading
+
+import pytest
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.scheduler import StageScheduler
+
+
+class Task:
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+        self.threads = []
+
+
+def make_stages():
+    """Lint on the local pool, Audit on the llm pool, then back to Judge on the local pool"""
+    def step(next_stage):
+        def run(task):
+            task.threads.append(threading.current_thread().name)
+            if task.fail and next_stage is None:
+                raise RuntimeError(f"{task.name} failed")
+            return next_stage
+        return run
+
+    return {
+        "Lint": ("local", step("Audit")),
+        "Audit": ("llm", step("Judge")),
+        "Judge": ("local", step(None)),
+    }
+
+
+def test_tasks_flow_across_pools():
+    """Each stage runs on its own pool and every task reaches on_done"""
+    tasks = [Task(f"t{i}") for i in range(4)]
+    done = []
+    StageScheduler(make_stages(), {"llm": 2, "local": 1}).run(tasks, "Lint", on_done=done.append)
+
+    assert sorted(t.name for t in done) == ["t0", "t1", "t2", "t3"]
+    for task in tasks:
+        pools = [name.split("_")[0] for name in task.threads]
+        assert pools == ["stage-local", "stage-llm", "stage-local"]
+
+
+def test_on_error_isolates_the_failing_task():
+    """A failing stage abandons its task only; the others complete"""
+    tasks = [Task("ok1"), Task("boom", fail=True), Task("ok2")]
+    done, errors = [], []
+    StageScheduler(make_stages(), {"llm": 1, "local": 2}).run(
+        tasks, "Lint", on_done=done.append, on_error=lambda task, e: errors.append((task.name, str(e)))
+    )
+
+    assert sorted(t.name for t in done) == ["ok1", "ok2"]
+    assert errors == [("boom", "boom failed")]
+
+
+def test_error_without_handler_is_raised():
+    with pytest.raises(RuntimeError):
+        StageScheduler(make_stages(), {"llm": 1, "local": 1}).run([Task("boom", fail=True)], "Lint")
@@ -0,0 +1,61 @@
+import sys
+import os
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.test_selector import TestSelector, _import_name, _parse_imports
+
+
+def write(path, text=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def make_project(tmp_path):
+    """src/pkg layout (src is not a package) with the tests in a separate folder"""
+    write(tmp_path / "src" / "pkg" / "__init__.py")
+    core = write(tmp_path / "src" / "pkg" / "core.py", "def a():\n    return 1\n")
+    util = write(tmp_path / "src" / "pkg" / "util.py", "def b():\n    return 2\n")
+    write(tmp_path / "src" / "pkg" / "api.py", "from .core import a\n")
+    alone = write(tmp_path / "src" / "pkg" / "alone.py", "X = 1\n")
+    test_core = write(tmp_path / "tests" / "test_core.py", "import pkg.core\n")
+    test_util = write(tmp_path / "tests" / "test_util.py", "from pkg.util import b\n")
+    test_api = write(tmp_path / "tests" / "test_api.py", "from pkg import api\n")
+    selector = TestSelector(str(tmp_path / "tests"), cache_path=str(tmp_path / "cache.json"),
+                            source_root=str(tmp_path / "src"))
+    return selector, {"core": core, "util": util, "alone": alone,
+                      "test_core": test_core, "test_util": test_util, "test_api": test_api}
+
+
+def test_import_name(tmp_path):
+    """The dotted name follows the folders that contain an __init__.py"""
+    _, files = make_project(tmp_path)
+    assert _import_name(files["core"]) == "pkg.core"
+    assert _import_name(str(tmp_path / "src" / "pkg" / "__init__.py")) == "pkg"
+    assert _import_name(files["test_core"]) == "test_core"
+
+
+def test_relative_imports(tmp_path):
+    """Relative imports are resolved against the real package name"""
+    write(tmp_path / "pkg" / "__init__.py")
+    write(tmp_path / "pkg" / "sub" / "__init__.py")
+    mod = write(tmp_path / "pkg" / "sub" / "mod.py", "from . import x\nfrom ..core import a\n")
+    imports = _parse_imports(mod)
+    assert "pkg.sub.x" in imports
+    assert "pkg.core" in imports
+
+
+def test_select_package_modules(tmp_path):
+    """Tests importing the package module, directly or through another module, are selected"""
+    selector, files = make_project(tmp_path)
+    assert selector.select(files["core"]) == sorted([files["test_api"], files["test_core"]])
+    assert selector.select(files["util"]) == [files["test_util"]]
+
+
+def test_all_tests_only_lists_the_tests_dir(tmp_path):
+    """Nothing selected: the caller falls back to the whole tests folder"""
+    selector, files = make_project(tmp_path)
+    assert selector.select(files["alone"]) == []
+    assert selector.all_tests() == sorted([files["test_api"], files["test_core"], files["test_util"]])
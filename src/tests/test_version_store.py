@@ -0,0 +1,53 @@
+import sys
+import os
+
+# Add the repository root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.version_store import VersionStore, is_regression, new_session
+
+
+def test_best_version(tmp_path):
+    """Passing tests rank first, then the pylint score"""
+    store = VersionStore(str(tmp_path / "versions"))
+    session = new_session()
+    target = str(tmp_path / "a.py")
+    original = store.record(target, session, content="a=1\n", score=5.0, tests_ok=True)
+    store.record(target, session, content="a = 1\n", score=9.0, tests_ok=False)
+    assert store.best(target, session)["hash"] == original["hash"]
+    better = store.record(target, session, content="A = 1\n", score=8.0, tests_ok=True)
+    assert store.best(target, session)["hash"] == better["hash"]
+    assert store.get(better["hash"]) == "A = 1\n"
+    # Other sessions are ignored
+    assert store.best(target, new_session()) is None
+
+
+def test_regression():
+    """Breaking the tests is a regression even when the score goes up"""
+    original = {"hash": "a", "score": 6.0, "tests_ok": True}
+    broken = {"hash": "b", "score": 9.0, "tests_ok": False}
+    assert is_regression(broken, original)
+    assert not is_regression(original, broken)
+    lower = {"hash": "c", "score": 5.95, "tests_ok": True}
+    assert not is_regression(lower, original, min_delta=0.1)
+    assert is_regression(lower, original, min_delta=0.01)
+    assert not is_regression(original, original)
+
+
+def test_history_cap_and_prune(tmp_path):
+    """Only the last sessions are kept; prune() removes the contents they no longer use"""
+    store = VersionStore(str(tmp_path / "versions"), keep_sessions=2)
+    target = str(tmp_path / "a.py")
+    hashes = []
+    sessions = [new_session() for _ in range(3)]
+    for i, session in enumerate(sessions):
+        hashes.append(store.record(target, session, content=f"a = {i}\n", score=float(i))["hash"])
+
+    assert store.history(target, sessions[0]) == []
+    assert [e["hash"] for e in store.history(target)] == hashes[1:]
+
+    assert store.prune() == 1
+    assert store.get(hashes[2]) == "a = 2\n"
+    reloaded = VersionStore(str(tmp_path / "versions"), keep_sessions=2)
+    assert [e["hash"] for e in reloaded.history(target)] == hashes[1:]
+    assert reloaded.prune() == 0
@@ -0,0 +1,61 @@
+import hashlib
+import os
+
+# =====================
+# SUIVI DE CONVERGENCE D'UN FICHIER (boucle Audit → Fix → Judge)
+# =====================
+
+# Gain de score pylint en dessous duquel une itération ne compte pas comme un progrès
+CONVERGENCE_MIN_DELTA = float(os.getenv("CONVERGENCE_MIN_DELTA", "0.1"))
+# Itérations consécutives sans progrès (tests OK) avant d'arrêter le fichier
+CONVERGENCE_PATIENCE = int(os.getenv("CONVERGENCE_PATIENCE", "2"))
+
+
+def content_hash(code):
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+class ConvergenceTracker:
+    """
+    Compare les itérations successives d'un fichier : empreinte du contenu,
+    score pylint et résultat des tests.
+
+    - Un contenu déjà audité (Fixer sans effet) réutilise l'audit précédent.
+    - Un contenu déjà testé réutilise le résultat du Judge.
+    - Un score qui ne progresse plus de `min_delta` pendant `patience`
+      itérations, tests au vert, signale un plateau.
+    """
+
+    def __init__(self, min_delta=CONVERGENCE_MIN_DELTA, patience=CONVERGENCE_PATIENCE):
+        self.min_delta = min_delta
+        self.patience = max(1, patience)
+        self.scores = []
+        self.tests_ok = None  # Résultat du dernier Judge
+        self._audit = None  # (empreinte, lint, plan)
+        self._judges = {}  # (empreinte, suite complète) -> (succès, logs, tests)
+
+    def observe_score(self, score):
+        self.scores.append(score)
+
+    def plateau(self):
+        """Vrai si les tests passent et que le score stagne depuis `patience` itérations."""
+        if not self.tests_ok or len(self.scores) <= self.patience:
+            return False
+        reference = self.scores[-self.patience - 1]
+        return max(self.scores[-self.patience:]) - reference < self.min_delta
+
+    def cached_audit(self, code_hash):
+        """(lint, plan) du dernier audit si le contenu n'a pas changé depuis, sinon None."""
+        if self._audit is None or self._audit[0] != code_hash:
+            return None
+        return self._audit[1], self._audit[2]
+
+    def remember_audit(self, code_hash, lint, plan):
+        self._audit = (code_hash, lint, plan)
+
+    def cached_judge(self, code_hash, full_suite):
+        return self._judges.get((code_hash, full_suite))
+
+    def remember_judge(self, code_hash, full_suite, result):
+        self._judges[(code_hash, full_suite)] = result
+        self.tests_ok = result[0]
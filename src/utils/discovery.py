@@ -0,0 +1,90 @@
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+from src.utils.test_selector import IGNORED_DIRS
+
+# État persistant du mode incrémental : empreinte de chaque fichier après son dernier traitement réussi
+INCREMENTAL_STATE = os.getenv("INCREMENTAL_STATE", os.path.join(".cache", "processed_files.json"))
+DEFAULT_INCLUDE = ("*.py",)
+
+
+def _matches(rel_path, patterns):
+    """Motif glob testé sur le chemin relatif (séparateurs "/") et sur le nom seul."""
+    name = rel_path.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(rel_path, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+
+def discover_files(root, include=DEFAULT_INCLUDE, exclude=(), recursive=True):
+    """
+    Fichiers de `root` à traiter, triés.
+
+    Args:
+        include (list): Motifs glob à retenir (ex : "*.py", "src/*.py").
+        exclude (list): Motifs glob à écarter, fichiers ou dossiers (ex : "test_*.py", "legacy/*").
+        recursive (bool): Parcourt les sous-dossiers (hors .git, venv, caches...).
+    """
+    root = os.path.abspath(root)
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        rel_dir = "" if rel_dir == "." else rel_dir + "/"
+        if recursive:
+            dirnames[:] = sorted(
+                d for d in dirnames
+                if d not in IGNORED_DIRS and not _matches(rel_dir + d, exclude)
+            )
+        else:
+            dirnames[:] = []
+        for name in filenames:
+            rel_path = rel_dir + name
+            if _matches(rel_path, include) and not _matches(rel_path, exclude):
+                found.append(os.path.join(dirpath, name))
+    return sorted(found)
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class IncrementalState:
+    """
+    Mémoire des exécutions précédentes (mode --incremental).
+
+    Après un traitement réussi, on enregistre l'empreinte du fichier tel
+    qu'il a été laissé et la version du pipeline (modèle + prompts). Un
+    fichier n'est remis en file que si l'une des deux a changé depuis.
+    """
+
+    def __init__(self, path=INCREMENTAL_STATE, version=""):
+        self.path = path
+        self.version = version
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._files = json.load(f)
+        except (OSError, ValueError):
+            self._files = {}
+
+    def needs_processing(self, path):
+        entry = self._files.get(os.path.abspath(path))
+        return not entry or entry.get("version") != self.version or entry.get("hash") != file_hash(path)
+
+    def record(self, path):
+        """Marque le fichier comme traité avec succès dans son état actuel."""
+        key = os.path.abspath(path)
+        with self._lock:
+            self._files[key] = {
+                "hash": file_hash(path),
+                "version": self.version,
+                "updated": datetime.now().isoformat(),
+            }
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._files, f, indent=2)
+            os.replace(tmp_path, self.path)
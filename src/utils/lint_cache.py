@@ -0,0 +1,88 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# Fichiers de configuration que pylint peut lire depuis le dossier courant
+PYLINT_CONFIG_FILES = ("pylintrc", ".pylintrc", "pyproject.toml", "setup.cfg", "tox.ini")
+LINT_CACHE_MAX_ENTRIES = int(os.getenv("LINT_CACHE_MAX_ENTRIES", "512"))
+
+
+def config_fingerprint(extra=""):
+    """
+    Empreinte de la configuration pylint : version, options du moteur et
+    contenu des fichiers de configuration visibles depuis le dossier courant.
+    """
+    digest = hashlib.sha256(extra.encode("utf-8"))
+    try:
+        import pylint
+        digest.update(pylint.__version__.encode("utf-8"))
+    except ImportError:
+        digest.update(b"no-pylint")
+    candidates = list(PYLINT_CONFIG_FILES)
+    if os.getenv("PYLINTRC"):
+        candidates.append(os.environ["PYLINTRC"])
+    for name in candidates:
+        if os.path.isfile(name):
+            with open(name, "rb") as f:
+                digest.update(name.encode("utf-8"))
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+class LintCache:
+    """
+    Cache des résultats pylint, indexé par le SHA-256 du contenu du fichier
+    (plus son chemin, qui apparaît dans les messages) et de la configuration.
+
+    Un fichier inchangé (ex : réponse du Fixer inexploitable) n'est donc pas
+    ré-analysé à l'itération suivante.
+    """
+
+    def __init__(self, max_entries=LINT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._config = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, chemin, content):
+        """Clé de cache pour le contenu `content` (bytes) du fichier `chemin`."""
+        if self._config is None:
+            self._config = config_fingerprint()
+        digest = hashlib.sha256(content)
+        digest.update(b"\0")
+        digest.update(os.path.abspath(chemin).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(self._config.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(result)
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = dict(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._config = None
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+# Cache partagé par tous les appels à run_pylint
+lint_cache = LintCache()
@@ -0,0 +1,191 @@
+import os
+import threading
+
+# pylint est optionnel ici : sans lui, toolsmith_utils garde le mode subprocess.
+# Il n'est importé qu'au premier lint (~150 ms), pas au chargement du module.
+PYLINT_AVAILABLE = None  # Inconnu tant que _import_pylint() n'a pas été appelé
+astroid = Run = expand_modules = CollectingReporter = JSONReporter = None
+
+
+def _import_pylint():
+    """Importe pylint / astroid au premier besoin ; retourne False s'ils sont absents."""
+    global PYLINT_AVAILABLE, astroid, Run, expand_modules, CollectingReporter, JSONReporter
+    if PYLINT_AVAILABLE is None:
+        try:
+            import astroid
+            from pylint.lint import Run
+            from pylint.lint.expand_modules import expand_modules
+            from pylint.reporters import CollectingReporter
+            from pylint.reporters.json_reporter import JSONReporter
+            PYLINT_AVAILABLE = True
+        except ImportError:
+            PYLINT_AVAILABLE = False
+    return PYLINT_AVAILABLE
+
+# PYLINT_IN_PROCESS=0 force l'ancien mode (un interpréteur par appel)
+PYLINT_IN_PROCESS = os.getenv("PYLINT_IN_PROCESS", "1") != "0"
+
+# --persistent=n : pas de lecture/écriture des stats dans ~/.cache/pylint à chaque appel
+DEFAULT_PYLINT_ARGS = ["--persistent=n", "--score=y"]
+# duplicate-code (R0801) compare les fichiers entre eux : un lint fichier par fichier
+# ne le signale jamais, le passage groupé ne doit pas non plus (scores comparables)
+BATCH_PYLINT_ARGS = ["--disable=duplicate-code"]
+
+
+class LintEngine:
+    """
+    Moteur pylint exécuté dans le processus courant et réutilisé entre les appels.
+
+    Le démarrage de l'interpréteur et l'amorçage d'astroid (builtins, stdlib)
+    ne sont payés qu'une fois : le cache d'astroid reste chaud d'un appel à
+    l'autre. Seuls les modules du dossier analysé en sont retirés, pour que
+    les modifications du Fixer soient bien prises en compte.
+    """
+
+    def __init__(self, extra_args=None):
+        self.args = DEFAULT_PYLINT_ARGS + list(extra_args or [])
+        # pylint / astroid ne sont pas thread-safe : un seul lint à la fois
+        self._lock = threading.Lock()
+
+    def _forget(self, chemin):
+        """Retire du cache astroid les modules du dossier analysé (potentiellement modifiés)."""
+        folder = os.path.dirname(os.path.abspath(chemin)) + os.sep
+        cache = astroid.MANAGER.astroid_cache
+        for modname, module in list(cache.items()):
+            module_file = getattr(module, "file", None)
+            if module_file and os.path.abspath(module_file).startswith(folder):
+                del cache[modname]
+
+    def lint(self, chemin):
+        """
+        Analyse un fichier et retourne le score et les messages structurés.
+
+        Returns:
+            dict: {"success", "score", "raw_output", "messages"} où messages suit
+            le schéma du reporter JSON de pylint (type, line, column, symbol, message, ...).
+        """
+        with self._lock:
+            self._forget(chemin)
+            reporter = CollectingReporter()
+            run = Run([chemin, *self.args], reporter=reporter, exit=False)
+            score = run.linter.stats.global_note or 0.0
+            messages = [JSONReporter.serialize(msg) for msg in reporter.messages]
+
+        return {
+            "success": True,
+            "score": round(score, 2),
+            "raw_output": format_messages(messages, score),
+            "messages": messages,
+        }
+
+    def lint_batch(self, chemins, jobs=None):
+        """
+        Analyse plusieurs fichiers en un seul passage pylint réparti sur `jobs` processus.
+
+        Le score de chaque fichier est recalculé à partir des statistiques par
+        module, avec la formule d'évaluation configurée dans pylint. Les
+        messages inter-fichiers (duplicate-code) sont désactivés : le résultat
+        est celui qu'aurait donné lint() sur le fichier seul.
+
+        Returns:
+            dict: {chemin: résultat au format de lint()} ; les fichiers dont le nom
+            de module est ambigu (même nom dans deux dossiers) sont omis.
+        """
+        chemins = [os.path.abspath(c) for c in chemins]
+        jobs = jobs or os.cpu_count() or 1
+
+        # Nom de module attribué par pylint à chaque fichier, pour relier les stats
+        modules, _ = expand_modules(chemins, [], [], [], [])
+        names = {}
+        for chemin in chemins:
+            name = modules.get(chemin, {}).get("name")
+            names.setdefault(name, []).append(chemin)
+        unique = {paths[0]: name for name, paths in names.items() if name and len(paths) == 1}
+
+        with self._lock:
+            for chemin in chemins:
+                self._forget(chemin)
+            reporter = CollectingReporter()
+            run = Run([*chemins, f"--jobs={jobs}", *self.args, *BATCH_PYLINT_ARGS], reporter=reporter, exit=False)
+            linter = run.linter
+
+        by_path = {chemin: [] for chemin in unique}
+        for msg in reporter.messages:
+            if os.path.abspath(msg.abspath) in by_path:
+                by_path[os.path.abspath(msg.abspath)].append(JSONReporter.serialize(msg))
+
+        results = {}
+        for chemin, name in unique.items():
+            counts = dict(linter.stats.by_module.get(name, {}))
+            if not counts.get("statement"):
+                score = 0.0  # Fichier vide ou illisible : pylint ne donne pas de note
+            else:
+                score = float(eval(linter.config.evaluation, {}, counts))  # Formule de pylint (option evaluation)
+            messages = by_path[chemin]
+            results[chemin] = {
+                "success": True,
+                "score": round(score, 2),
+                "raw_output": format_messages(messages, score),
+                "messages": messages,
+            }
+        return results
+
+
+# Ordre d'impact des catégories : celui de la formule de score de pylint
+# (fatal annule le score, une erreur pèse 5 fois un avertissement)
+CATEGORY_ORDER = ("fatal", "error", "warning", "refactor", "convention", "info")
+
+
+def structure_messages(messages):
+    """
+    Classe les messages pylint (schéma du reporter JSON) par catégorie et par impact.
+
+    Returns:
+        dict: {"issues": [...] triés du plus au moins impactant,
+               "categorized": {"error": [...], "warning": [...], ...}}
+    """
+    categorized = {category: [] for category in CATEGORY_ORDER}
+    symbol_counts = {}
+    for msg in messages:
+        categorized.setdefault(msg.get("type", "info"), []).append(msg)
+        symbol_counts[msg.get("symbol")] = symbol_counts.get(msg.get("symbol"), 0) + 1
+
+    def impact(msg):
+        category = msg.get("type", "info")
+        rank = CATEGORY_ORDER.index(category) if category in CATEGORY_ORDER else len(CATEGORY_ORDER)
+        # À catégorie égale, un problème répété rapporte plus une fois corrigé
+        return (rank, -symbol_counts[msg.get("symbol")], msg.get("line") or 0)
+
+    return {
+        "issues": sorted(messages, key=impact),
+        "categorized": categorized,
+    }
+
+
+def format_messages(messages, score):
+    """Reconstitue la sortie texte habituelle de pylint (pour les logs et l'affichage)."""
+    lines = [
+        f"{m['path']}:{m['line']}:{m['column']}: {m['message-id']}: {m['message']} ({m['symbol']})"
+        for m in messages
+    ]
+    lines.append("")
+    lines.append("-" * 66)
+    lines.append(f"Your code has been rated at {score:.2f}/10")
+    return "\n".join(lines)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_lint_engine():
+    """Retourne le moteur partagé, ou None si le mode en processus est indisponible."""
+    global _engine
+    if not PYLINT_IN_PROCESS:
+        return None
+    with _engine_lock:
+        if not _import_pylint():
+            return None
+        if _engine is None:
+            _engine = LintEngine()
+        return _engine
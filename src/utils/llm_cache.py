@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# =====================
+# CONFIGURATION
+# =====================
+
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join(".cache", "llm"))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "200"))
+
+
+def cache_key(model, prompt):
+    """Clé de cache : SHA-256 du nom du modèle et du prompt."""
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """
+    Cache disque des réponses LLM, adressé par contenu (modèle + prompt).
+
+    Les appels se font à temperature=0 : un même prompt redonne la même
+    réponse, autant ne pas la repayer. Une entrée = un fichier JSON ; la date
+    de modification sert de date de dernier accès pour l'éviction LRU quand
+    la taille totale dépasse `max_bytes`.
+
+    Args:
+        cache_dir (str): Dossier du cache.
+        max_bytes (int): Taille maximale du cache sur disque.
+        enabled (bool): False = cache ignoré (--no-cache).
+        refresh (bool): True = on ne lit pas le cache mais on le réécrit (--refresh-cache).
+    """
+
+    def __init__(self, cache_dir=LLM_CACHE_DIR, max_bytes=int(LLM_CACHE_MAX_MB * 1024 * 1024),
+                 enabled=True, refresh=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._sizes = None  # {chemin: taille}, chargé au premier put()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        # Sous-dossiers par préfixe pour éviter des milliers de fichiers par dossier
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, model, prompt):
+        """Retourne la réponse en cache, ou None (miss, cache désactivé ou rafraîchi)."""
+        if not self.enabled or self.refresh:
+            with self._lock:
+                self.misses += 1
+            return None
+        path = self._path(cache_key(model, prompt))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = json.load(f)["content"]
+            os.utime(path)  # Marque l'entrée comme récemment utilisée (LRU)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return content
+
+    def put(self, model, prompt, content):
+        """Enregistre une réponse (écriture atomique), puis évince si besoin."""
+        if not self.enabled:
+            return
+        path = self._path(cache_key(model, prompt))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": model, "created": time.time(), "content": content}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            sizes = self._load_sizes()
+            self._total -= sizes.get(path, 0)
+            sizes[path] = os.path.getsize(path)
+            self._total += sizes[path]
+            if self._total > self.max_bytes:
+                self._evict(sizes)
+
+    def discard(self, model, prompt):
+        """Supprime une entrée (ex : réponse inexploitable qu'il ne faut pas rejouer)."""
+        path = self._path(cache_key(model, prompt))
+        with self._lock:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            if self._sizes is not None:
+                self._total -= self._sizes.pop(path, 0)
+
+    def _load_sizes(self):
+        if self._sizes is None:
+            self._sizes = {}
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if name.endswith(".json"):
+                        path = os.path.join(root, name)
+                        self._sizes[path] = os.path.getsize(path)
+            self._total = sum(self._sizes.values())
+        return self._sizes
+
+    def _evict(self, sizes):
+        """Supprime les entrées les moins récemment utilisées jusqu'à 90 % de la limite."""
+        def last_access(path):
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                return 0.0
+
+        for path in sorted(sizes, key=last_access):
+            if self._total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self._total -= sizes.pop(path)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
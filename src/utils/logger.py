@@ -1,11 +1,44 @@
+import atexit
 import json
 import os
+import sys
+import threading
+import time
 import uuid
 from datetime import datetime
 from enum import Enum
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from src.utils import metrics
+
 # Chemin du fichier de logs
 LOG_FILE = os.path.join("logs", "experiment_data.json")
+# Variante JSON Lines : une entrée par ligne, ajout en O(1) sans relire le fichier
+LOG_FILE_JSONL = os.path.join("logs", "experiment_data.jsonl")
+
+# Mode de stockage : "json" (liste indentée, format historique) ou "jsonl" (append-only)
+LOG_FORMATS = ("json", "jsonl")
+
+
+def _check_log_format(log_format: str) -> str:
+    """Retourne le format normalisé ; ValueError s'il est inconnu."""
+    log_format = log_format.lower()
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"❌ Format de logs invalide : '{log_format}' (valides : {', '.join(LOG_FORMATS)}).")
+    return log_format
+
+
+# Vérifié dès l'import : une valeur inconnue ne retombe pas silencieusement sur "json"
+LOG_FORMAT = _check_log_format(os.getenv("LOG_FORMAT", "json"))
+# Batching des fsync en mode jsonl : toutes les N entrées ou toutes les T secondes
+LOG_FSYNC_EVERY = int(os.getenv("LOG_FSYNC_EVERY", "50"))
+LOG_FSYNC_INTERVAL = float(os.getenv("LOG_FSYNC_INTERVAL", "5"))
+
+_lock = threading.Lock()
+_writer = None
 
 class ActionType(str, Enum):
     """
@@ -57,8 +90,13 @@ def log_experiment(agent_name: str, model_used: str, action: ActionType, details
 
     # --- 3. PRÉPARATION DE L'ENTRÉE ---
     # Création du dossier logs s'il n'existe pas
-    os.makedirs("logs", exist_ok=True)
+    os.makedirs(os.path.dirname(LOG_FILE) or ".", exist_ok=True)
     
+    # Mesures de l'étape en cours (durée, outils, tokens, hits de cache, itération)
+    current = metrics.current_span()
+    if current is not None and "metrics" not in details:
+        details = {**details, "metrics": current.snapshot()}
+
     entry = {
         "id": str(uuid.uuid4()),  # ID unique pour éviter les doublons lors de la fusion des données
         "timestamp": datetime.now().isoformat(),
@@ -69,7 +107,16 @@ def log_experiment(agent_name: str, model_used: str, action: ActionType, details
         "status": status
     }
 
-    # --- 4. LECTURE & ÉCRITURE ROBUSTE ---
+    # --- 4. ÉCRITURE ---
+    with _lock, metrics.timed("log"):
+        if LOG_FORMAT == "jsonl":
+            _get_writer().write(entry)
+        else:
+            _rewrite_json(entry)
+
+
+def _rewrite_json(entry: dict):
+    """Mode historique : relit, complète et réécrit toute la liste JSON."""
     data = []
     if os.path.exists(LOG_FILE):
         try:
@@ -86,4 +133,229 @@ def log_experiment(agent_name: str, model_used: str, action: ActionType, details
     
     # Écriture
     with open(LOG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
\ No newline at end of file
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+
+# =====================
+# BACKEND JSON LINES
+# =====================
+
+class _JsonlWriter:
+    """Écrivain append-only : une ligne JSON par entrée, fsync groupés."""
+
+    def __init__(self, path: str, fsync_every: int, fsync_interval: float):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def write(self, entry: dict):
+        # json.dumps échappe les sauts de ligne : une entrée = une ligne
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        # flush : l'entrée est visible des lecteurs, seul le fsync est différé
+        self._file.flush()
+        self._pending += 1
+        if (self._pending >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.sync()
+
+    def sync(self):
+        if self._pending and not self._file.closed:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+
+def _get_writer() -> _JsonlWriter:
+    """Retourne l'écrivain jsonl courant (recréé si LOG_FILE_JSONL a changé)."""
+    global _writer
+    if _writer is None or _writer.path != LOG_FILE_JSONL:
+        if _writer is not None:
+            _writer.close()
+        _writer = _JsonlWriter(LOG_FILE_JSONL, LOG_FSYNC_EVERY, LOG_FSYNC_INTERVAL)
+    return _writer
+
+
+def flush_logs():
+    """Force le fsync des entrées en attente et ferme le fichier jsonl."""
+    global _writer
+    with _lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+
+atexit.register(flush_logs)
+
+
+def set_log_format(log_format: str):
+    """
+    Choisit le mode de stockage des logs.
+
+    Args:
+        log_format (str): "json" (réécriture complète) ou "jsonl" (append-only).
+
+    Raises:
+        ValueError: Si le format est inconnu.
+    """
+    global LOG_FORMAT
+    log_format = _check_log_format(log_format)
+    flush_logs()
+    LOG_FORMAT = log_format
+
+
+# =====================
+# LECTURE & CONVERSION
+# =====================
+
+def iter_experiments(path: str):
+    """
+    Itère sur les entrées d'un fichier de logs, au format .json ou .jsonl.
+
+    Une dernière ligne jsonl tronquée (crash pendant l'écriture) est ignorée.
+    """
+    if not os.path.exists(path):
+        return
+    if path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"⚠️ Ligne {line_no} illisible ignorée dans {path}")
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from _iter_json_array(f)
+
+
+def _iter_json_array(f, chunk_size: int = 1 << 16):
+    """
+    Décode une liste JSON élément par élément, sans charger tout le fichier.
+
+    Raises:
+        json.JSONDecodeError: Si le contenu n'est pas du JSON valide.
+        ValueError: Si la racine du document n'est pas une liste.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill(size):
+        nonlocal buf, pos, eof
+        chunk = f.read(size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def skip(chars):
+        # Avance sur les caractères ignorables, en relisant si besoin
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill(chunk_size)
+
+    fill(chunk_size)
+    skip(" \t\r\n")
+    if pos >= len(buf):
+        return  # Fichier vide
+    if buf[pos] != "[":
+        raise ValueError("JSON root must be a list (array)")
+    pos += 1
+
+    skip(" \t\r\n")
+    if pos < len(buf) and buf[pos] == "]":
+        return  # Liste vide
+
+    read_size = chunk_size
+    while True:
+        # Un élément, puis exactement un "," ou le "]" final
+        skip(" \t\r\n")
+        if pos >= len(buf):
+            raise json.JSONDecodeError("Unterminated array", buf, pos)
+        if buf[pos] in ",]":
+            raise json.JSONDecodeError("Expecting value", buf, pos)
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Élément coupé par la fin du buffer : on relit (taille croissante
+            # pour ne pas re-décoder indéfiniment une très grosse entrée)
+            fill(read_size)
+            read_size *= 2
+            continue
+        if end == len(buf) and not eof:
+            # Un nombre ou littéral peut continuer dans le bloc suivant
+            fill(read_size)
+            continue
+        read_size = chunk_size
+        pos = end
+        yield obj
+
+        skip(" \t\r\n")
+        if pos >= len(buf):
+            raise json.JSONDecodeError("Unterminated array", buf, pos)
+        if buf[pos] == "]":
+            return
+        if buf[pos] != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+        pos += 1
+
+
+def read_experiments(path: str = None) -> list:
+    """
+    Retourne la vue liste-de-dicts des logs.
+
+    Sans argument : entrées du fichier .json suivies de celles du .jsonl,
+    c'est-à-dire l'historique complet quel que soit le mode de stockage.
+    """
+    if path is not None:
+        return list(iter_experiments(path))
+    flush_logs()
+    return list(iter_experiments(LOG_FILE)) + list(iter_experiments(LOG_FILE_JSONL))
+
+
+def convert_jsonl_to_json(jsonl_path: str = None, json_path: str = None, remove_jsonl: bool = True) -> int:
+    """
+    Fusionne le fichier .jsonl dans le fichier .json (format attendu pour la remise).
+
+    L'écriture passe par un fichier temporaire puis un renommage atomique.
+
+    Returns:
+        int: Nombre total d'entrées dans le fichier .json produit.
+    """
+    jsonl_path = jsonl_path or LOG_FILE_JSONL
+    json_path = json_path or LOG_FILE
+    flush_logs()
+
+    with _lock:
+        data = list(iter_experiments(json_path)) + list(iter_experiments(jsonl_path))
+        tmp_path = json_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, json_path)
+        if remove_jsonl and os.path.exists(jsonl_path):
+            os.remove(jsonl_path)
+
+    return len(data)
+
+
+if __name__ == "__main__":
+    # Usage : python src/utils/logger.py [fichier.jsonl] [fichier.json]
+    total = convert_jsonl_to_json(*sys.argv[1:3])
+    print(f"✅ Logs convertis : {total} entrées dans {sys.argv[2] if len(sys.argv) > 2 else LOG_FILE}")
@@ -2,232 +2,315 @@
 """
     Log Validation Script - Data Officer
     Validate the logs/experiment_data.json file for correctness and completeness.
+
+    Entries are streamed one at a time (the log is never loaded as a whole).
+    JSONL logs can be split across a process pool with --workers.
+
+    Usage:
+        python src/utils/logs_validate.py                 # verbose, one block per entry
+        python src/utils/logs_validate.py --summary       # aggregated counts and failures only
+        python src/utils/logs_validate.py --json          # machine-readable result (CI)
+        python src/utils/logs_validate.py --workers 4 logs/experiment_data.jsonl
 """
+import argparse
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
-def logs_validate():
-    """Validate experiment_data.json file"""
-    log_file = "logs/experiment_data.json"
-    
-    print("🔍 LOG VALIDATION - Data Officer")
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from src.utils.logger import iter_experiments
+
+DEFAULT_LOG_FILES = ["logs/experiment_data.json", "logs/experiment_data.jsonl"]
+
+# Define valid values
+VALID_ACTIONS = {"CODE_ANALYSIS", "CODE_GEN", "DEBUG", "FIX"}
+VALID_STATUSES = {"SUCCESS", "FAILURE"}
+REQUIRED_FIELDS = ["id", "timestamp", "agent", "model", "action", "details", "status"]
+
+# Below this size a JSONL log is validated in-process (pool start-up is not worth it)
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+
+def validate_entry(entry):
+    """
+    Validate a single log entry.
+
+    Returns:
+        tuple: (issues, warnings) - two lists of messages, empty when the entry is valid.
+    """
+    issues = []
+    warnings = []
+
+    if not isinstance(entry, dict):
+        return [f"Entry must be an object, got {type(entry).__name__}"], warnings
+
+    # 1. Check required fields
+    missing_fields = [field for field in REQUIRED_FIELDS if field not in entry]
+    if missing_fields:
+        return [f"Missing fields: {missing_fields}"], warnings  # Skip further checks
+
+    # 2. Validate action type
+    action = entry["action"]
+    if action not in VALID_ACTIONS:
+        issues.append(f"Invalid action: '{action}' (valid: {', '.join(sorted(VALID_ACTIONS))})")
+
+    # 3. Validate status
+    status = entry["status"]
+    if status not in VALID_STATUSES:
+        issues.append(f"Invalid status: '{status}' (valid: {', '.join(sorted(VALID_STATUSES))})")
+
+    # 4. Validate details structure
+    details = entry["details"]
+    if not isinstance(details, dict):
+        issues.append(f"'details' must be a dictionary, got {type(details).__name__}")
+    elif action in VALID_ACTIONS:
+        # 5. Validate input_prompt and output_response for critical actions
+        missing_prompts = []
+        for key in ("input_prompt", "output_response"):
+            if key not in details:
+                missing_prompts.append(key)
+            elif not isinstance(details[key], str) or details[key].strip() == "":
+                issues.append(f"'{key}' is empty")
+        if missing_prompts:
+            issues.append(f"Missing required prompt fields: {missing_prompts}")
+
+    # 6. Validate timestamp format (basic check)
+    timestamp = str(entry["timestamp"])
+    if "T" not in timestamp or len(timestamp) < 10:
+        warnings.append(f"Timestamp format may be incorrect: {timestamp}")
+
+    # 7. Validate UUID format (basic check)
+    entry_id = str(entry["id"])
+    if len(entry_id) != 36 or entry_id.count("-") != 4:
+        warnings.append(f"ID format may be incorrect: {entry_id}")
+
+    return issues, warnings
+
+
+def _new_result():
+    return {
+        "entries": 0,
+        "issues": [],
+        "warnings": 0,
+        "actions": {},
+        "agents": {},
+        "statuses": {},
+    }
+
+
+def _count(counter, key):
+    key = str(key)
+    counter[key] = counter.get(key, 0) + 1
+
+
+def _accumulate(result, entry, verbose=False):
+    """Validate one entry and fold it into the aggregated result."""
+    result["entries"] += 1
+    entry_no = result["entries"]
+    issues, warnings = validate_entry(entry)
+
+    if isinstance(entry, dict):
+        _count(result["actions"], entry.get("action"))
+        _count(result["agents"], entry.get("agent"))
+        _count(result["statuses"], entry.get("status"))
+
+    result["issues"].extend({"entry": entry_no, "message": msg} for msg in issues)
+    result["warnings"] += len(warnings)
+
+    if verbose:
+        print(f"\nEntry #{entry_no}:")
+        for msg in issues:
+            print(f"  ❌ {msg}")
+        for msg in warnings:
+            print(f"  ⚠️  Warning: {msg}")
+        if not issues:
+            print(f"  ✅ {entry.get('agent')} / {entry.get('action')} / {entry.get('status')}")
+
+
+def _merge(total, part):
+    """Merge a partial result (from a worker) into the total, renumbering entries."""
+    offset = total["entries"]
+    total["entries"] += part["entries"]
+    total["warnings"] += part["warnings"]
+    total["issues"].extend(
+        {"entry": issue["entry"] + offset, "message": issue["message"]} for issue in part["issues"]
+    )
+    for key in ("actions", "agents", "statuses"):
+        for name, count in part[key].items():
+            total[key][name] = total[key].get(name, 0) + count
+
+
+def _validate_jsonl_lines(f, end, result, verbose=False):
+    """Validate the JSONL lines of an open binary file up to byte offset `end`."""
+    while f.tell() < end:
+        line = f.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as e:
+            result["entries"] += 1
+            result["issues"].append({"entry": result["entries"], "message": f"Invalid JSON line: {e}"})
+            if verbose:
+                print(f"\nEntry #{result['entries']}:\n  ❌ Invalid JSON line: {e}")
+            continue
+        _accumulate(result, entry, verbose)
+
+
+def _validate_jsonl_range(path, start, end):
+    """
+    Worker: validate the JSONL lines that *start* in the byte range [start, end).
+    """
+    result = _new_result()
+    with open(path, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            if f.read(1) != b"\n":
+                f.readline()  # Partial line, owned by the previous range
+        _validate_jsonl_lines(f, end, result)
+    return result
+
+
+def _validate_stream(path, result, verbose):
+    """Validate a .json / .jsonl file entry by entry in the current process."""
+    if path.endswith(".jsonl"):
+        # Line by line so that a corrupt line is reported, not silently skipped
+        with open(path, "rb") as f:
+            _validate_jsonl_lines(f, os.path.getsize(path), result, verbose)
+        return
+    for entry in iter_experiments(path):
+        _accumulate(result, entry, verbose)
+
+
+def validate_logs(paths=None, workers=1, verbose=False):
+    """
+    Validate one or more log files and return a machine-readable result.
+
+    Args:
+        paths (list): Log files (.json or .jsonl). Defaults to the standard logs/ files.
+        workers (int): Process pool size used to split large JSONL files.
+        verbose (bool): Print one block per entry (slow on large logs).
+
+    Returns:
+        dict: {"valid", "files", "entries", "issues", "warnings", "actions", "agents", "statuses", "errors"}
+    """
+    if paths is None:
+        paths = [p for p in DEFAULT_LOG_FILES if os.path.exists(p)]
+
+    result = _new_result()
+    result["files"] = []
+    result["errors"] = []
+
+    if not paths:
+        result["errors"].append("File not found: logs/experiment_data.json")
+
+    for path in paths:
+        if not os.path.exists(path):
+            result["errors"].append(f"File not found: {path}")
+            continue
+        result["files"].append(path)
+        try:
+            size = os.path.getsize(path)
+            if path.endswith(".jsonl") and workers > 1 and size >= PARALLEL_MIN_BYTES and not verbose:
+                step = size // workers + 1
+                ranges = [(path, start, min(start + step, size)) for start in range(0, size, step)]
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    # map() keeps the order of the ranges, so entry numbers stay correct
+                    for part in pool.map(_validate_jsonl_range, *zip(*ranges)):
+                        _merge(result, part)
+            else:
+                _validate_stream(path, result, verbose)
+        except json.JSONDecodeError as e:
+            result["errors"].append(f"{path}: Invalid JSON format ({e})")
+        except ValueError as e:
+            result["errors"].append(f"{path}: {e}")
+
+    result["valid"] = not result["issues"] and not result["errors"]
+    return result
+
+
+def print_summary(result, max_issues=50):
+    """Print the aggregated counts and failures of a validate_logs() result."""
+    print("\n" + "=" * 50)
+    print("📊 VALIDATION SUMMARY")
     print("=" * 50)
-    
-    # Check if file exists
-    if not os.path.exists(log_file):
-        print("❌ ERROR: File not found: logs/experiment_data.json")
-        print("   Make sure the file exists in the logs/ directory")
-        return False
-    
-    print(f"✅ File found: {log_file}")
-    
-    try:
-        # Read and parse JSON
-        with open(log_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        print(f"📊 Total entries: {len(data)}")
-        
-        # Validate that data is a list
-        if not isinstance(data, list):
-            print("❌ ERROR: JSON root must be a list (array)")
-            return False
-        
-        if len(data) == 0:
+
+    for error in result["errors"]:
+        print(f"❌ ERROR: {error}")
+
+    print(f"📁 Files: {', '.join(result['files']) or '-'}")
+    print(f"📊 Total entries: {result['entries']}")
+    if result["warnings"]:
+        print(f"⚠️  Warnings: {result['warnings']}")
+
+    if result["issues"]:
+        print(f"❌ VALIDATION FAILED")
+        print(f"   Found {len(result['issues'])} issue(s) in {result['entries']} entries")
+        print("\nIssues found:")
+        for issue in result["issues"][:max_issues]:
+            print(f"  • Entry {issue['entry']}: {issue['message']}")
+        if len(result["issues"]) > max_issues:
+            print(f"  ... and {len(result['issues']) - max_issues} more")
+
+        print(f"\n⚠️  Recommendation:")
+        print(f"   1. Fix the issues listed above")
+        print(f"   2. Run validation again")
+        print(f"   3. Make sure to use ActionType enum from logger.py")
+    elif result["valid"]:
+        if result["entries"] == 0:
             print("⚠️ WARNING: Log file is empty")
             print("   No logs have been recorded yet")
-            return True  # Empty but valid
-        
-        # Define valid values
-        VALID_ACTIONS = {"CODE_ANALYSIS", "CODE_GEN", "DEBUG", "FIX"}
-        VALID_STATUSES = {"SUCCESS", "FAILURE"}
-        
-        print("\n📝 Validating each entry...")
-        print("-" * 50)
-        
-        issues = []
-        entry_count = 0
-        
-        for i, entry in enumerate(data):
-            entry_count += 1
-            print(f"\nEntry #{i+1}:")
-            
-            # 1. Check required fields
-            required_fields = ["id", "timestamp", "agent", "model", "action", "details", "status"]
-            missing_fields = []
-            
-            for field in required_fields:
-                if field not in entry:
-                    missing_fields.append(field)
-            
-            if missing_fields:
-                issue_msg = f"  ❌ Missing fields: {missing_fields}"
-                print(issue_msg)
-                issues.append(f"Entry {i+1}: {issue_msg}")
-                continue  # Skip further checks for this entry
-            
-            print(f"  ✅ All required fields present")
-            
-            # 2. Validate action type
-            action = entry["action"]
-            if action not in VALID_ACTIONS:
-                issue_msg = f"  ❌ Invalid action: '{action}' (valid: {', '.join(VALID_ACTIONS)})"
-                print(issue_msg)
-                issues.append(f"Entry {i+1}: {issue_msg}")
-            else:
-                print(f"  ✅ Action: {action}")
-            
-            # 3. Validate status
-            status = entry["status"]
-            if status not in VALID_STATUSES:
-                issue_msg = f"  ❌ Invalid status: '{status}' (valid: {', '.join(VALID_STATUSES)})"
-                print(issue_msg)
-                issues.append(f"Entry {i+1}: {issue_msg}")
-            else:
-                print(f"  ✅ Status: {status}")
-            
-            # 4. Validate details structure
-            details = entry["details"]
-            if not isinstance(details, dict):
-                issue_msg = f"  ❌ 'details' must be a dictionary, got {type(details).__name__}"
-                print(issue_msg)
-                issues.append(f"Entry {i+1}: {issue_msg}")
-                continue  # Skip prompt validation
-            
-            print(f"  ✅ Details is a dictionary")
-            
-            # 5. Validate input_prompt and output_response for critical actions
-            if action in VALID_ACTIONS:
-                missing_prompts = []
-                
-                if "input_prompt" not in details:
-                    missing_prompts.append("input_prompt")
-                else:
-                    if not details["input_prompt"] or details["input_prompt"].strip() == "":
-                        issue_msg = "  ❌ 'input_prompt' is empty"
-                        print(issue_msg)
-                        issues.append(f"Entry {i+1}: {issue_msg}")
-                    else:
-                        # Truncate for display
-                        prompt_preview = details["input_prompt"][:50] + "..." if len(details["input_prompt"]) > 50 else details["input_prompt"]
-                        print(f"  ✅ input_prompt: '{prompt_preview}'")
-                
-                if "output_response" not in details:
-                    missing_prompts.append("output_response")
-                else:
-                    if not details["output_response"] or details["output_response"].strip() == "":
-                        issue_msg = "  ❌ 'output_response' is empty"
-                        print(issue_msg)
-                        issues.append(f"Entry {i+1}: {issue_msg}")
-                    else:
-                        # Truncate for display
-                        response_preview = details["output_response"][:50] + "..." if len(details["output_response"]) > 50 else details["output_response"]
-                        print(f"  ✅ output_response: '{response_preview}'")
-                
-                if missing_prompts:
-                    issue_msg = f"  ❌ Missing required prompt fields: {missing_prompts}"
-                    print(issue_msg)
-                    issues.append(f"Entry {i+1}: {issue_msg}")
-            
-            # 6. Validate timestamp format (basic check)
-            timestamp = entry["timestamp"]
-            if "T" not in timestamp or len(timestamp) < 10:
-                print(f"  ⚠️  Warning: Timestamp format may be incorrect: {timestamp}")
-            
-            # 7. Validate UUID format (basic check)
-            entry_id = entry["id"]
-            if len(entry_id) != 36 or entry_id.count("-") != 4:
-                print(f"  ⚠️  Warning: ID format may be incorrect: {entry_id}")
-            else:
-                print(f"  ✅ ID format looks valid")
-        
-        # Summary
-        print("\n" + "=" * 50)
-        print("📊 VALIDATION SUMMARY")
-        print("=" * 50)
-        
-        if issues:
-            print(f"❌ VALIDATION FAILED")
-            print(f"   Found {len(issues)} issue(s) in {entry_count} entries")
-            print("\nIssues found:")
-            for issue in issues:
-                print(f"  • {issue}")
-            
-            print(f"\n⚠️  Recommendation:")
-            print(f"   1. Fix the issues listed above")
-            print(f"   2. Run validation again")
-            print(f"   3. Make sure to use ActionType enum from logger.py")
-            
-            return False
         else:
             print(f"✅ VALIDATION SUCCESSFUL!")
-            print(f"   All {entry_count} entries are valid")
+            print(f"   All {result['entries']} entries are valid")
             print(f"\n🎯 Log file is ready for submission!")
             print(f"   This ensures 30% of the 'Data Quality' grade")
-            
-            # Additional statistics
-            actions_count = {}
-            agents_count = {}
-            status_count = {}
-            
-            for entry in data:
-                action = entry["action"]
-                agent = entry["agent"]
-                status = entry["status"]
-                
-                actions_count[action] = actions_count.get(action, 0) + 1
-                agents_count[agent] = agents_count.get(agent, 0) + 1
-                status_count[status] = status_count.get(status, 0) + 1
-            
-            print(f"\n📈 Statistics:")
-            print(f"  Actions distribution:")
-            for action, count in actions_count.items():
-                print(f"    • {action}: {count}")
-            
-            print(f"  Agents distribution:")
-            for agent, count in agents_count.items():
-                print(f"    • {agent}: {count}")
-            
-            print(f"  Status distribution:")
-            for status, count in status_count.items():
-                print(f"    • {status}: {count}")
-            
-            return True
-            
-    except json.JSONDecodeError as e:
-        print(f"❌ ERROR: Invalid JSON format")
-        print(f"   Details: {e}")
-        print(f"\n💡 Tip: Check for missing commas, brackets, or quotes")
-        return False
-    except Exception as e:
-        print(f"❌ ERROR: Unexpected error")
-        print(f"   Details: {e}")
-        return False
-
-""""
-def main():
-    #Main function
-    # Check if logs directory exists
-    if not os.path.exists("logs"):
-        print("❌ ERROR: 'logs' directory not found")
-        print("   Create it with: mkdir logs")
-        return 1
-    
-    success = validate_logs()
-    
-    if success:
-        return 0
-    else:
-        return 1
+
+    if result["entries"]:
+        print(f"\n📈 Statistics:")
+        for title, key in (("Actions", "actions"), ("Agents", "agents"), ("Status", "statuses")):
+            print(f"  {title} distribution:")
+            for name, count in result[key].items():
+                print(f"    • {name}: {count}")
+
+
+def logs_validate(paths=None, summary=False, workers=1):
+    """Validate experiment_data.json file (and experiment_data.jsonl, if any)"""
+    print("🔍 LOG VALIDATION - Data Officer")
+    print("=" * 50)
+
+    if not summary:
+        print("\n📝 Validating each entry...")
+        print("-" * 50)
+
+    result = validate_logs(paths, workers=workers, verbose=not summary)
+    print_summary(result)
+    return result["valid"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate the experiment logs")
+    parser.add_argument("paths", nargs="*", help="Log files (.json / .jsonl), default: logs/experiment_data.json[l]")
+    parser.add_argument("--summary", action="store_true", help="Only print aggregated counts and failures")
+    parser.add_argument("--json", action="store_true", help="Print the machine-readable result as JSON")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Process pool size for large JSONL logs")
+    args = parser.parse_args(argv)
+    paths = args.paths or None
+
+    if args.json:
+        result = validate_logs(paths, workers=args.workers)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return 0 if result["valid"] else 1
+
+    return 0 if logs_validate(paths, summary=args.summary, workers=args.workers) else 1
+
 
 if __name__ == "__main__":
-    exit_code = main()
-    sys.exit(exit_code)
-"""
-    
-if __name__ == "__main__":
-    if logs_validate():
-        exit(0)  # Succès
-    else:
-        exit(1)  # Échec
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# =====================
+# INSTRUMENTATION DES ÉTAPES (Audit / Fix / Judge) ET DES OUTILS
+# =====================
+# Une étape ouvre un span (par thread) ; les appels d'outils faits pendant
+# l'étape (LLM, pylint, pytest, écriture des logs) y ajoutent leur durée,
+# leurs tokens et leurs hits de cache. Le logger joint l'état du span courant
+# à chaque entrée, et un tableau p50/p95 est affiché en fin d'exécution.
+
+_local = threading.local()
+_lock = threading.Lock()
+_spans = []  # Spans terminés
+_tool_samples = {}  # outil -> [durées]
+
+
+class Span:
+    def __init__(self, stage, file=None, iteration=None):
+        self.stage = stage
+        self.file = file
+        self.iteration = iteration
+        self.start = time.perf_counter()
+        self.duration = None
+        self.tools = {}  # outil -> secondes cumulées
+        self.counters = {}  # prompt_tokens, response_tokens, llm_cache_hits...
+
+    def add_time(self, tool, seconds):
+        self.tools[tool] = self.tools.get(tool, 0.0) + seconds
+
+    def add(self, counter, value=1):
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def snapshot(self):
+        """État du span (durée écoulée jusqu'ici si l'étape n'est pas finie)."""
+        duration = self.duration if self.duration is not None else time.perf_counter() - self.start
+        return {
+            "stage": self.stage,
+            "iteration": self.iteration,
+            "duration_s": round(duration, 4),
+            "tools_s": {tool: round(seconds, 4) for tool, seconds in self.tools.items()},
+            **self.counters,
+        }
+
+
+def current_span():
+    return getattr(_local, "span", None)
+
+
+@contextmanager
+def span(stage, file=None, iteration=None):
+    """Mesure une étape de l'orchestrateur dans le thread courant."""
+    parent = current_span()
+    current = Span(stage, file, iteration)
+    _local.span = current
+    try:
+        yield current
+    finally:
+        current.duration = time.perf_counter() - current.start
+        _local.span = parent
+        with _lock:
+            _spans.append(current)
+
+
+@contextmanager
+def timed(tool):
+    """Mesure un appel d'outil ; sa durée est ajoutée au span courant."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        current = current_span()
+        if current is not None:
+            current.add_time(tool, elapsed)
+        with _lock:
+            _tool_samples.setdefault(tool, []).append(elapsed)
+
+
+def count(counter, value=1):
+    """Incrémente un compteur (tokens, hits de cache...) du span courant."""
+    current = current_span()
+    if current is not None:
+        current.add(counter, value)
+
+
+def percentile(values, pct):
+    """Percentile par rang le plus proche (values non vide)."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _tool_samples.clear()
+
+
+def iterations():
+    """Nombre d'itérations effectuées par fichier (d'après les spans d'étapes)."""
+    with _lock:
+        spans = list(_spans)
+    done = {}
+    for s in spans:
+        if s.file and s.iteration:
+            done[s.file] = max(done.get(s.file, 0), s.iteration)
+    return done
+
+
+def summary():
+    """
+    Agrège les mesures de l'exécution.
+
+    Returns:
+        dict: {"stages": {étape: stats}, "tools": {outil: stats}, "files": {fichier: stats}}
+        où stats = {"count", "total_s", "p50_s", "p95_s"} (+ tokens pour les étapes).
+    """
+    with _lock:
+        spans = list(_spans)
+        tool_samples = {tool: list(samples) for tool, samples in _tool_samples.items()}
+
+    def stats(durations):
+        return {
+            "count": len(durations),
+            "total_s": round(sum(durations), 3),
+            "p50_s": round(percentile(durations, 50), 3),
+            "p95_s": round(percentile(durations, 95), 3),
+        }
+
+    stages, files = {}, {}
+    tokens = {}
+    for s in spans:
+        stages.setdefault(s.stage, []).append(s.duration)
+        if s.file:
+            files.setdefault(s.file, []).append(s.duration)
+        stage_tokens = tokens.setdefault(s.stage, {"prompt_tokens": 0, "response_tokens": 0})
+        for key in stage_tokens:
+            stage_tokens[key] += s.counters.get(key, 0)
+
+    return {
+        "stages": {stage: {**stats(d), **tokens[stage]} for stage, d in stages.items()},
+        "tools": {tool: stats(d) for tool, d in tool_samples.items()},
+        "files": {f: stats(d) for f, d in files.items()},
+    }
+
+
+def print_summary():
+    """Tableau p50/p95 par étape, par outil et par fichier."""
+    data = summary()
+    if not data["stages"] and not data["tools"]:
+        return
+
+    def table(title, rows, extra=False):
+        if not rows:
+            return
+        print(f"\n⏱️ {title}")
+        header = f"  {'':<28} {'n':>4} {'total(s)':>9} {'p50(s)':>8} {'p95(s)':>8}"
+        print(header + (f" {'tok in':>8} {'tok out':>8}" if extra else ""))
+        for name, st in rows.items():
+            label = name if len(name) <= 28 else "…" + name[-27:]
+            line = f"  {label:<28} {st['count']:>4} {st['total_s']:>9.2f} {st['p50_s']:>8.2f} {st['p95_s']:>8.2f}"
+            if extra:
+                line += f" {st['prompt_tokens']:>8} {st['response_tokens']:>8}"
+            print(line)
+
+    table("Temps par étape", data["stages"], extra=True)
+    table("Temps par outil", data["tools"])
+    table("Temps par fichier (étapes)", data["files"])
@@ -0,0 +1,184 @@
+import ast
+import re
+import textwrap
+
+# =====================
+# APPLICATION DES CORRECTIONS EN MODE PATCH
+# =====================
+# Le Fixer peut renvoyer, au lieu du fichier complet :
+#   - "patch" : un diff unifié (modifications au niveau module, imports...)
+#   - "hunks" : [{"target": "nom_fonction" | "Classe" | "Classe.methode", "code": "..."}]
+#               remplacement d'une fonction / classe entière, repérée via l'AST
+# Le résultat est toujours validé (compilation) avant d'être écrit.
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+# Décalage maximal (en lignes) toléré pour retrouver le contexte d'un hunk
+MAX_FUZZ = 200
+
+
+class PatchError(ValueError):
+    """Le patch renvoyé par le Fixer ne peut pas être appliqué proprement."""
+
+
+def _parse_unified_diff(diff):
+    """Découpe un diff unifié en hunks : liste de (ligne_départ, [(op, texte)])."""
+    hunks = []
+    current = None
+    for line in diff.splitlines():
+        if line.startswith(("--- ", "+++ ", "diff ", "index ")):
+            continue
+        match = _HUNK_HEADER.match(line)
+        if match:
+            current = (int(match.group(1)), [])
+            hunks.append(current)
+            continue
+        if current is None:
+            continue
+        if line.startswith("\\"):
+            continue  # "\ No newline at end of file"
+        op, text = (line[0], line[1:]) if line else (" ", "")
+        if op not in " +-":
+            raise PatchError(f"Ligne de diff invalide : {line!r}")
+        current[1].append((op, text))
+    if not hunks:
+        raise PatchError("Aucun hunk dans le diff")
+    return hunks
+
+
+def _find_block(lines, block, expected):
+    """Position de `block` dans `lines`, la plus proche de `expected` (comparaison sans espaces de fin)."""
+    if not block:
+        return min(max(expected, 0), len(lines))
+    stripped = [line.rstrip() for line in lines]
+    target = [line.rstrip() for line in block]
+    size = len(target)
+    for offset in range(MAX_FUZZ + 1):
+        for start in {expected - offset, expected + offset}:
+            if 0 <= start <= len(lines) - size and stripped[start:start + size] == target:
+                return start
+    raise PatchError(f"Contexte introuvable autour de la ligne {expected + 1}")
+
+
+def apply_unified_diff(original, diff):
+    """
+    Applique un diff unifié au texte `original`.
+
+    Les numéros de ligne servent de point de départ : le contexte est recherché
+    autour (décalage toléré), les espaces de fin de ligne sont ignorés.
+
+    Raises:
+        PatchError: Si un hunk ne correspond pas au texte.
+    """
+    lines = original.splitlines()
+    shift = 0  # Décalage cumulé introduit par les hunks précédents
+    for start, ops in _parse_unified_diff(diff):
+        old = [text for op, text in ops if op != "+"]
+        new = [text for op, text in ops if op != "-"]
+        position = _find_block(lines, old, start - 1 + shift)
+        lines[position:position + len(old)] = new
+        shift = position + len(new) - (start - 1) - len(old)
+    return "\n".join(lines) + "\n"
+
+
+def _find_unit(tree, target):
+    """Nœud AST (fonction / classe) désigné par "nom" ou "Classe.methode"."""
+    scope = tree.body
+    node = None
+    for part in target.split("."):
+        node = next(
+            (n for n in scope
+             if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and n.name == part),
+            None,
+        )
+        if node is None:
+            return None
+        scope = node.body
+    return node
+
+
+def _main_guard_line(tree):
+    """Index (0-based) du bloc `if __name__ == "__main__":`, s'il existe."""
+    for node in tree.body:
+        if isinstance(node, ast.If) and "__name__" in ast.unparse(node.test):
+            return node.lineno - 1
+    return None
+
+
+def apply_function_hunks(original, hunks):
+    """
+    Remplace des fonctions / classes entières (décorateurs compris).
+
+    Une cible absente du fichier est ajoutée comme nouvelle définition : à la
+    fin de sa classe pour "Classe.methode", sinon au niveau module, avant le
+    bloc `if __name__ == "__main__":` s'il existe.
+
+    Raises:
+        PatchError: Si le fichier d'origine n'est pas analysable, un hunk est mal
+            formé ou la classe d'une nouvelle méthode n'existe pas.
+    """
+    code = original
+    for hunk in hunks:
+        if not isinstance(hunk, dict) or not hunk.get("target") or not isinstance(hunk.get("code"), str):
+            raise PatchError(f"Hunk mal formé : {hunk!r}")
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            raise PatchError(f"Code d'origine non analysable, remplacement par fonction impossible : {e}")
+
+        lines = code.splitlines()
+        node = _find_unit(tree, hunk["target"])
+        body = textwrap.dedent(hunk["code"]).strip("\n").splitlines()
+
+        if node is None and "." in hunk["target"]:
+            # Nouvelle méthode : ajoutée à la fin de la classe, avec son indentation
+            parent_name = hunk["target"].rsplit(".", 1)[0]
+            parent = _find_unit(tree, parent_name)
+            if not isinstance(parent, ast.ClassDef):
+                raise PatchError(f"Classe {parent_name!r} introuvable pour la cible {hunk['target']!r}")
+            indent = " " * parent.body[0].col_offset
+            lines[parent.end_lineno:parent.end_lineno] = [""] + [indent + line if line else line for line in body]
+        elif node is None:
+            guard = _main_guard_line(tree)
+            insert_at = len(lines) if guard is None else guard
+            lines[insert_at:insert_at] = ["", ""] + body + ["", ""]
+        else:
+            first = min([d.lineno for d in node.decorator_list] + [node.lineno]) - 1
+            indent = " " * node.col_offset
+            lines[first:node.end_lineno] = [indent + line if line else line for line in body]
+        code = "\n".join(lines) + "\n"
+    return code
+
+
+def apply_fixer_patch(original, data, file_name="<fixer>"):
+    """
+    Construit le nouveau code à partir d'une réponse du Fixer en mode patch.
+
+    Args:
+        original (str): Code actuel du fichier.
+        data (dict): Réponse JSON du Fixer ("patch" et/ou "hunks").
+
+    Returns:
+        str: Nouveau code, syntaxiquement valide.
+
+    Raises:
+        PatchError: Réponse sans patch exploitable, patch inapplicable ou code résultant invalide.
+    """
+    if not isinstance(data, dict):
+        raise PatchError("Réponse du Fixer non JSON")
+    patch = data.get("patch")
+    hunks = data.get("hunks")
+    if not patch and not hunks:
+        raise PatchError("Ni 'patch' ni 'hunks' dans la réponse")
+
+    code = original
+    # Le diff d'abord : ses numéros de ligne se réfèrent au fichier d'origine
+    if patch:
+        code = apply_unified_diff(code, patch)
+    if hunks:
+        code = apply_function_hunks(code, hunks)
+
+    try:
+        compile(code, file_name, "exec")
+    except SyntaxError as e:
+        raise PatchError(f"Le code patché ne compile pas : {e}")
+    return code
@@ -0,0 +1,254 @@
+import atexit
+import contextlib
+import io
+import importlib
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+from multiprocessing.connection import Client, Listener
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# =====================
+# CONFIGURATION
+# =====================
+
+# PYTEST_WORKER=0 : retour au mode `python -m pytest` (un interpréteur par appel)
+PYTEST_WORKER = os.getenv("PYTEST_WORKER", "1") != "0"
+# Nombre de workers persistants (main.py l'aligne sur --workers s'il est plus grand)
+PYTEST_WORKER_POOL = int(os.getenv("PYTEST_WORKER_POOL", "1"))
+# Recyclage du worker : après N exécutions ou si sa mémoire dépasse la limite (Mo)
+PYTEST_WORKER_MAX_RUNS = int(os.getenv("PYTEST_WORKER_MAX_RUNS", "50"))
+PYTEST_WORKER_MAX_RSS_MB = float(os.getenv("PYTEST_WORKER_MAX_RSS_MB", "512"))
+# Délai max d'une exécution (ex : boucle infinie dans le code testé)
+PYTEST_TIMEOUT = float(os.getenv("PYTEST_TIMEOUT", "120"))
+# Dépendances lourdes à importer une fois pour toutes au démarrage (ex : "pandas,numpy")
+PYTEST_WORKER_PRELOAD = [m for m in os.getenv("PYTEST_WORKER_PRELOAD", "").split(",") if m]
+
+PYTEST_ARGS = ["-q", "--tb=short", "--disable-warnings", "--maxfail=5"]
+
+
+# =====================
+# CÔTÉ WORKER (processus enfant)
+# =====================
+
+def _rss_mb():
+    """Pic de mémoire du processus en Mo (None si non disponible, ex : Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux : Ko, macOS : octets
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _forget_modules(folder):
+    """Décharge les modules importés depuis `folder` pour relire le code modifié."""
+    folder = os.path.abspath(folder) + os.sep
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, "__file__", None)
+        if module_file and os.path.abspath(module_file).startswith(folder):
+            del sys.modules[name]
+
+
+def _run_once(chemins, args, reload_dirs):
+    import pytest
+
+    for folder in reload_dirs:
+        _forget_modules(folder)
+    importlib.invalidate_caches()
+
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+        # no:cacheprovider : pas d'écriture de .pytest_cache entre deux runs
+        returncode = int(pytest.main([*chemins, *args, "-p", "no:cacheprovider"]))
+    return {"returncode": returncode, "output": out.getvalue(), "rss_mb": _rss_mb()}
+
+
+def _serve():
+    """
+    Point d'entrée du worker (python -m src.utils.pytest_worker).
+
+    Importe pytest une fois pour toutes, ouvre un pipe local (socket Unix ou
+    named pipe Windows), annonce son adresse sur stdout puis exécute les
+    requêtes reçues jusqu'à fermeture.
+    """
+    authkey = bytes.fromhex(os.environ.pop("PYTEST_WORKER_AUTHKEY"))
+    import pytest  # noqa: F401  (chargé une fois pour toutes)
+    for module in PYTEST_WORKER_PRELOAD:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    with Listener(authkey=authkey) as listener:
+        print(json.dumps(listener.address), flush=True)
+        conn = listener.accept()
+
+    # stdout n'est plus lu par le parent : on le neutralise pour ne jamais bloquer
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+
+    with conn:
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                break
+            if request is None:
+                break
+            try:
+                conn.send(_run_once(*request))
+            except Exception as e:
+                conn.send({"returncode": 3, "output": f"Erreur interne du worker pytest : {e}", "rss_mb": _rss_mb()})
+
+
+# =====================
+# CÔTÉ ORCHESTRATEUR (processus parent)
+# =====================
+
+class PytestWorker:
+    """
+    Processus pytest persistant, piloté par un pipe local.
+
+    pytest, ses plugins et les dépendances préchargées restent importés d'un
+    appel à l'autre ; seuls les modules du dossier testé sont rechargés.
+    Le processus est recyclé après `max_runs` exécutions, si sa mémoire
+    dépasse `max_rss_mb`, ou s'il dépasse le délai `timeout`.
+    """
+
+    def __init__(self, max_runs=PYTEST_WORKER_MAX_RUNS, max_rss_mb=PYTEST_WORKER_MAX_RSS_MB,
+                 timeout=PYTEST_TIMEOUT, preload=None):
+        self.max_runs = max_runs
+        self.max_rss_mb = max_rss_mb
+        self.timeout = timeout
+        self.preload = list(PYTEST_WORKER_PRELOAD if preload is None else preload)
+        self._process = None
+        self._conn = None
+        self._runs = 0
+
+    def _start(self):
+        authkey = os.urandom(16)
+        env = {**os.environ, "PYTEST_WORKER_AUTHKEY": authkey.hex(),
+               "PYTEST_WORKER_PRELOAD": ",".join(self.preload),
+               "PYTHONPATH": os.pathsep.join(filter(None, [BASE_DIR, os.environ.get("PYTHONPATH")]))}
+        # Processus dédié (et non multiprocessing) : main.py n'est pas ré-importé
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "src.utils.pytest_worker"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, env=env
+        )
+        line = self._process.stdout.readline()
+        if not line:
+            self._process.wait()
+            self._process = None
+            raise RuntimeError("Le worker pytest n'a pas démarré")
+        self._conn = Client(json.loads(line), authkey=authkey)
+        self._runs = 0
+
+    def _alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def close(self):
+        if self._process is None:
+            return
+        try:
+            self._conn.send(None)
+            self._process.wait(timeout=2)
+        except (OSError, EOFError, subprocess.TimeoutExpired):
+            pass
+        if self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        self._conn.close()
+        self._process.stdout.close()
+        self._process = None
+        self._conn = None
+
+    def run(self, chemins, args=None, reload_dirs=None):
+        """
+        Exécute pytest sur `chemins` (un fichier ou une liste) dans le worker.
+
+        Args:
+            reload_dirs (list): Dossiers dont les modules sont rechargés avant
+                l'exécution (par défaut : ceux des fichiers de test).
+
+        Returns:
+            dict: {"returncode", "output"} ; returncode vaut None en cas de délai dépassé.
+        """
+        if not self._alive():
+            self._start()
+
+        chemins = [chemins] if isinstance(chemins, str) else list(chemins)
+        if reload_dirs is None:
+            reload_dirs = {os.path.dirname(os.path.abspath(c)) for c in chemins}
+        self._conn.send((chemins, list(PYTEST_ARGS if args is None else args), sorted(reload_dirs)))
+        if not self._conn.poll(self.timeout):
+            self._process.kill()
+            self.close()
+            return {"returncode": None, "output": f"TIMEOUT: tests interrompus après {self.timeout:.0f}s"}
+        try:
+            reply = self._conn.recv()
+        except EOFError:
+            # Le code testé a tué le worker (os._exit, segfault...)
+            self.close()
+            return {"returncode": None, "output": "ERREUR: le worker pytest s'est arrêté pendant les tests"}
+
+        self._runs += 1
+        rss = reply.get("rss_mb")
+        if self._runs >= self.max_runs or (rss is not None and rss > self.max_rss_mb):
+            self.close()
+        return reply
+
+
+class PytestWorkerPool:
+    """Petit pool de workers persistants, partagé par les threads de l'orchestrateur."""
+
+    def __init__(self, size=PYTEST_WORKER_POOL):
+        self._idle = queue.Queue()
+        for _ in range(max(1, size)):
+            self._idle.put(PytestWorker())
+        self._all = list(self._idle.queue)
+
+    def run(self, chemins, args=None, reload_dirs=None):
+        worker = self._idle.get()
+        try:
+            return worker.run(chemins, args, reload_dirs)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        for worker in self._all:
+            worker.close()
+
+
+_pool = None
+_pool_size = PYTEST_WORKER_POOL
+_pool_lock = threading.Lock()
+
+
+def set_pytest_pool_size(size):
+    """Taille du pool partagé (à appeler avant le premier run_pytest)."""
+    global _pool_size
+    with _pool_lock:
+        _pool_size = max(1, size)
+
+
+def get_pytest_pool():
+    """Retourne le pool partagé, ou None si le mode worker est désactivé."""
+    global _pool
+    if not PYTEST_WORKER:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = PytestWorkerPool(_pool_size)
+            atexit.register(_pool.close)
+        return _pool
+
+
+if __name__ == "__main__":
+    _serve()
@@ -0,0 +1,106 @@
+import os
+import re
+import threading
+import time
+
+# =====================
+# CONFIGURATION (surchargeable par variables d'environnement ou CLI)
+# =====================
+
+# Requêtes par minute autorisées (0 = pas de limite)
+LLM_RPM = float(os.getenv("LLM_RPM", "10"))
+# Nombre de requêtes pouvant partir d'un coup quand le quota est disponible
+LLM_BURST = int(os.getenv("LLM_BURST", "2"))
+# Nouvelles tentatives après une vraie erreur 429 / quota
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+# Backoff exponentiel : base * 2^tentative, plafonné
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "2"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+
+_QUOTA_MARKERS = ("429", "resourceexhausted", "resource exhausted", "quota", "rate limit", "too many requests")
+_RETRY_AFTER_PATTERNS = (
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)", re.IGNORECASE),
+    re.compile(r"retry in\s+(\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+    re.compile(r"retry-after:?\s*(\d+(?:\.\d+)?)", re.IGNORECASE),
+)
+
+
+def is_quota_error(exc):
+    """Vrai si l'exception correspond à un 429 / dépassement de quota de l'API."""
+    text = f"{type(exc).__name__} {exc}".lower()
+    return any(marker in text for marker in _QUOTA_MARKERS)
+
+
+def retry_after(exc):
+    """Délai d'attente suggéré par l'API dans le message d'erreur (secondes), sinon None."""
+    for pattern in _RETRY_AFTER_PATTERNS:
+        match = pattern.search(str(exc))
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class RateLimiter:
+    """
+    Token bucket partagé entre tous les threads qui appellent le LLM.
+
+    - `rpm` jetons par minute, au plus `burst` accumulés : on ne dort que si le
+      quota est réellement épuisé, au lieu de pauses fixes.
+    - Sur une vraie erreur 429 / quota, tous les appels sont suspendus avec un
+      backoff exponentiel (ou le délai indiqué par l'API), puis on réessaie.
+    """
+
+    def __init__(self, rpm=LLM_RPM, burst=LLM_BURST, max_retries=LLM_MAX_RETRIES,
+                 backoff_base=LLM_BACKOFF_BASE, backoff_max=LLM_BACKOFF_MAX):
+        self.rpm = rpm
+        self.burst = max(1, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à obtenir un jeton (et la fin d'un éventuel backoff)."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self.rpm <= 0:
+                        return
+                    rate = self.rpm / 60.0
+                    self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * rate)
+                    self._last_refill = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / rate
+            time.sleep(wait)
+
+    def penalize(self, delay):
+        """Suspend tous les appels pendant `delay` secondes (quota dépassé)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            # Le bucket repart vide : pas de rafale juste après un 429
+            self._tokens = 0.0
+            self._last_refill = time.monotonic()
+
+    def call(self, fn, *args, **kwargs):
+        """Exécute fn(*args, **kwargs) en respectant le quota, avec retry sur 429."""
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_quota_error(e) or attempt >= self.max_retries:
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                attempt += 1
+                print(f"⏳ Quota API atteint, nouvelle tentative {attempt}/{self.max_retries} dans {delay:.1f}s")
+                self.penalize(delay)
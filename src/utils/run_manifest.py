@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+# Manifeste de l'exécution en cours : état de chaque fichier, pour --resume
+RUN_MANIFEST = os.getenv("RUN_MANIFEST", os.path.join(".cache", "run_manifest.json"))
+
+# Statuts d'un fichier : en cours, terminé (validé, convergé ou itérations
+# épuisées) ou interrompu par une erreur (quota, réponse inexploitable...)
+STATUSES = ("in_progress", "done", "failed")
+
+
+class RunManifest:
+    """
+    État par fichier d'une exécution, réécrit (atomiquement) à chaque étape.
+
+    Pour chaque fichier : statut, dernière itération, dernière étape terminée
+    (Audit / Fix / Judge), empreinte du contenu, meilleur score, et le plan
+    du dernier audit pour reprendre sans le redemander.
+    """
+
+    def __init__(self, path=RUN_MANIFEST, resume=False):
+        self.path = path
+        self.resume = resume
+        self._lock = threading.Lock()
+        self._files = self._load() if resume else {}
+        if not resume:
+            self._save()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("files", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"updated": datetime.now().isoformat(), "files": self._files}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def get(self, file_path):
+        with self._lock:
+            state = self._files.get(os.path.abspath(file_path))
+            return dict(state) if state else None
+
+    def checkpoint(self, file_path, iteration, stage, content_hash, score=None, **extra):
+        """Enregistre la fin d'une étape du fichier."""
+        key = os.path.abspath(file_path)
+        with self._lock:
+            state = self._files.setdefault(key, {"status": "in_progress", "best_score": None})
+            best = state.get("best_score")
+            if score is not None and (best is None or score > best):
+                state["best_score"] = score
+            state.update(status="in_progress", iteration=iteration, stage=stage, hash=content_hash, **extra)
+            self._save()
+
+    def resume_point(self, file_path, content_hash):
+        """
+        Où reprendre le fichier d'après le manifeste repris.
+
+        Après un Fix, les tests de cette itération n'ont pas tourné : la
+        reprise se fait au Judge de la même itération, sur le code corrigé.
+
+        Returns:
+            tuple: (itération, étape à exécuter) ; (1, "Lint") sans reprise,
+            (None, None) si le fichier est terminé et inchangé.
+        """
+        state = self.get(file_path) if self.resume else None
+        if not state or not state.get("iteration"):
+            return 1, "Lint"
+        if state.get("hash") != content_hash:
+            return state["iteration"], "Lint"  # Modifié après le dernier point de reprise : on refait l'itération
+        if state.get("status") == "done":
+            return None, None
+        if state.get("stage") == "Audit" and state.get("plan") is not None:
+            return state["iteration"], "Fix"
+        if state.get("stage") == "Fix":
+            return state["iteration"], "Judge"
+        return state["iteration"] + 1, "Lint"
+
+    def finish(self, file_path, status):
+        if status not in STATUSES:
+            raise ValueError(f"Statut inconnu : {status}")
+        key = os.path.abspath(file_path)
+        with self._lock:
+            self._files.setdefault(key, {})["status"] = status
+            self._save()
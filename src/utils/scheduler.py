@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# =====================
+# ORDONNANCEUR PAR ÉTAPES (pipeline entre pools)
+# =====================
+# Chaque tâche (un fichier) passe d'étape en étape ; chaque étape tourne sur
+# le pool qui lui est attribué. Un fichier qui attend le LLM libère le pool
+# local pour le pylint/pytest d'un autre fichier, et inversement.
+
+
+class StageScheduler:
+    """
+    Fait circuler des tâches entre des étapes exécutées sur des pools distincts.
+
+    Args:
+        stages (dict): {étape: (pool, fonction)} ; fonction(tâche) retourne le
+            nom de l'étape suivante, ou None quand la tâche est terminée.
+        pool_sizes (dict): {pool: nombre de threads}.
+    """
+
+    def __init__(self, stages, pool_sizes):
+        self.stages = stages
+        self.pool_sizes = pool_sizes
+
+    def run(self, tasks, first_stage, on_done=None, on_error=None):
+        """
+        Exécute toutes les tâches jusqu'au bout.
+
+        on_done(tâche) est appelé quand une tâche n'a plus d'étape suivante ;
+        on_error(tâche, exception) quand une étape lève une exception (la
+        tâche est alors abandonnée, les autres continuent).
+        """
+        pools = {
+            name: ThreadPoolExecutor(max_workers=max(1, size), thread_name_prefix=f"stage-{name}")
+            for name, size in self.pool_sizes.items()
+        }
+        pending = {}  # future -> tâche
+
+        def submit(task, stage):
+            pool, func = self.stages[stage]
+            pending[pools[pool].submit(func, task)] = task
+
+        try:
+            for task in tasks:
+                submit(task, first_stage)
+            while pending:
+                finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = pending.pop(future)
+                    try:
+                        next_stage = future.result()
+                    except Exception as e:
+                        if on_error is None:
+                            raise
+                        on_error(task, e)
+                        continue
+                    if next_stage is None:
+                        if on_done is not None:
+                            on_done(task)
+                    else:
+                        submit(task, next_stage)
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True, cancel_futures=True)
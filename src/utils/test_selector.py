@@ -0,0 +1,217 @@
+import ast
+import json
+import os
+import threading
+
+# coverage est optionnel : sans lui, la sélection repose sur le seul graphe d'imports
+try:
+    from coverage import CoverageData
+    COVERAGE_AVAILABLE = True
+except ImportError:
+    COVERAGE_AVAILABLE = False
+
+TEST_SELECTOR_CACHE = os.getenv("TEST_SELECTOR_CACHE", os.path.join(".cache", "test_selector.json"))
+IGNORED_DIRS = {"__pycache__", ".git", ".venv", "venv", ".tox", ".pytest_cache", ".cache"}
+
+
+def is_test_file(path):
+    name = os.path.basename(path)
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def _import_name(path):
+    """
+    Nom pointé réel d'un module, en remontant les dossiers qui contiennent un
+    __init__.py (ex : src/pkg/core.py -> "pkg.core" si src n'est pas un paquet).
+    """
+    folder, name = os.path.split(os.path.abspath(path))
+    parts = [] if name == "__init__.py" else [os.path.splitext(name)[0]]
+    while os.path.isfile(os.path.join(folder, "__init__.py")):
+        folder, package = os.path.split(folder)
+        parts.insert(0, package)
+    return ".".join(parts)
+
+
+def _module_names(roots, path):
+    """
+    Noms sous lesquels un fichier peut être importé : nom de paquet réel,
+    chemin pointé depuis chaque racine, et nom court.
+    """
+    short = os.path.splitext(os.path.basename(path))[0]
+    if short == "__init__":
+        short = os.path.basename(os.path.dirname(path))
+    names = {short, _import_name(path)}
+    for root in roots:
+        rel = os.path.relpath(path, root)
+        if not rel.startswith(".."):
+            dotted = rel[:-3].replace(os.sep, ".")
+            names.add(dotted[: -len(".__init__")] if dotted.endswith(".__init__") else dotted)
+    names.discard("")
+    return names
+
+
+def _parse_imports(path):
+    """Modules importés par un fichier (imports relatifs résolus par rapport à son paquet)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return []
+
+    package = _import_name(os.path.join(os.path.dirname(path), "__init__.py"))
+    imports = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.add(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                # "from .. import x" : on remonte d'un paquet par point supplémentaire
+                parent = package.rsplit(".", node.level - 1)[0] if node.level > 1 else package
+                base = f"{parent}.{base}" if base and parent else (base or parent)
+            imports.add(base)
+            # "from pkg import mod" peut importer le sous-module pkg.mod
+            for alias in node.names:
+                imports.add(f"{base}.{alias.name}" if base else alias.name)
+    return sorted(imports)
+
+
+class TestSelector:
+    """
+    Associe chaque fichier source aux tests qui l'exercent.
+
+    - Graphe d'imports : un test est retenu s'il importe le module modifié,
+      directement ou via d'autres modules du projet (ceux du dossier de
+      tests et ceux du dossier source `source_root`).
+    - Couverture (optionnelle) : un fichier .coverage enregistré avec des
+      contextes par test (`pytest --cov-context=test`) complète la sélection.
+
+    Les imports de chaque fichier sont mis en cache sur disque (clé : mtime et
+    taille), seul un fichier modifié est ré-analysé d'une exécution à l'autre.
+    """
+
+    __test__ = False  # Pas une classe de tests pour pytest
+
+    def __init__(self, tests_root, cache_path=TEST_SELECTOR_CACHE, coverage_file=None, source_root=None):
+        self.root = os.path.abspath(tests_root)
+        self.source_root = os.path.abspath(source_root) if source_root else None
+        self.cache_path = cache_path
+        self.coverage_file = coverage_file
+        self._cache = self._load_cache()
+        self._lock = threading.Lock()
+
+    def _cache_key(self):
+        return os.pathsep.join(self._roots())
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f).get(self._cache_key(), {})
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        data[self._cache_key()] = self._cache
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _roots(self):
+        return [self.root] + ([self.source_root] if self.source_root else [])
+
+    def _python_files(self):
+        seen = set()
+        for root in self._roots():
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    if name.endswith(".py") and path not in seen:
+                        seen.add(path)
+                        yield path
+
+    def _scan(self):
+        """Met à jour les imports des fichiers modifiés et retourne {fichier: imports}."""
+        graph = {}
+        changed = False
+        for path in self._python_files():
+            stat = os.stat(path)
+            signature = [stat.st_mtime_ns, stat.st_size]
+            entry = self._cache.get(path)
+            if entry is None or entry["sig"] != signature:
+                entry = {"sig": signature, "imports": _parse_imports(path)}
+                self._cache[path] = entry
+                changed = True
+            graph[path] = entry["imports"]
+        for path in set(self._cache) - set(graph):
+            del self._cache[path]
+            changed = True
+        if changed:
+            self._save_cache()
+        return graph
+
+    def all_tests(self):
+        """Tous les fichiers de test du dossier de tests."""
+        root = self.root + os.sep
+        with self._lock:
+            return sorted(p for p in self._scan() if is_test_file(p) and p.startswith(root))
+
+    def select(self, source_path):
+        """Retourne les fichiers de test qui importent ou couvrent `source_path`."""
+        source_path = os.path.abspath(source_path)
+        with self._lock:
+            graph = self._scan()
+
+        if is_test_file(source_path):
+            return [source_path]
+
+        # Index inverse : module importé -> fichiers qui l'importent
+        importers = {}
+        for path, imports in graph.items():
+            for module in imports:
+                importers.setdefault(module, set()).add(path)
+
+        selected = set()
+        seen = {source_path}
+        pending = [source_path]
+        while pending:
+            current = pending.pop()
+            for name in _module_names(self._roots(), current):
+                for importer in importers.get(name, ()):
+                    if importer in seen:
+                        continue
+                    seen.add(importer)
+                    if is_test_file(importer):
+                        selected.add(importer)
+                    else:
+                        pending.append(importer)
+
+        selected.update(self._covering_tests(source_path))
+        return sorted(selected)
+
+    def _covering_tests(self, source_path):
+        """Tests ayant exécuté `source_path` d'après les contextes de couverture."""
+        if not (COVERAGE_AVAILABLE and self.coverage_file and os.path.exists(self.coverage_file)):
+            return set()
+        data = CoverageData(basename=self.coverage_file)
+        data.read()
+        tests = set()
+        for contexts in data.contexts_by_lineno(source_path).values():
+            for context in contexts:
+                # Contexte pytest-cov : "chemin/test_x.py::test_nom|run"
+                test_file = context.split("::", 1)[0]
+                if test_file.endswith(".py"):
+                    candidate = os.path.abspath(os.path.join(self.root, test_file))
+                    if not os.path.exists(candidate):
+                        candidate = os.path.abspath(test_file)
+                    if os.path.exists(candidate):
+                        tests.add(candidate)
+        return tests
@@ -1,37 +1,180 @@
 import os
 import json
+import hashlib
+import shutil
 import subprocess
 import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from src.utils.lint_engine import get_lint_engine, structure_messages
+from src.utils.lint_cache import lint_cache
+from src.utils.pytest_worker import get_pytest_pool, PYTEST_ARGS
+from src.utils import metrics
+
 # =====================
 # 1. SANDBOX FUNCTIONS
 # =====================
 
+# Racine par défaut ; main la remplace par le dossier cible (set_sandbox_root)
+SANDBOX_ROOT = os.getenv("SANDBOX_ROOT", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sandbox"))
+
+
+class SandboxError(ValueError):
+    """Chemin qui sort de la sandbox."""
+
+
+class Sandbox:
+    """
+    Accès aux fichiers de la sandbox.
+
+    La racine est résolue et créée une seule fois. Tout chemin (relatif à la
+    racine ou absolu) est résolu, liens compris, et refusé s'il en sort ;
+    `extra_roots` ouvre d'autres dossiers en lecture seule (ex : --tests_dir).
+
+    Les écritures sont atomiques (fichier temporaire + os.replace) : un arrêt
+    en cours d'écriture laisse l'ancienne version intacte. Le contenu lu ou
+    écrit est gardé en mémoire, revalidé par un simple stat (taille, mtime),
+    pour éviter de relire le disque entre le lint, l'audit et les tests.
+    """
+
+    def __init__(self, root, extra_roots=()):
+        self.root = os.path.realpath(root)
+        os.makedirs(self.root, exist_ok=True)
+        self.read_roots = [self.root] + [os.path.realpath(r) for r in extra_roots]
+        self._lock = threading.Lock()
+        self._files = {}  # chemin -> {"stat", "text", "data", "hash"}
+
+    def resolve(self, nom_fichier, write=False):
+        """
+        Chemin absolu du fichier dans la sandbox.
+
+        Raises:
+            SandboxError: Si le chemin sort de la racine (ou des racines en lecture).
+        """
+        chemin = os.path.realpath(os.path.join(self.root, nom_fichier))
+        for root in [self.root] if write else self.read_roots:
+            if chemin == root or chemin.startswith(root + os.sep):
+                return chemin
+        raise SandboxError(f"{nom_fichier} est hors de la sandbox ({self.root})")
+
+    def exists(self, nom_fichier):
+        try:
+            return os.path.isfile(self.resolve(nom_fichier))
+        except SandboxError:
+            return False
+
+    def listdir(self):
+        return os.listdir(self.root)
+
+    def _entry(self, chemin):
+        """Entrée en mémoire du fichier, relue seulement s'il a changé sur le disque."""
+        try:
+            st = os.stat(chemin)
+        except FileNotFoundError:
+            with self._lock:
+                self._files.pop(chemin, None)
+            raise
+        signature = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            entry = self._files.get(chemin)
+        if entry is not None and entry["stat"] == signature:
+            return entry
+
+        with open(chemin, "rb") as f:
+            data = f.read()
+        # Même conversion des fins de ligne qu'une lecture en mode texte
+        text = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+        entry = {"stat": signature, "text": text, "data": data, "hash": None}
+        with self._lock:
+            self._files[chemin] = entry
+        return entry
+
+    def read(self, nom_fichier):
+        chemin = self.resolve(nom_fichier)
+        try:
+            return self._entry(chemin)["text"]
+        except FileNotFoundError:
+            raise FileNotFoundError(f"{nom_fichier} introuvable") from None
+
+    def read_bytes(self, nom_fichier):
+        """Contenu brut (tel que sur le disque), pour les clés de cache."""
+        chemin = self.resolve(nom_fichier)
+        entry = self._entry(chemin)
+        if entry["data"] is None:
+            with open(chemin, "rb") as f:
+                entry["data"] = f.read()
+        return entry["data"]
+
+    def content_hash(self, nom_fichier):
+        """sha256 du contenu texte (même valeur que convergence.content_hash)."""
+        entry = self._entry(self.resolve(nom_fichier))
+        if entry["hash"] is None:
+            entry["hash"] = hashlib.sha256(entry["text"].encode("utf-8")).hexdigest()
+        return entry["hash"]
+
+    def write(self, nom_fichier, contenu):
+        """Écrit le fichier atomiquement et retourne son chemin absolu."""
+        chemin = self.resolve(nom_fichier, write=True)
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        tmp_path = os.path.join(
+            os.path.dirname(chemin),
+            f".{os.path.basename(chemin)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(contenu)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(chemin):
+                shutil.copymode(chemin, tmp_path)
+            os.replace(tmp_path, chemin)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        st = os.stat(chemin)
+        text = contenu.replace("\r\n", "\n").replace("\r", "\n")
+        # Sous Windows le mode texte convertit les fins de ligne : octets bruts relus au besoin
+        data = contenu.encode("utf-8") if os.linesep == "\n" else None
+        with self._lock:
+            self._files[chemin] = {"stat": (st.st_size, st.st_mtime_ns), "text": text, "data": data, "hash": None}
+        return chemin
+
+
+_sandbox = None
+_sandbox_lock = threading.Lock()
+
+
+def get_sandbox():
+    global _sandbox
+    with _sandbox_lock:
+        if _sandbox is None:
+            _sandbox = Sandbox(SANDBOX_ROOT)
+        return _sandbox
+
+
+def set_sandbox_root(root, extra_roots=()):
+    """Fixe la racine de la sandbox (dossier cible) ; `extra_roots` restent lisibles (tests)."""
+    global _sandbox
+    with _sandbox_lock:
+        _sandbox = Sandbox(root, extra_roots)
+    return _sandbox
+
+
 def creer_sandbox():
-    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    sandbox_path = os.path.join(base_path, "sandbox")
-    if not os.path.exists(sandbox_path):
-        os.makedirs(sandbox_path)
-    return sandbox_path
+    return get_sandbox().root
 
 def lister_fichiers_sandbox():
-    sandbox_path = creer_sandbox()
-    return os.listdir(sandbox_path)
+    return get_sandbox().listdir()
 
 def lire_fichier(nom_fichier):
-    sandbox_path = creer_sandbox()
-    chemin = os.path.join(sandbox_path, nom_fichier)
-    if not os.path.exists(chemin):
-        raise FileNotFoundError(f"{nom_fichier} introuvable")
-    with open(chemin, "r", encoding="utf-8") as f:
-        return f.read()
+    return get_sandbox().read(nom_fichier)
 
 def ecrire_fichier(nom_fichier, contenu):
-    sandbox_path = creer_sandbox()
-    chemin = os.path.join(sandbox_path, nom_fichier)
-    with open(chemin, "w", encoding="utf-8") as f:
-        f.write(contenu)
+    chemin = get_sandbox().write(nom_fichier, contenu)
     print(f"Fichier '{nom_fichier}' écrit dans sandbox")
     return chemin
 
@@ -39,23 +182,119 @@ def ecrire_fichier(nom_fichier, contenu):
 # 2. PYLINT FUNCTION (VERSION STABLE)
 # =====================
 
-def run_pylint(nom_fichier):
-    """Exécute pylint et retourne le score officiel sur 10, même si la langue du système est français."""
-    sandbox_path = creer_sandbox()
-    chemin = os.path.join(sandbox_path, nom_fichier)
+def run_pylint(nom_fichier, use_cache=True):
+    """
+    Exécute pylint et retourne le score officiel sur 10.
+
+    Par défaut pylint tourne dans le processus courant (moteur partagé, cache
+    astroid chaud). Sans pylint importable (ou PYLINT_IN_PROCESS=0), on lance
+    `python -m pylint`. Dans les deux cas les messages du reporter JSON sont
+    renvoyés sous "messages", classés par impact sous "issues" et par
+    catégorie sous "categorized".
+
+    Les résultats sont mis en cache selon le hash du contenu et de la config
+    pylint : un fichier inchangé n'est pas ré-analysé (use_cache=False pour forcer).
 
-    if not os.path.exists(chemin):
+    Un chemin hors de la sandbox ne lève pas SandboxError : comme pour un
+    fichier introuvable (et comme run_pytest), un dictionnaire d'erreur
+    est retourné, avec la raison sous "message".
+    """
+    sandbox = get_sandbox()
+    try:
+        chemin = sandbox.resolve(nom_fichier)
+    except SandboxError as e:
+        return {"success": False, "score": 0, "message": str(e)}
+
+    if not sandbox.exists(chemin):
         return {"success": False, "score": 0, "message": "Fichier introuvable"}
 
+    key = None
+    if use_cache:
+        key = lint_cache.key(chemin, sandbox.read_bytes(chemin))
+        cached = lint_cache.get(key)
+        if cached is not None:
+            metrics.count("lint_cache_hits")
+            return cached
+
+    engine = get_lint_engine()
+    with metrics.timed("lint"):
+        result = engine.lint(chemin) if engine is not None else _run_pylint_subprocess(chemin)
+    result.update(structure_messages(result.get("messages", [])))
+
+    if key is not None:
+        lint_cache.put(key, result)
+    return result
+
+
+def run_pylint_batch(noms_fichiers, jobs=None):
+    """
+    Pré-passe pylint sur tout un ensemble de fichiers, répartie sur plusieurs cœurs.
+
+    Les résultats par fichier sont rangés dans le cache pylint partagé : la
+    première itération d'audit de chaque fichier les y retrouve sans relancer
+    d'analyse.
+
+    Returns:
+        dict: {chemin: résultat de run_pylint} ; un fichier introuvable ou hors
+        de la sandbox y figure avec le dictionnaire d'erreur de run_pylint
+        (au lieu de lever SandboxError pour tout le lot).
+    """
+    sandbox = get_sandbox()
+    erreurs = {}
+    chemins = []
+    for nom in noms_fichiers:
+        try:
+            chemin = sandbox.resolve(nom)
+        except SandboxError as e:
+            erreurs[nom] = {"success": False, "score": 0, "message": str(e)}
+            continue
+        if sandbox.exists(chemin):
+            chemins.append(chemin)
+        else:
+            erreurs[chemin] = {"success": False, "score": 0, "message": "Fichier introuvable"}
+    if not chemins:
+        return erreurs
+    jobs = jobs or os.cpu_count() or 1
+
+    # Clés calculées sur le contenu lu AVANT l'analyse
+    keys = {chemin: lint_cache.key(chemin, sandbox.read_bytes(chemin)) for chemin in chemins}
+
+    engine = get_lint_engine()
+    with metrics.timed("lint_batch"):
+        if engine is not None:
+            results = engine.lint_batch(chemins, jobs)
+        else:
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                results = dict(zip(keys, pool.map(_run_pylint_subprocess, keys)))
+
+    for chemin, result in results.items():
+        result.update(structure_messages(result.get("messages", [])))
+        lint_cache.put(keys[chemin], result)
+    return {**erreurs, **results}
+
+
+def _run_pylint_subprocess(chemin):
+    """Un interpréteur pylint par appel : score extrait du texte, messages du reporter JSON."""
     # Forcer la sortie de pylint en anglais pour que la regex fonctionne
     env_vars = {**os.environ, "PYTHONIOENCODING": "utf-8", "LANG": "en_US.UTF-8"}
 
-    result = subprocess.run(
-        ["python", "-m", "pylint", chemin],
-        capture_output=True,
-        text=True,
-        env=env_vars
-    )
+    # Reporter texte sur stdout (score) + reporter JSON dans un fichier temporaire
+    fd, json_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        result = subprocess.run(
+            ["python", "-m", "pylint", chemin, f"--output-format=text,json:{json_path}"],
+            capture_output=True,
+            text=True,
+            env=env_vars
+        )
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                messages = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            messages = []
+    finally:
+        os.remove(json_path)
 
     output = result.stdout + result.stderr
 
@@ -70,37 +309,63 @@ def run_pylint(nom_fichier):
     return {
         "success": True,
         "score": round(score, 2),
-        "raw_output": output
+        "raw_output": output,
+        "messages": messages
     }
 
 # =====================
 # 3. PYTEST FUNCTION
 # =====================
 
-def run_pytest(nom_fichier_test):
-    sandbox_path = creer_sandbox()
-    chemin = os.path.join(sandbox_path, nom_fichier_test)
+def run_pytest(nom_fichier_test, source_file=None):
+    """
+    Exécute pytest sur le fichier donné (ou une liste de fichiers de test).
+
+    Par défaut les tests tournent dans un worker pytest persistant (imports
+    déjà chauds, seuls les modules testés sont rechargés) ; PYTEST_WORKER=0
+    revient à un `python -m pytest` par appel.
+
+    Args:
+        source_file (str): Fichier source modifié, dont le dossier doit aussi
+            être rechargé quand les tests sont ailleurs.
+    """
+    sandbox = get_sandbox()
+    noms = [nom_fichier_test] if isinstance(nom_fichier_test, str) else list(nom_fichier_test)
+    try:
+        chemins = [sandbox.resolve(nom) for nom in noms]
+    except SandboxError as e:
+        return {"status": "error", "message": str(e)}
 
-    if not os.path.exists(chemin):
+    if not chemins or not all(os.path.isfile(chemin) for chemin in chemins):
         return {"status": "error", "message": "Test introuvable"}
 
-    result = subprocess.run(
-        ["python", "-m", "pytest", chemin, "-q", "--tb=short", "--disable-warnings", "--maxfail=5"],
-        capture_output=True,
-        text=True
-    )
+    pool = get_pytest_pool()
+    with metrics.timed("pytest"):
+        if pool is not None:
+            reload_dirs = {os.path.dirname(os.path.abspath(c)) for c in chemins}
+            if source_file:
+                reload_dirs.add(os.path.dirname(os.path.abspath(source_file)))
+            reply = pool.run(chemins, PYTEST_ARGS, reload_dirs)
+            returncode, stdout, stderr = reply["returncode"], reply["output"], ""
+        else:
+            result = subprocess.run(
+                ["python", "-m", "pytest", *chemins, *PYTEST_ARGS],
+                capture_output=True,
+                text=True
+            )
+            returncode, stdout, stderr = result.returncode, result.stdout, result.stderr
 
-    is_success = result.returncode in [0, 5]
-    output = result.stdout if result.stdout else result.stderr
+    is_success = returncode in [0, 5]
+    output = stdout if stdout else stderr
 
-    if result.returncode == 5:
+    if returncode == 5:
         output = "SUCCESS: No tests found, but syntax is valid."
 
     return {
-        "returncode": result.returncode,
+        "returncode": returncode,
         "status": "SUCCESS" if is_success else "FAILURE",
         "stdout": output,
-        "stderr": result.stderr
+        "stderr": stderr
     }
 
 # =====================
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+
+# Versions des fichiers de la sandbox : contenus (blobs) + historique score/tests par fichier
+VERSION_STORE = os.getenv("VERSION_STORE", os.path.join(".cache", "versions"))
+# Sessions conservées par fichier dans l'historique (les plus récentes)
+VERSION_KEEP_SESSIONS = int(os.getenv("VERSION_KEEP_SESSIONS", "5"))
+
+
+def new_session():
+    """Identifiant d'un passage de l'orchestrateur sur un fichier."""
+    return uuid.uuid4().hex[:12]
+
+
+def rank(entry):
+    """Ordre des versions : tests OK d'abord (inconnu = non), puis score pylint."""
+    return (entry.get("tests_ok") is True, entry.get("score") if entry.get("score") is not None else -1)
+
+
+class VersionStore:
+    """
+    Historique copy-on-write des fichiers de la sandbox.
+
+    - blobs/<hh>/<empreinte> : chaque contenu distinct, écrit une seule fois
+      (l'empreinte est celle de convergence.content_hash).
+    - history/<fichier>.json : une entrée par version et par session
+      (itération, score, résultat des tests).
+
+    La meilleure version n'est cherchée que dans la session en cours : une
+    modification faite à la main entre deux exécutions n'est jamais écrasée
+    par une version d'une exécution précédente. L'historique d'un fichier ne
+    garde que ses `keep_sessions` dernières sessions ; prune() supprime
+    ensuite les contenus qui ne sont plus référencés.
+    """
+
+    def __init__(self, root=VERSION_STORE, keep_sessions=VERSION_KEEP_SESSIONS):
+        self.root = root
+        self.keep_sessions = max(1, keep_sessions)
+        self._lock = threading.Lock()
+        self._histories = {}  # chemin absolu -> [entrées]
+
+    def _blob_path(self, code_hash):
+        return os.path.join(self.root, "blobs", code_hash[:2], code_hash)
+
+    def _history_path(self, abs_path):
+        name = hashlib.sha256(abs_path.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.root, "history", f"{os.path.basename(abs_path)}.{name}.json")
+
+    def _write_atomic(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def put(self, content):
+        """Stocke un contenu (s'il n'y est pas déjà) et retourne son empreinte."""
+        code_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        path = self._blob_path(code_hash)
+        if not os.path.exists(path):
+            self._write_atomic(path, content)
+        return code_hash
+
+    def get(self, code_hash):
+        with open(self._blob_path(code_hash), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _history(self, abs_path):
+        if abs_path not in self._histories:
+            try:
+                with open(self._history_path(abs_path), "r", encoding="utf-8") as f:
+                    self._histories[abs_path] = json.load(f)
+            except (OSError, ValueError):
+                self._histories[abs_path] = []
+        return self._histories[abs_path]
+
+    def record(self, file_path, session, code_hash=None, content=None, **fields):
+        """
+        Ajoute ou complète la version `code_hash` (ou celle de `content`) du fichier.
+
+        Args:
+            fields: iteration, score, tests_ok...
+
+        Returns:
+            dict: L'entrée à jour.
+        """
+        if content is not None:
+            code_hash = self.put(content)
+        abs_path = os.path.abspath(file_path)
+        with self._lock:
+            history = self._history(abs_path)
+            entry = next((e for e in history if e["session"] == session and e["hash"] == code_hash), None)
+            if entry is None:
+                entry = {"session": session, "hash": code_hash, "score": None, "tests_ok": None,
+                         "created": datetime.now().isoformat()}
+                history.append(entry)
+                self._trim(history)
+            entry.update({k: v for k, v in fields.items() if v is not None})
+            self._write_atomic(self._history_path(abs_path), json.dumps(history, indent=2))
+            return dict(entry)
+
+    def _trim(self, history):
+        """Retire les entrées des sessions au-delà des `keep_sessions` plus récentes."""
+        sessions = list(dict.fromkeys(e["session"] for e in history))
+        if len(sessions) > self.keep_sessions:
+            kept = set(sessions[-self.keep_sessions:])
+            history[:] = [e for e in history if e["session"] in kept]
+
+    def prune(self):
+        """
+        Supprime les contenus qu'aucun historique ne référence plus (fin d'exécution).
+
+        Returns:
+            int: Nombre de contenus supprimés.
+        """
+        with self._lock:
+            referenced = set()
+            history_dir = os.path.join(self.root, "history")
+            for name in os.listdir(history_dir) if os.path.isdir(history_dir) else ():
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(history_dir, name), "r", encoding="utf-8") as f:
+                        referenced.update(e["hash"] for e in json.load(f))
+                except (OSError, ValueError, KeyError, TypeError):
+                    return 0  # Historique illisible : on ne supprime rien
+            removed = 0
+            for dirpath, _, filenames in os.walk(os.path.join(self.root, "blobs")):
+                for name in filenames:
+                    if name not in referenced and not name.endswith(".tmp"):
+                        os.remove(os.path.join(dirpath, name))
+                        removed += 1
+            return removed
+
+    def history(self, file_path, session=None):
+        with self._lock:
+            history = self._history(os.path.abspath(file_path))
+            return [dict(e) for e in history if session is None or e["session"] == session]
+
+    def entry(self, file_path, session, code_hash):
+        return next((e for e in self.history(file_path, session) if e["hash"] == code_hash), None)
+
+    def best(self, file_path, session):
+        """Meilleure version de la session (à égalité, la plus récente), ou None."""
+        best = None
+        for entry in self.history(file_path, session):
+            if best is None or rank(entry) >= rank(best):
+                best = entry
+        return best
+
+
+def is_regression(current, best, min_delta=0.0):
+    """Vrai si `best` est une autre version, nettement meilleure que `current`."""
+    if best is None or current is None or best["hash"] == current["hash"]:
+        return False
+    if (best.get("tests_ok") is True) != (current.get("tests_ok") is True):
+        return best.get("tests_ok") is True
+    return (best.get("score") or 0) - (current.get("score") or 0) >= min_delta